@@ -20,6 +20,7 @@ urlpatterns = [
     path('reviews/withdraw/', views.teacher_revoke_review ,name='review-withdraw'),
     path('reviews/edit/', views.teacher_update_review_with_score, name='review-edit'),
     path('reviews/history/', views.teacher_review_history, name='review-history'),
+    path('reviews/export/', views.ApplicationExportView.as_view(), name='review-export'),
 
 ]
 
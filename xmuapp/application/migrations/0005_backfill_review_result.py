@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:20
+
+from datetime import datetime, timezone
+
+from django.db import migrations
+
+
+def backfill_review_result(apps, schema_editor):
+    """已审核但未记录审核结果/审核时间的申请：结果取自审核状态，时间取自最后修改时间"""
+    Application = apps.get_model('application', 'Application')
+
+    reviewed = Application.objects.filter(review_status__in=[2, 3])
+    reviewed.filter(result__isnull=True, review_status=2).update(result=True)
+    reviewed.filter(result__isnull=True, review_status=3).update(result=False)
+
+    updates = []
+    for application in reviewed.filter(reviewed_at__isnull=True).only('id', 'ModifyTime').iterator(chunk_size=2000):
+        if application.ModifyTime:
+            application.reviewed_at = datetime.fromtimestamp(application.ModifyTime / 1000, tz=timezone.utc)
+            updates.append(application)
+    Application.objects.bulk_update(updates, ['reviewed_at'], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application', '0004_alter_attachment_file_hash'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_review_result, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application', '0005_backfill_review_result'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['review_status', 'UploadTime', 'id'], name='application_review__7a69ba_idx'),
+        ),
+    ]
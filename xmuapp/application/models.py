@@ -385,6 +385,8 @@ class Application(ReviewMixin):
         indexes = [
             models.Index(fields=['user', 'review_status']),
             models.Index(fields=['review_status', 'Type', 'UploadTime']),
+            # 待审核队列不按类型筛选时按 (UploadTime, id) 游标分页
+            models.Index(fields=['review_status', 'UploadTime', 'id']),
         ]
 
     def get_review_info(self):
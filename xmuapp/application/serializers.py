@@ -272,6 +272,10 @@ class ApplicationRevokeReviewSerializer(serializers.Serializer):
             raise serializers.ValidationError("找到多个相同标识的申请记录，请联系管理员")
 
 
+# 与 extra_data 为空值时等价的 JSON 文本
+EMPTY_JSON_TEXTS = ('null', '{}', '[]', '""', '0', 'false')
+
+
 class SafeTeacherPendingApplicationListSerializer(serializers.ModelSerializer):
     """超级安全的老师待审核申请列表序列化器 - 修复版本"""
 
@@ -322,8 +326,11 @@ class SafeTeacherPendingApplicationListSerializer(serializers.ModelSerializer):
             return []
 
     def get_extra_data(self, obj):
-        """安全获取extra_data"""
+        """安全获取extra_data，查询时已按文本读取（extra_data_text）则直接返回"""
         try:
+            if hasattr(obj, 'extra_data_text'):
+                extra_data_text = obj.extra_data_text
+                return extra_data_text if extra_data_text and extra_data_text not in EMPTY_JSON_TEXTS else "{}"
             if obj.extra_data:
                 import json
                 return json.dumps(obj.extra_data, ensure_ascii=False)
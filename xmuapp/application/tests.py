@@ -1,3 +1,162 @@
-from django.test import TestCase
+import contextlib
+import csv
+import io
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from application.models import Application
+from score.models import AcademicPerformance
+from user.models import ExportManifest, User
+
+
+# 导出文件写入临时目录，测试结束后删除
+EXPORT_MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=EXPORT_MEDIA_ROOT)
+class ApplicationExportTest(TestCase):
+    """申请审核记录导出：审核日期筛选、导出文件复用和任务列表参数"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(EXPORT_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.teacher = User.objects.create_user(school_id='T0001', name='张老师', college='信息学院',
+                                                user_type=1, password='123456')
+        student = User.objects.create_user(school_id='2024001001', name='张三', college='信息学院',
+                                           user_type=0, password='123456')
+        self.application = Application.objects.create(user=student, Type=0, Title='竞赛', ApplyScore=3,
+                                                      Feedback='', review_status=1)
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+
+    def post(self, url, data):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return self.client.post(url, data, format='json')
+
+    def test_export_filters_by_review_date(self):
+        response = self.post('/api/student/material/reviews/first_review/', {
+            'application_id': str(self.application.id), 'result': True, 'comment': '通过'
+        })
+        self.assertEqual(response.status_code, 200)
+
+        self.application.refresh_from_db()
+        self.assertTrue(self.application.result)
+        self.assertIsNotNone(self.application.reviewed_at)
+
+        today = timezone.localdate().isoformat()
+        response = self.post('/api/student/material/reviews/export/', {
+            'format': 'csv', 'status': 2, 'review_start': today, 'review_end': today
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['data']['count'], 1)
+
+        with open(response.data['data']['filepath'], encoding='utf-8-sig') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(rows[0]['审核结果'], '通过')
+        self.assertTrue(rows[0]['审核时间'].startswith(today))
+
+        response = self.post('/api/student/material/reviews/export/', {
+            'format': 'csv', 'review_start': '2000-01-01', 'review_end': '2000-01-31'
+        })
+        self.assertEqual(response.status_code, 400)
+
+    def test_revoke_clears_review_result(self):
+        self.post('/api/student/material/reviews/first_review/', {
+            'application_id': str(self.application.id), 'result': True
+        })
+        self.post('/api/student/material/reviews/withdraw/', {'id': self.application.UploadTime})
+
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.review_status, 1)
+        self.assertIsNone(self.application.result)
+        self.assertIsNone(self.application.reviewed_at)
+
+    def test_cached_export_is_not_shared_between_teachers(self):
+        other_teacher = User.objects.create_user(school_id='T0002', name='李老师', college='信息学院',
+                                                 user_type=1, password='123456')
+        first = self.post('/api/student/material/reviews/export/', {'format': 'csv'})
+        self.assertEqual(first.status_code, 200)
+
+        self.client.force_authenticate(other_teacher)
+        second = self.post('/api/student/material/reviews/export/', {'format': 'csv'})
+        self.assertEqual(second.status_code, 200)
+        self.assertFalse(second.data['data']['cached'])
+        self.assertNotEqual(first.data['data']['filename'], second.data['data']['filename'])
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = self.client.get('/api/admin/exports/download/', {'filename': second.data['data']['filename']})
+        self.assertEqual(response.status_code, 200)
+        # 不调用 response.close()：它会触发 request_finished 关闭测试数据库连接
+        self.assertTrue(b''.join(response.streaming_content))
+
+    def test_export_job_list_rejects_invalid_limit(self):
+        response = self.client.get('/api/student/material/reviews/export/', {'limit': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get('/api/student/material/reviews/export/', {'limit': 1000})
+        self.assertEqual(response.status_code, 200)
+
+    def test_export_job_lookup_by_uuid(self):
+        manifest = ExportManifest.objects.create(filename='applications_export_job.csv', export_format='csv',
+                                                 export_type='applications', status='pending',
+                                                 fingerprint='0' * 64, creator=self.teacher)
+
+        response = self.client.get('/api/student/material/reviews/export/', {'job_id': str(manifest.id)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['data']['id'], str(manifest.id))
+
+        response = self.client.get('/api/student/material/reviews/export/', {'job_id': '1'})
+        self.assertEqual(response.status_code, 404)
+
+
+class PendingApplicationListTest(TestCase):
+    """待审核申请列表：extra_data 原样返回"""
+
+    def test_extra_data_keeps_non_ascii_text(self):
+        teacher = User.objects.create_user(school_id='T0001', name='张老师', college='信息学院',
+                                           user_type=1, password='123456')
+        student = User.objects.create_user(school_id='2024001001', name='张三', college='信息学院',
+                                           user_type=0, password='123456')
+        Application.objects.create(user=student, Type=0, Title='竞赛', ApplyScore=3, Feedback='',
+                                   review_status=1, extra_data={'奖项': '一等奖'})
+
+        client = APIClient()
+        client.force_authenticate(teacher)
+        response = client.get('/api/student/material/reviews/pending_list/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['ApplyList'][0]['extra_data'], '{"奖项": "一等奖"}')
+
+
+class ReviewScoreTest(TestCase):
+    """修改审核分数：只有审核通过的申请计入加分"""
+
+    def setUp(self):
+        self.teacher = User.objects.create_user(school_id='T0001', name='张老师', college='信息学院',
+                                                user_type=1, password='123456')
+        self.student = User.objects.create_user(school_id='2024001001', name='张三', college='信息学院',
+                                                user_type=0, password='123456')
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+
+    def edit_score(self, review_status):
+        application = Application.objects.create(user=self.student, Type=0, Title='竞赛', ApplyScore=3,
+                                                 Feedback='', review_status=review_status)
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = self.client.put('/api/student/material/reviews/edit/', {
+                'id': application.UploadTime, 'Real_Score': 3
+            }, format='json')
+        self.assertEqual(response.status_code, 200)
+        return AcademicPerformance.objects.get(user=self.student).get_score(0)
+
+    def test_edit_rejected_review_does_not_credit_score(self):
+        self.assertEqual(self.edit_score(review_status=3), 0)
+
+    def test_edit_approved_review_credits_score(self):
+        self.assertEqual(self.edit_score(review_status=2), 3)
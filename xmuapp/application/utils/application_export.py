@@ -0,0 +1,290 @@
+# utils/application_export.py
+import hashlib
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from application.models import Application
+from user.models import ExportManifest
+from user.utils.export_utils import UserExporter, EXPORT_CHUNK_SIZE, FINGERPRINT_LENGTH
+
+# 导出列及对应的查询字段（申请人、审核老师通过 JOIN 一次查出）
+APPLICATION_COLUMNS = [
+    '申请ID', '学号', '姓名', '学院', '专业', '申请类型', '申请标题', '申请分数',
+    '审核状态', '审核结果', '加分', '审核老师', '审核老师工号', '审核时间', '反馈', '附件数',
+    '上传时间', '修改时间',
+]
+APPLICATION_FIELDS = [
+    'id', 'user__school_id', 'user__name', 'user__college', 'user__major', 'Type', 'Title', 'ApplyScore',
+    'review_status', 'result', 'Real_Score', 'reviewed_by__name', 'reviewed_by__school_id', 'reviewed_at',
+    'Feedback', 'attachment_count', 'UploadTime', 'ModifyTime',
+]
+
+# 支持的导出格式
+APPLICATION_EXPORT_FORMATS = ('xlsx', 'csv')
+
+# 导出内容格式版本：导出列或格式变化时修改，使已缓存的导出文件失效
+APPLICATION_EXPORT_VERSION = 1
+
+# 超过该行数的导出转为后台任务
+APPLICATION_EXPORT_ASYNC_ROWS = getattr(settings, 'APPLICATION_EXPORT_ASYNC_ROWS', 5000)
+
+TYPE_DISPLAY = dict(Application.APPLICATION_TYPES)
+STATUS_DISPLAY = dict(Application.REVIEW_STATUS)
+
+# 后台导出线程池（进程内，无需外部消息队列）
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'EXPORT_JOB_WORKERS', 1),
+    thread_name_prefix='export-job'
+)
+
+
+class ApplicationExporter:
+    """申请审核记录导出器：按学院、类型、状态和审核日期筛选，流式写出 CSV 或 Excel"""
+
+    @staticmethod
+    def parse_filters(params, request_user):
+        """
+        校验筛选参数，返回可序列化的筛选条件字典，参数错误时抛出 ValueError
+        老师只能导出本学院的申请
+        """
+        filters = {}
+
+        college = (params.get('college') or '').strip()
+        if request_user.user_type == 1:
+            if college and college != request_user.college:
+                raise PermissionError("老师只能导出本学院的申请")
+            college = request_user.college
+        if college:
+            filters['college'] = college
+
+        for name, choices, label in (('type', TYPE_DISPLAY, '申请类型'), ('status', STATUS_DISPLAY, '审核状态')):
+            value = params.get(name)
+            if value in (None, ''):
+                continue
+            try:
+                value = int(value)
+            except (ValueError, TypeError):
+                raise ValueError(f"{label}参数格式错误")
+            if value not in choices:
+                raise ValueError(f"{label}参数无效: {value}")
+            filters[name] = value
+
+        for name in ('review_start', 'review_end'):
+            value = params.get(name)
+            if not value:
+                continue
+            try:
+                datetime.strptime(value, '%Y-%m-%d')
+            except (ValueError, TypeError):
+                raise ValueError(f"{name} 日期格式错误，应为 YYYY-MM-DD")
+            filters[name] = value
+
+        if filters.get('review_start') and filters.get('review_end') \
+                and filters['review_start'] > filters['review_end']:
+            raise ValueError("审核开始日期不能晚于结束日期")
+
+        return filters
+
+    @staticmethod
+    def build_queryset(filters):
+        """
+        根据筛选条件构建查询集
+        审核日期换算为本地时区的时间范围，直接比较 reviewed_at 而不是按日期截取
+        """
+        queryset = Application.objects.all()
+
+        if 'college' in filters:
+            queryset = queryset.filter(user__college=filters['college'])
+        if 'type' in filters:
+            queryset = queryset.filter(Type=filters['type'])
+        if 'status' in filters:
+            queryset = queryset.filter(review_status=filters['status'])
+
+        current_timezone = timezone.get_current_timezone()
+        if 'review_start' in filters:
+            start = datetime.strptime(filters['review_start'], '%Y-%m-%d').replace(tzinfo=current_timezone)
+            queryset = queryset.filter(reviewed_at__gte=start)
+        if 'review_end' in filters:
+            end = datetime.strptime(filters['review_end'], '%Y-%m-%d').replace(tzinfo=current_timezone)
+            queryset = queryset.filter(reviewed_at__lt=end + timedelta(days=1))
+
+        return queryset
+
+    @staticmethod
+    def export_queryset(queryset):
+        """
+        导出查询：申请人和审核老师随 values() 一起 JOIN 查出，
+        附件数用关联子查询预先计算，避免逐行查询附件，也避免对整行 GROUP BY
+        """
+        through = Application.Attachments.through
+        attachment_counts = through.objects.filter(application_id=OuterRef('pk')) \
+            .values('application_id').annotate(count=Count('pk')).values('count')
+
+        return queryset.annotate(
+            attachment_count=Coalesce(Subquery(attachment_counts, output_field=IntegerField()), 0)
+        ).order_by('UploadTime', 'id').values(*APPLICATION_FIELDS)
+
+    @staticmethod
+    def export_fingerprint(queryset, filters, export_format):
+        """
+        计算导出输入的指纹，返回 (指纹, 申请数)
+        审核、修改申请都会更新 ModifyTime，因此由筛选条件、申请数和最后修改时间组成
+        """
+        stats = queryset.aggregate(count=Count('pk'), last_modified=Max('ModifyTime'))
+        source = json.dumps({
+            'version': APPLICATION_EXPORT_VERSION,
+            'type': 'applications',
+            'format': export_format,
+            'filters': filters,
+            'count': stats['count'],
+            'last_modified': stats['last_modified'],
+        }, sort_keys=True)
+        return hashlib.sha256(source.encode('utf-8')).hexdigest(), stats['count']
+
+    @staticmethod
+    def generate_filename(fingerprint, export_format):
+        """生成带时间戳和指纹的文件名"""
+        current_time = datetime.now()
+        compact_timestamp = current_time.strftime("%Y%m%d_%H%M%S_") + f"{current_time.microsecond // 1000:03d}"
+        return f"applications_export_{compact_timestamp}_{fingerprint[:FINGERPRINT_LENGTH]}.{export_format}"
+
+    @staticmethod
+    def format_timestamp(value):
+        """毫秒时间戳转为本地时间字符串"""
+        if not value:
+            return ''
+        return datetime.fromtimestamp(value / 1000, tz=timezone.get_current_timezone()).strftime('%Y-%m-%d %H:%M:%S')
+
+    @staticmethod
+    def application_row(values):
+        """由 values() 查询结果生成一行导出数据，顺序与导出列一致"""
+        reviewed_at = values['reviewed_at']
+        result = values['result']
+        return [
+            str(values['id']),
+            values['user__school_id'],
+            values['user__name'],
+            values['user__college'] or '',
+            values['user__major'] or '',
+            TYPE_DISPLAY.get(values['Type'], ''),
+            values['Title'],
+            UserExporter.format_decimal(values['ApplyScore']),
+            STATUS_DISPLAY.get(values['review_status'], ''),
+            '' if result is None else ('通过' if result else '不通过'),
+            UserExporter.format_decimal(values['Real_Score']),
+            values['reviewed_by__name'] or '',
+            values['reviewed_by__school_id'] or '',
+            timezone.localtime(reviewed_at).strftime('%Y-%m-%d %H:%M:%S') if reviewed_at else '',
+            values['Feedback'] or '',
+            values['attachment_count'],
+            ApplicationExporter.format_timestamp(values['UploadTime']),
+            ApplicationExporter.format_timestamp(values['ModifyTime']),
+        ]
+
+    @staticmethod
+    def export_applications(filters, request_user, export_format='xlsx', run_async=False):
+        """
+        导出申请审核记录，返回 (文件信息或任务信息, 是否转为后台任务)
+        导出内容未变化时复用已有文件；超过 APPLICATION_EXPORT_ASYNC_ROWS 行或指定 run_async 时提交后台任务
+        """
+        if export_format not in APPLICATION_EXPORT_FORMATS:
+            raise ValueError(f"不支持的导出格式: {export_format}，可选: {', '.join(APPLICATION_EXPORT_FORMATS)}")
+
+        print("=== 开始导出申请审核记录 ===")
+        print(f"📋 请求用户: {request_user.school_id} ({request_user.name})")
+        print(f"📋 筛选条件: {filters}，导出格式: {export_format}")
+
+        queryset = ApplicationExporter.build_queryset(filters)
+        fingerprint, application_count = ApplicationExporter.export_fingerprint(queryset, filters, export_format)
+        if application_count == 0:
+            raise ValueError("未找到符合条件的申请")
+
+        print(f"✅ 查询到 {application_count} 条申请")
+
+        # 只复用自己导出的文件（老师只能下载自己导出的文件）
+        manifest = UserExporter.find_cached_export(fingerprint, export_format, creator=request_user)
+        if manifest:
+            print(f"✅ 导出内容未变化，复用已有文件: {manifest.filename}")
+            return UserExporter.file_info(manifest, cached=True), False
+
+        manifest = ExportManifest.objects.create(
+            filename=ApplicationExporter.generate_filename(fingerprint, export_format),
+            export_format=export_format,
+            export_type='applications',
+            status='pending',
+            fingerprint=fingerprint,
+            creator=request_user,
+        )
+
+        if run_async or application_count > APPLICATION_EXPORT_ASYNC_ROWS:
+            _executor.submit(ApplicationExporter.run_job, manifest.id, filters)
+            print(f"✅ 导出任务已提交: {manifest.id} ({application_count} 条申请)")
+            return manifest.to_dict(), True
+
+        ApplicationExporter.write_export(manifest, filters)
+        manifest.refresh_from_db()
+        if manifest.status != 'success':
+            raise ValueError(manifest.error_message or "导出失败")
+        return UserExporter.file_info(manifest), False
+
+    @staticmethod
+    def write_export(manifest, filters):
+        """写出导出文件并更新导出文件索引，先写临时文件再替换，避免下载到写了一半的文件"""
+        ExportManifest.objects.filter(id=manifest.id).update(status='running')
+        start_time = time.time()
+        filepath = UserExporter.get_export_path(manifest.filename)
+        temp_path = f"{filepath}.tmp"
+
+        try:
+            values = ApplicationExporter.export_queryset(ApplicationExporter.build_queryset(filters))
+            rows = (
+                ApplicationExporter.application_row(row)
+                for row in values.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+            )
+            if manifest.export_format == 'xlsx':
+                row_count = UserExporter.write_rows_excel(APPLICATION_COLUMNS, rows, temp_path, '申请审核记录')
+            else:
+                row_count = UserExporter.write_rows_csv(APPLICATION_COLUMNS, rows, temp_path)
+            os.replace(temp_path, filepath)
+
+            ExportManifest.objects.filter(id=manifest.id).update(
+                status='success',
+                size=os.path.getsize(filepath),
+                row_count=row_count,
+                duration=time.time() - start_time,
+            )
+            print(f"✅ 导出文件保存成功: {manifest.filename}，耗时 {time.time() - start_time:.2f}秒")
+
+        except Exception as e:
+            traceback.print_exc()
+            ExportManifest.objects.filter(id=manifest.id).update(
+                status='failed',
+                error_message=str(e),
+                duration=time.time() - start_time,
+            )
+            print(f"❌ 导出失败: {manifest.filename} - {e}")
+
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    @staticmethod
+    def run_job(manifest_id, filters):
+        """在后台线程中执行导出任务"""
+        close_old_connections()
+        try:
+            manifest = ExportManifest.objects.get(id=manifest_id)
+            ApplicationExporter.write_export(manifest, filters)
+        finally:
+            # 工作线程不经过请求周期，需手动关闭数据库连接
+            connection.close()
@@ -0,0 +1,64 @@
+# utils/pagination.py
+import base64
+import json
+import uuid
+
+from django.conf import settings
+from django.db.models import Q
+
+# 待审核队列每页默认条数和最大条数
+PENDING_PAGE_SIZE = getattr(settings, 'PENDING_PAGE_SIZE', 20)
+PENDING_MAX_PAGE_SIZE = getattr(settings, 'PENDING_MAX_PAGE_SIZE', 100)
+
+
+class KeysetPagination:
+    """
+    按 (UploadTime, id) 游标分页：游标记录上一页最后一条的位置，下一页从该位置之后取，
+    不筛选类型时命中 (review_status, UploadTime, id) 索引，按类型筛选时命中 (review_status, Type, UploadTime) 索引，
+    都不需要额外排序，耗时与积压数量和页码无关
+    """
+
+    @staticmethod
+    def encode_cursor(application):
+        """由最后一条申请生成不透明游标"""
+        position = json.dumps([application.UploadTime, str(application.id)])
+        return base64.urlsafe_b64encode(position.encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """解析游标，返回 (UploadTime, id)，格式错误时抛出 ValueError"""
+        try:
+            upload_time, application_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            return int(upload_time), uuid.UUID(application_id)
+        except Exception:
+            raise ValueError("游标参数无效")
+
+    @staticmethod
+    def get_page_size(value):
+        """解析每页条数，限制在 1 ~ PENDING_MAX_PAGE_SIZE 之间"""
+        if value in (None, ''):
+            return PENDING_PAGE_SIZE
+        try:
+            page_size = int(value)
+        except (ValueError, TypeError):
+            raise ValueError("每页条数参数格式错误")
+        return max(1, min(page_size, PENDING_MAX_PAGE_SIZE))
+
+    @staticmethod
+    def paginate(queryset, cursor=None, page_size=PENDING_PAGE_SIZE):
+        """
+        取一页数据，返回 (本页申请列表, 下一页游标)，没有下一页时游标为 None
+        多取一条判断是否还有下一页，不需要 COUNT 查询
+        """
+        queryset = queryset.order_by('UploadTime', 'id')
+        if cursor:
+            upload_time, application_id = KeysetPagination.decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(UploadTime__gt=upload_time) | Q(UploadTime=upload_time, id__gt=application_id)
+            )
+
+        items = list(queryset[:page_size + 1])
+        if len(items) > page_size:
+            items = items[:page_size]
+            return items, KeysetPagination.encode_cursor(items[-1])
+        return items, None
@@ -23,6 +23,7 @@ from rest_framework.permissions import IsAuthenticated
 from django.db import transaction
 from user.models import User
 from score.models import AcademicPerformance
+from score.services.score_ledger import ScoreLedgerService
 
 from rest_framework.decorators import api_view, permission_classes
 
@@ -1371,11 +1372,16 @@ class ApplicationRevertToDraftView(APIView):
             with transaction.atomic():
                 application.review_status = 0
                 application.Real_Score = 0
+                application.result = None
+                application.reviewed_at = None
                 application.ModifyTime = int(time.time() * 1000)
-                application.save(update_fields=['review_status', 'Real_Score', 'ModifyTime'])
+                application.save(update_fields=['review_status', 'Real_Score', 'result', 'reviewed_at', 'ModifyTime'])
 
-                if application_type is not None and original_score > 0:
-                    self.update_academic_performance_score(application, original_score)
+                # 扣回该申请已计入的加分
+                if application_type is not None:
+                    ScoreLedgerService.post_application_score(
+                        application, 0, 'withdraw', operator=request.user, previous_amount=original_score
+                    )
 
             from .serializers import ApplicationListResponseSerializer
             serializer = ApplicationListResponseSerializer(application)
@@ -1393,112 +1399,6 @@ class ApplicationRevertToDraftView(APIView):
                 "data": None
             }, status=500)
 
-    def update_academic_performance_score(self, application, original_score):
-        """
-        更新学生学业成绩中的申请项目分数
-        """
-        try:
-            from score.models import AcademicPerformance
-            from decimal import Decimal
-
-            student = application.user
-            application_type = getattr(application, 'Type', getattr(application, 'application_type', None))
-
-            if application_type is None:
-                return False
-
-            try:
-                academic_perf = AcademicPerformance.objects.get(user=student)
-            except AcademicPerformance.DoesNotExist:
-                return False
-
-            score_list = list(academic_perf.applications_score)
-
-            while len(score_list) <= application_type:
-                score_list.append(0.0)
-
-            current_type_score = float(score_list[application_type]) if isinstance(score_list[application_type],
-                                                                                   (int, float, Decimal)) else 0.0
-            original_app_score = float(original_score)
-            new_score = max(0.0, current_type_score - original_app_score)
-            score_list[application_type] = new_score
-
-            processed_score_list = []
-            for score in score_list:
-                if isinstance(score, Decimal):
-                    processed_score_list.append(float(score))
-                elif isinstance(score, (int, float)):
-                    processed_score_list.append(score)
-                else:
-                    try:
-                        processed_score_list.append(float(score))
-                    except:
-                        processed_score_list.append(0.0)
-
-            academic_perf.applications_score = processed_score_list
-            self.recalculate_total_scores(academic_perf)
-            academic_perf.save()
-
-            return True
-
-        except Exception as e:
-            return False
-
-    def recalculate_total_scores(self, academic_perf):
-        """
-        重新计算学业专长成绩和总分
-        """
-        try:
-            from decimal import Decimal
-
-            if not isinstance(academic_perf.applications_score, list):
-                academic_perf.applications_score = [0.0] * 9
-
-            score_list = []
-            for item in academic_perf.applications_score:
-                if isinstance(item, Decimal):
-                    score_list.append(float(item))
-                elif isinstance(item, (int, float)):
-                    score_list.append(item)
-                else:
-                    try:
-                        score_list.append(float(item))
-                    except:
-                        score_list.append(0.0)
-
-            while len(score_list) < 9:
-                score_list.append(0.0)
-
-            academic_expertise_scores = []
-            for i in range(4):
-                score = score_list[i]
-                academic_expertise_scores.append(min(score, 5.0))
-
-            academic_expertise_total = sum(academic_expertise_scores)
-            academic_perf.academic_expertise_score = Decimal(str(min(academic_expertise_total, 15.0)))
-
-            comprehensive_scores = []
-            for i in range(4, 9):
-                score = score_list[i]
-                comprehensive_scores.append(min(score, 1.0))
-
-            comprehensive_total = sum(comprehensive_scores)
-            academic_perf.comprehensive_performance_score = Decimal(str(min(comprehensive_total, 5.0)))
-
-            academic_score = float(getattr(academic_perf, 'academic_score', 0.0))
-            total_score = (
-                    Decimal(str(academic_score)) +
-                    academic_perf.academic_expertise_score +
-                    academic_perf.comprehensive_performance_score
-            )
-
-            academic_perf.total_comprehensive_score = Decimal(str(min(float(total_score), 100.0)))
-
-        except Exception as e:
-            raise
-
-
-
 
 import logging
 from datetime import datetime, timedelta
@@ -1601,18 +1501,22 @@ def teacher_review_application_with_score(request):
         # 更新时间戳
         application.ModifyTime = int(time.time() * 1000)
 
-        # 记录审核老师
+        # 记录审核老师、审核结果和审核时间
         if hasattr(application, 'reviewed_by'):
             application.reviewed_by = request.user
+        application.result = bool(result)
+        application.reviewed_at = timezone.now()
 
-        # 🎯 关键：如果审核通过，更新学业成绩
-        if result:  # 审核通过
-            try:
-                update_academic_performance_score(application)
-            except Exception:
-                pass
+        with transaction.atomic():
+            application.save()
 
-        application.save()
+            # 🎯 关键：通过加分流水计入学业成绩（不通过计0），并发审核不会互相覆盖
+            ScoreLedgerService.post_application_score(
+                application,
+                application.Real_Score if result else 0,
+                'approve' if result else 'reject',
+                operator=request.user
+            )
 
         return Response({
             "success": True,
@@ -1791,16 +1695,20 @@ def teacher_update_review_with_score(request):
             if hasattr(application, 'last_reviewed_by'):
                 application.last_reviewed_by = request.user
 
+            # 重新审核：记录审核老师和审核时间，审核结果与当前状态一致
+            if application.review_status in [2, 3]:
+                application.reviewed_by = request.user
+                application.reviewed_at = timezone.now()
+                application.result = application.review_status == 2
+
             # 保存申请
             application.save()
 
-            # 9. 更新学业成绩
-            try:
-                application.refresh_from_db()
-                update_academic_performance_score(application)
-            except Exception:
-                # 学业成绩更新失败不影响主流程
-                pass
+            # 9. 通过加分流水更新学业成绩：只有审核通过的申请计入加分，与按申请重建加分的规则一致
+            ScoreLedgerService.post_application_score(
+                application, real_score if application.review_status == 2 else 0, 're_review',
+                operator=request.user, previous_amount=original_score
+            )
 
         # 10. 返回成功响应
         return Response({
@@ -1829,35 +1737,6 @@ def teacher_update_review_with_score(request):
         }, status=500)
 
 
-def update_academic_performance_score(application):
-    """
-    更新学业成绩表中的加分项
-    简化版：只更新分数，不进行复杂计算
-    """
-    try:
-        # 获取或创建学业成绩记录
-        academic_perf, created = AcademicPerformance.objects.get_or_create(
-            user=application.user,
-            defaults={'bonus_points': 0}
-        )
-
-        # 获取该申请类型对应的分数
-        score = getattr(application, 'Real_Score', getattr(application, 'RealScore', 0))
-        if score:
-            bonus_points = float(score)
-
-            if hasattr(academic_perf, 'bonus_points'):
-                academic_perf.bonus_points = bonus_points
-            elif hasattr(academic_perf, 'additional_score'):
-                academic_perf.additional_score = bonus_points
-
-            academic_perf.save()
-
-    except Exception:
-        # 允许失败，不影响主流程
-        pass
-
-
 @api_view(['POST', 'PUT'])
 @permission_classes([IsAuthenticated])
 def teacher_revoke_review(request):
@@ -1949,14 +1828,17 @@ def teacher_revoke_review(request):
         if hasattr(application, 'last_reviewed_by'):
             application.last_reviewed_by = request.user
 
-        # 撤销审核时重置学业成绩中的对应项目分数
-        try:
-            reset_academic_performance_score(application)
-        except Exception:
-            # 不阻断主流程，继续保存申请
-            pass
+        # 撤销后回到待审核，清空审核结果和审核时间
+        application.result = None
+        application.reviewed_at = None
 
-        application.save()
+        with transaction.atomic():
+            application.save()
+
+            # 撤销审核时扣回该申请计入的加分
+            ScoreLedgerService.post_application_score(
+                application, 0, 'revoke', operator=request.user, previous_amount=original_score
+            )
 
         return Response({
             "success": True,
@@ -1983,96 +1865,18 @@ def teacher_revoke_review(request):
         }, status=500)
 
 
-def reset_academic_performance_score(application):
-    """
-    撤销审核时重置学业成绩中的对应项目分数为0
-    """
-    try:
-        from django.db import transaction
-
-        with transaction.atomic():
-            student = application.user
-            academic_perf, created = AcademicPerformance.objects.get_or_create(
-                user=student
-            )
-
-            application_type = application.Type
-
-            # 根据申请类型重置对应的成绩字段为0
-            if application_type in AcademicPerformance.SCORE_TYPES:
-                academic_perf.set_score(application_type, 0)
-                recalculate_total_scores(academic_perf)
-                academic_perf.save()
-    except Exception as e:
-        raise
-
-
-def recalculate_total_scores(academic_perf):
-    """
-    重新计算学业专长成绩和总分
-    """
-    try:
-        from decimal import Decimal
-
-        # 计算学术专长成绩（前4项，满分15分）
-        academic_expertise_scores = []
-        for i in range(4):
-            if i < len(academic_perf.applications_score):
-                score = academic_perf.applications_score[i]
-                academic_expertise_scores.append(min(float(score), 5.0))
-
-        academic_expertise_total = sum(academic_expertise_scores)
-        academic_perf.academic_expertise_score = Decimal(str(min(academic_expertise_total, 15.0)))
-
-        # 计算综合表现成绩（后5项，满分5分）
-        comprehensive_scores = []
-        for i in range(4, 9):
-            if i < len(academic_perf.applications_score):
-                score = academic_perf.applications_score[i]
-                comprehensive_scores.append(min(float(score), 1.0))
-
-        comprehensive_total = sum(comprehensive_scores)
-        academic_perf.comprehensive_performance_score = Decimal(str(min(comprehensive_total, 5.0)))
-
-        # 计算总分
-        total_score = (
-                academic_perf.academic_score +
-                academic_perf.academic_expertise_score +
-                academic_perf.comprehensive_performance_score
-        )
-        academic_perf.total_comprehensive_score = Decimal(str(min(total_score, 100.0)))
-
-    except Exception as e:
-        raise
-
-
-def update_academic_performance_score(application):
-    """更新学业成绩表中的对应分数"""
-    try:
-        academic_perf, created = AcademicPerformance.objects.get_or_create(
-            user=application.user
-        )
-
-        score_type = application.Type
-        if application.ReviewStatus == 2:  # 审核通过
-            score_value = application.RealScore
-        else:  # 审核不通过或其他状态
-            score_value = 0
-
-        academic_perf.set_score(score_type, score_value)
-        academic_perf.save()
-
-    except Exception:
-        pass
-
-
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_pending_applications(request):
     """
-    老师获取所有待审核申请接口
-    GET /api/student/material/pending_list/
+    老师获取待审核申请接口（按上传时间游标分页）
+    GET /api/student/material/pending_list/?page_size=20&cursor=<上一页返回的 next_cursor>
     """
+    from django.db import connection
+    from django.db.models import Prefetch, TextField
+    from django.db.models.functions import Cast
+    from .utils.pagination import KeysetPagination
+
     # 权限验证 - 必须是老师
     if not request.user.is_teacher:
         return Response({
@@ -2099,14 +1903,32 @@ def get_pending_applications(request):
         if college:
             queryset = queryset.filter(user__college=college)
 
-        # 预取关联数据以提高性能
-        queryset = queryset.select_related('user')
+        # 预取关联数据：附件一次查询取完整页
+        queryset = queryset.select_related('user').prefetch_related(
+            Prefetch('Attachments', queryset=Attachment.objects.only('id', 'name', 'file_hash'))
+        )
+        # PostgreSQL 的 jsonb 转文本就是未转义的 UTF-8 JSON，直接读取文本，不再逐行解析后重新序列化；
+        # 其他数据库（如 SQLite）转出的文本会把中文转义为 \uXXXX，仍按原方式序列化
+        if connection.vendor == 'postgresql':
+            queryset = queryset.defer('extra_data').annotate(extra_data_text=Cast('extra_data', TextField()))
 
-        # 序列化数据 - 直接返回所有数据，不分页
-        serializer = SafeTeacherPendingApplicationListSerializer(queryset, many=True)
+        try:
+            page_size = KeysetPagination.get_page_size(request.GET.get('page_size'))
+            applications, next_cursor = KeysetPagination.paginate(
+                queryset, request.GET.get('cursor'), page_size
+            )
+        except ValueError as e:
+            return Response({
+                "error": str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = SafeTeacherPendingApplicationListSerializer(applications, many=True)
 
         return Response({
-            "ApplyList": serializer.data
+            "ApplyList": serializer.data,
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None
         }, status=status.HTTP_200_OK)
 
     except Exception as e:
@@ -2266,70 +2088,100 @@ def teacher_review_history(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-def update_academic_performance_score(application):
+class ApplicationExportView(APIView):
     """
-    更新学生学业成绩中的申请项目分数
+    申请审核记录导出接口（老师只能导出本学院）
+    POST /api/student/material/reviews/export/   提交导出，数据量大时转为后台任务
+    GET  /api/student/material/reviews/export/?job_id=<任务ID>   查询后台导出任务
     """
-    try:
-        from django.db import transaction
-        from decimal import Decimal
+    permission_classes = [IsAuthenticated]
 
-        with transaction.atomic():
-            # 获取学生和学业成绩记录
-            student = application.user
-            academic_perf, created = AcademicPerformance.objects.get_or_create(
-                user=student
+    def post(self, request):
+        from .utils.application_export import ApplicationExporter
+
+        if request.user.user_type not in [1, 2]:
+            return Response({
+                'success': False,
+                'message': '权限不足，只有老师和管理员可以导出申请',
+                'data': None
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            filters = ApplicationExporter.parse_filters(request.data, request.user)
+            run_async = str(request.data.get('async', '')).lower() in ('1', 'true', 'yes')
+            result, queued = ApplicationExporter.export_applications(
+                filters, request.user, request.data.get('format', 'xlsx'), run_async=run_async
             )
+        except PermissionError as e:
+            return Response({
+                'success': False,
+                'message': str(e),
+                'data': None
+            }, status=status.HTTP_403_FORBIDDEN)
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'message': str(e),
+                'data': None
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-            # 获取申请类型和实际得分
-            application_type = application.Type
-            real_score = getattr(application, 'Real_Score', getattr(application, 'RealScore', 0))
+        if queued:
+            return Response({
+                'success': True,
+                'message': '导出任务已提交，请通过 job_id 查询进度',
+                'data': {'job_id': result['id'], **result}
+            }, status=status.HTTP_202_ACCEPTED)
 
-            # 根据申请类型更新对应的成绩字段
-            if application_type in AcademicPerformance.SCORE_TYPES:
-                academic_perf.set_score(application_type, real_score)
+        return Response({
+            'success': True,
+            'message': '导出成功',
+            'data': result
+        }, status=status.HTTP_200_OK)
 
-                # 重新计算总分
-                recalculate_total_scores(academic_perf)
-                academic_perf.save()
-    except Exception as e:
-        raise
+    def get(self, request):
+        from django.core.exceptions import ValidationError
+        from user.models import ExportManifest
+        from user.utils.query_params import parse_limit
 
+        if request.user.user_type not in [1, 2]:
+            return Response({
+                'success': False,
+                'message': '权限不足',
+                'data': None
+            }, status=status.HTTP_403_FORBIDDEN)
 
-def recalculate_total_scores(academic_perf):
-    """
-    重新计算学业专长成绩和总分
-    """
-    try:
-        from decimal import Decimal
-
-        # 计算学术专长成绩（前4项，满分15分）
-        academic_expertise_scores = []
-        for i in range(4):  # 0-3: 学术竞赛、创新训练、学术研究、荣誉称号
-            if i < len(academic_perf.applications_score):
-                score = academic_perf.applications_score[i]
-                academic_expertise_scores.append(min(float(score), 5.0))  # 每项最高5分
-
-        academic_expertise_total = sum(academic_expertise_scores)
-        academic_perf.academic_expertise_score = Decimal(str(min(academic_expertise_total, 15.0)))  # 满分15分
-
-        # 计算综合表现成绩（后5项，满分5分）
-        comprehensive_scores = []
-        for i in range(4, 9):  # 4-8: 社会工作、志愿服务、国际实习、参军入伍、体育项目
-            if i < len(academic_perf.applications_score):
-                score = academic_perf.applications_score[i]
-                comprehensive_scores.append(min(float(score), 1.0))  # 每项最高1分
-
-        comprehensive_total = sum(comprehensive_scores)
-        academic_perf.comprehensive_performance_score = Decimal(str(min(comprehensive_total, 5.0)))  # 满分5分
-
-        # 计算总分（学业成绩 + 学术专长 + 综合表现）
-        total_score = (
-                academic_perf.academic_score +
-                academic_perf.academic_expertise_score +
-                academic_perf.comprehensive_performance_score
-        )
-        academic_perf.total_comprehensive_score = Decimal(str(min(total_score, 100.0)))  # 满分100分
+        manifests = ExportManifest.objects.select_related('creator').filter(export_type='applications')
+        if request.user.user_type == 1:
+            manifests = manifests.filter(creator=request.user)
 
-    except Exception as e:
-        raise
\ No newline at end of file
+        job_id = request.query_params.get('job_id')
+        if job_id:
+            try:
+                manifest = manifests.get(id=job_id)
+            except (ExportManifest.DoesNotExist, ValidationError):
+                return Response({
+                    'success': False,
+                    'message': f'导出任务 {job_id} 不存在',
+                    'data': None
+                }, status=status.HTTP_404_NOT_FOUND)
+
+            return Response({
+                'success': True,
+                'message': '获取导出任务成功',
+                'data': manifest.to_dict()
+            }, status=status.HTTP_200_OK)
+
+        try:
+            limit = parse_limit(request.query_params.get('limit'))
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'message': str(e),
+                'data': None
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'success': True,
+            'message': '获取导出任务列表成功',
+            'data': [manifest.to_dict() for manifest in manifests[:limit]]
+        }, status=status.HTTP_200_OK)
@@ -8,6 +8,7 @@ urlpatterns = [
     path('student-performance/my_performance/', views.get_student_scores, name='student-scores'),
     path('std_score/', views.CalculateScoresView.as_view(), name='calculate_scores'),
     path('std_rank/', views.StudentRankingView.as_view(), name='student_rankings'),
+    path('std_statistics/', views.ScoreStatisticsView.as_view(), name='score_statistics'),
 
     # path('student-performance/my_performance/',views.StudentPerformanceViewSet.as_view({'get':'my_performance'}),name='student-performance'),
     # path('student-performance/by_student_id/',views.StudentPerformanceViewSet.as_view({'get':'by_student_id'}),name='student-performance'),
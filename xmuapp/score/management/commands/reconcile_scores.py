@@ -0,0 +1,34 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from score.services.rank_index import get_score_version
+from score.services.score_calculation import ScoreCalculationService
+
+
+class Command(BaseCommand):
+    help = ('根据审核通过的申请重建学生加分向量并修正各项分数（可用于每晚定时对账）；'
+            '有记录更新时递增数据库中的成绩版本号，正在运行的服务随之重建排名索引和统计缓存')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='只输出差异报告，不写数据库')
+        parser.add_argument('--batch-size', type=int, default=2000, help='bulk_update 每批条数')
+        parser.add_argument('--report', help='差异报告输出文件（JSON）')
+
+    def handle(self, *args, **options):
+        version_before = get_score_version()
+        report = ScoreCalculationService.reconcile_application_scores(
+            dry_run=options['dry_run'],
+            batch_size=options['batch_size'],
+        )
+        report['score_version'] = {'before': version_before, 'after': get_score_version()}
+
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"对账完成: {report['students']} 名学生，{report['mismatched']} 条不一致，"
+            f"已更新 {report['updated']} 条，耗时 {report['elapsed']} 秒，"
+            f"成绩版本号 {version_before} -> {report['score_version']['after']}"
+        ))
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:04
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('score', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='academicperformance',
+            name='current_rank',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='academicperformance',
+            name='total_students_in_dimension',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='RankingSnapshot',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('term', models.CharField(max_length=20, verbose_name='学期')),
+                ('dimension', models.CharField(choices=[('专业', '专业排名'), ('学院', '学院排名'), ('全校', '全校排名'), ('年级', '年级排名')], max_length=10, verbose_name='排名维度')),
+                ('partition_key', models.CharField(blank=True, default='', max_length=255, verbose_name='分组键')),
+                ('score', models.DecimalField(decimal_places=4, default=0, max_digits=7, verbose_name='综合成绩')),
+                ('rank', models.IntegerField(verbose_name='排名')),
+                ('total_in_dimension', models.IntegerField(verbose_name='维度总人数')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ranking_snapshots', to=settings.AUTH_USER_MODEL, verbose_name='用户')),
+            ],
+            options={
+                'verbose_name': '排名快照',
+                'verbose_name_plural': '排名快照',
+                'db_table': 'ranking_snapshot',
+                'indexes': [models.Index(fields=['term', 'dimension', 'partition_key', 'rank'], name='ranking_sna_term_831931_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'dimension', 'term'), name='uniq_ranking_snapshot')],
+            },
+        ),
+    ]
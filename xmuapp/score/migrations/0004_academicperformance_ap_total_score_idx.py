@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('score', '0003_academicperformance_current_rank_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='academicperformance',
+            index=models.Index(fields=['total_comprehensive_score'], name='ap_total_score_idx'),
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:09
+
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations, models
+
+SCORE_COLUMNS = [
+    'academic_competitions_score',
+    'innovation_projects_score',
+    'academic_study_score',
+    'honorary_titles_score',
+    'social_works_score',
+    'volunteer_services_score',
+    'international_internships_score',
+    'military_services_score',
+    'sports_competitions_score',
+]
+
+
+def backfill_score_columns(apps, schema_editor):
+    """用 applications_score JSON 回填各类加分列"""
+    AcademicPerformance = apps.get_model('score', 'AcademicPerformance')
+
+    batch = []
+    for perf in AcademicPerformance.objects.only('id', 'applications_score').iterator(chunk_size=2000):
+        score_list = perf.applications_score if isinstance(perf.applications_score, list) else []
+        for index, column in enumerate(SCORE_COLUMNS):
+            value = score_list[index] if index < len(score_list) else 0
+            try:
+                setattr(perf, column, Decimal(str(value)).quantize(Decimal('0.0001')))
+            except (ValueError, InvalidOperation):
+                setattr(perf, column, Decimal('0'))
+        batch.append(perf)
+
+        if len(batch) >= 2000:
+            AcademicPerformance.objects.bulk_update(batch, SCORE_COLUMNS)
+            batch = []
+
+    if batch:
+        AcademicPerformance.objects.bulk_update(batch, SCORE_COLUMNS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('score', '0004_academicperformance_ap_total_score_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='academicperformance',
+            name='academic_competitions_score',
+            field=models.DecimalField(decimal_places=4, default=0, max_digits=7, verbose_name='学术竞赛加分'),
+        ),
+        migrations.AddField(
+            model_name='academicperformance',
+            name='academic_study_score',
+            field=models.DecimalField(decimal_places=4, default=0, max_digits=7, verbose_name='学术研究加分'),
+        ),
+        migrations.AddField(
+            model_name='academicperformance',
+            name='honorary_titles_score',
+            field=models.DecimalField(decimal_places=4, default=0, max_digits=7, verbose_name='荣誉称号加分'),
+        ),
+        migrations.AddField(
+            model_name='academicperformance',
+            name='innovation_projects_score',
+            field=models.DecimalField(decimal_places=4, default=0, max_digits=7, verbose_name='创新训练加分'),
+        ),
+        migrations.AddField(
+            model_name='academicperformance',
+            name='international_internships_score',
+            field=models.DecimalField(decimal_places=4, default=0, max_digits=7, verbose_name='国际实习加分'),
+        ),
+        migrations.AddField(
+            model_name='academicperformance',
+            name='military_services_score',
+            field=models.DecimalField(decimal_places=4, default=0, max_digits=7, verbose_name='参军入伍加分'),
+        ),
+        migrations.AddField(
+            model_name='academicperformance',
+            name='social_works_score',
+            field=models.DecimalField(decimal_places=4, default=0, max_digits=7, verbose_name='社会工作加分'),
+        ),
+        migrations.AddField(
+            model_name='academicperformance',
+            name='sports_competitions_score',
+            field=models.DecimalField(decimal_places=4, default=0, max_digits=7, verbose_name='体育项目加分'),
+        ),
+        migrations.AddField(
+            model_name='academicperformance',
+            name='volunteer_services_score',
+            field=models.DecimalField(decimal_places=4, default=0, max_digits=7, verbose_name='志愿服务加分'),
+        ),
+        migrations.RunPython(backfill_score_columns, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:11
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application', '0004_alter_attachment_file_hash'),
+        ('score', '0005_academicperformance_score_columns'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreLedgerEntry',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('category', models.IntegerField(verbose_name='加分类别')),
+                ('amount', models.DecimalField(decimal_places=4, max_digits=7, verbose_name='变动分数')),
+                ('reason', models.CharField(choices=[('opening', '期初余额'), ('approve', '审核通过'), ('reject', '审核不通过'), ('re_review', '重新审核'), ('revoke', '撤销审核'), ('withdraw', '撤回至草稿')], max_length=20, verbose_name='变动原因')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('application', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='score_ledger_entries', to='application.application', verbose_name='申请')),
+                ('operator', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='operated_score_ledger_entries', to=settings.AUTH_USER_MODEL, verbose_name='操作人')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_ledger_entries', to=settings.AUTH_USER_MODEL, verbose_name='学生')),
+            ],
+            options={
+                'verbose_name': '加分流水',
+                'verbose_name_plural': '加分流水',
+                'db_table': 'score_ledger',
+                'indexes': [models.Index(fields=['application', 'created_at'], name='score_ledge_applica_8d9d3a_idx'), models.Index(fields=['user', 'category'], name='score_ledge_user_id_1b845a_idx')],
+            },
+        ),
+    ]
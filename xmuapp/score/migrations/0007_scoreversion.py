@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('score', '0006_scoreledgerentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreVersion',
+            fields=[
+                ('key', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='键')),
+                ('version', models.BigIntegerField(default=0, verbose_name='版本号')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': '成绩版本号',
+                'verbose_name_plural': '成绩版本号',
+                'db_table': 'score_version',
+            },
+        ),
+    ]
@@ -41,6 +41,29 @@ class AcademicPerformance(models.Model):
         8: 'sports_competitions',  # 体育项目成绩
     }
 
+    # 各类加分的独立列（与 applications_score 同步，便于数据库内汇总、筛选、排序）
+    academic_competitions_score = models.DecimalField(max_digits=7, decimal_places=4, default=0,
+                                                      verbose_name='学术竞赛加分')
+    innovation_projects_score = models.DecimalField(max_digits=7, decimal_places=4, default=0,
+                                                    verbose_name='创新训练加分')
+    academic_study_score = models.DecimalField(max_digits=7, decimal_places=4, default=0,
+                                               verbose_name='学术研究加分')
+    honorary_titles_score = models.DecimalField(max_digits=7, decimal_places=4, default=0,
+                                                verbose_name='荣誉称号加分')
+    social_works_score = models.DecimalField(max_digits=7, decimal_places=4, default=0,
+                                             verbose_name='社会工作加分')
+    volunteer_services_score = models.DecimalField(max_digits=7, decimal_places=4, default=0,
+                                                   verbose_name='志愿服务加分')
+    international_internships_score = models.DecimalField(max_digits=7, decimal_places=4, default=0,
+                                                          verbose_name='国际实习加分')
+    military_services_score = models.DecimalField(max_digits=7, decimal_places=4, default=0,
+                                                  verbose_name='参军入伍加分')
+    sports_competitions_score = models.DecimalField(max_digits=7, decimal_places=4, default=0,
+                                                    verbose_name='体育项目加分')
+
+    # 成绩索引 -> 对应列名
+    SCORE_COLUMNS = {k: f'{v}_score' for k, v in SCORE_TYPES.items()}
+
     academic_score = models.DecimalField(max_digits=7, decimal_places=4, verbose_name='学业成绩(满分80分)', default=0)
     academic_expertise_score = models.DecimalField(max_digits=7, decimal_places=4,
                                                    verbose_name='学术专长成绩(满分15分)', default=0)
@@ -49,6 +72,10 @@ class AcademicPerformance(models.Model):
     total_comprehensive_score = models.DecimalField(max_digits=7, decimal_places=4, verbose_name='综合成绩(满分100分)',
                                                     default=0)
 
+    # 绩点取值范围（导入时超出范围修正到边界）和综合总分上限
+    GPA_RANGE = (0, 5)
+    TOTAL_SCORE_CAP = 100.0
+
     # 时间戳
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -57,6 +84,9 @@ class AcademicPerformance(models.Model):
         db_table = 'academic_performance'
         verbose_name = '学业成绩'
         verbose_name_plural = '学业成绩'
+        indexes = [
+            models.Index(fields=['total_comprehensive_score'], name='ap_total_score_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.name}的学业成绩"
@@ -87,6 +117,28 @@ class AcademicPerformance(models.Model):
             while len(self.applications_score) <= index:
                 self.applications_score.append(0)
             self.applications_score[index] = float(value)
+            if index in self.SCORE_COLUMNS:
+                setattr(self, self.SCORE_COLUMNS[index], decimal.Decimal(str(value)))
+
+    @classmethod
+    def score_columns_from_list(cls, score_list):
+        """把 applications_score 列表转换为 {列名: Decimal}"""
+        if not isinstance(score_list, list):
+            score_list = []
+
+        columns = {}
+        for index, column in cls.SCORE_COLUMNS.items():
+            value = score_list[index] if index < len(score_list) else 0
+            try:
+                columns[column] = decimal.Decimal(str(value)).quantize(decimal.Decimal('0.0001'))
+            except (ValueError, decimal.InvalidOperation):
+                columns[column] = decimal.Decimal('0')
+        return columns
+
+    def sync_score_columns(self):
+        """用 applications_score 同步各类加分列"""
+        for column, value in self.score_columns_from_list(self.applications_score).items():
+            setattr(self, column, value)
 
     def calculate_academic_score(self):
         """计算学术分数：GPA / 4 × 80"""
@@ -108,7 +160,7 @@ class AcademicPerformance(models.Model):
             return decimal.Decimal('0.00')
 
     def calculate_total_comprehensive_score(self):
-        """计算综合总分"""
+        """计算综合总分，不超过 TOTAL_SCORE_CAP"""
         # 确保academic_score已计算
         if self.academic_score is None:
             self.calculate_academic_score()
@@ -124,67 +176,53 @@ class AcademicPerformance(models.Model):
                 comprehensive_performance
         )
 
-        # 保留两位小数
-        total_score = total_score.quantize(decimal.Decimal('0.00'))
+        # 保留两位小数，总分封顶
+        total_score = min(total_score.quantize(decimal.Decimal('0.00')), decimal.Decimal(str(self.TOTAL_SCORE_CAP)))
 
         # 更新字段
         self.total_comprehensive_score = total_score
         return total_score
 
+    def ranking_filter_kwargs(self, dimension='专业'):
+        """获取指定维度下同组学生的筛选条件"""
+        user = self.user
+        if dimension == '专业':
+            return {'user__college': user.college, 'user__major': user.major}
+        if dimension == '学院':
+            return {'user__college': user.college}
+        if dimension == '年级':
+            return {'user__grade': user.grade}
+        return {}
+
     def update_ranking(self, dimension='专业'):
         """更新指定维度的排名
 
+        排名 = 同组内分数严格更高的人数 + 1（标准竞赛排名，并列同名次），
+        一次聚合查询同时得到排名和组内总人数。
+
         Args:
-            dimension: 排名维度 ('专业', '学院', '全校')
+            dimension: 排名维度 ('专业', '学院', '全校', '年级')
         """
-        from django.db.models import Count
-
-        # 确定筛选条件
-        user = self.user
-        filter_kwargs = {}
+        from django.db.models import Count, Q
 
-        if dimension == '专业':
-            filter_kwargs = {
-                'user__major': user.major,
-                'user__college': user.college
-            }
-        elif dimension == '学院':
-            filter_kwargs = {'user__college': user.college}
-        elif dimension == '全校':
-            filter_kwargs = {}
-
-        # 获取该维度所有学生的成绩记录
-        queryset = AcademicPerformance.objects.filter(
-            **filter_kwargs,
+        stats = AcademicPerformance.objects.filter(
+            **self.ranking_filter_kwargs(dimension),
             total_comprehensive_score__isnull=False
-        ).order_by('-total_comprehensive_score')
-
-        # 计算排名（并列排名处理）
-        current_score = self.total_comprehensive_score
-        rank = 1
-        same_score_count = 0
-
-        for idx, record in enumerate(queryset, start=1):
-            if idx == 1:
-                previous_score = record.total_comprehensive_score
-
-            if record.total_comprehensive_score == current_score:
-                same_score_count += 1
-                if record.id == self.id:
-                    # 找到当前学生
-                    break
-            elif record.total_comprehensive_score < current_score:
-                # 如果当前学生分数更高，应该已经找到了
-                pass
+        ).aggregate(
+            higher=Count('id', filter=Q(total_comprehensive_score__gt=self.total_comprehensive_score)),
+            total=Count('id')
+        )
+
+        rank = stats['higher'] + 1
 
         # 更新排名信息
         self.current_rank = rank
         self.ranking_dimension = dimension
-        self.total_students_in_dimension = queryset.count()
+        self.total_students_in_dimension = stats['total']
 
         return {
             'rank': rank,
-            'total': queryset.count(),
+            'total': stats['total'],
             'dimension': dimension
         }
 
@@ -196,5 +234,97 @@ class AcademicPerformance(models.Model):
         # 计算综合总分
         self.calculate_total_comprehensive_score()
 
+        # 同步各类加分列
+        self.sync_score_columns()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'applications_score' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | set(self.SCORE_COLUMNS.values())
+
         # 调用父类保存
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+
+class RankingSnapshot(models.Model):
+    """排名快照：学生 × 排名维度 × 学期，各维度排名互不覆盖"""
+    DIMENSIONS = [
+        ('专业', '专业排名'),
+        ('学院', '学院排名'),
+        ('全校', '全校排名'),
+        ('年级', '年级排名'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='ranking_snapshots',
+                             verbose_name='用户')
+    term = models.CharField(max_length=20, verbose_name='学期')  # 如：2025-2026-1
+    dimension = models.CharField(max_length=10, choices=DIMENSIONS, verbose_name='排名维度')
+    partition_key = models.CharField(max_length=255, blank=True, default='', verbose_name='分组键')  # 如：学院/专业
+    score = models.DecimalField(max_digits=7, decimal_places=4, default=0, verbose_name='综合成绩')
+    rank = models.IntegerField(verbose_name='排名')
+    total_in_dimension = models.IntegerField(verbose_name='维度总人数')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'ranking_snapshot'
+        verbose_name = '排名快照'
+        verbose_name_plural = '排名快照'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'dimension', 'term'], name='uniq_ranking_snapshot'),
+        ]
+        indexes = [
+            models.Index(fields=['term', 'dimension', 'partition_key', 'rank']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.term} {self.dimension}: {self.rank}/{self.total_in_dimension}"
+
+
+class ScoreLedgerEntry(models.Model):
+    """加分流水（只追加）：每次审核变动记一笔某申请在某类别上的加分或扣分"""
+    REASONS = [
+        ('opening', '期初余额'),
+        ('approve', '审核通过'),
+        ('reject', '审核不通过'),
+        ('re_review', '重新审核'),
+        ('revoke', '撤销审核'),
+        ('withdraw', '撤回至草稿'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='score_ledger_entries',
+                             verbose_name='学生')
+    application = models.ForeignKey('application.Application', on_delete=models.SET_NULL, null=True, blank=True,
+                                    related_name='score_ledger_entries', verbose_name='申请')
+    category = models.IntegerField(verbose_name='加分类别')  # 对应 AcademicPerformance.SCORE_TYPES 的索引
+    amount = models.DecimalField(max_digits=7, decimal_places=4, verbose_name='变动分数')  # 正数加分，负数扣分
+    reason = models.CharField(max_length=20, choices=REASONS, verbose_name='变动原因')
+    operator = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True,
+                                 related_name='operated_score_ledger_entries', verbose_name='操作人')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'score_ledger'
+        verbose_name = '加分流水'
+        verbose_name_plural = '加分流水'
+        indexes = [
+            models.Index(fields=['application', 'created_at']),
+            models.Index(fields=['user', 'category']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.category}: {self.amount:+}"
+
+
+class ScoreVersion(models.Model):
+    """成绩变更版本号（单行计数表）：所有进程共用，成绩变更提交后递增，依赖成绩的内存索引和缓存据此失效"""
+    key = models.CharField(max_length=50, primary_key=True, verbose_name='键')
+    version = models.BigIntegerField(default=0, verbose_name='版本号')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'score_version'
+        verbose_name = '成绩版本号'
+        verbose_name_plural = '成绩版本号'
+
+    def __str__(self):
+        return f"{self.key}: {self.version}"
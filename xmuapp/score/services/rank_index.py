@@ -0,0 +1,198 @@
+# services/rank_index.py
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from score.models import AcademicPerformance, ScoreVersion
+
+SCORE_VERSION_KEY = 'score'
+
+
+def get_score_version():
+    """获取当前成绩变更版本号（存于数据库，所有进程和 worker 读到的是同一个值）"""
+    version = ScoreVersion.objects.filter(key=SCORE_VERSION_KEY).values_list('version', flat=True).first()
+    return version or 0
+
+
+def _increment_score_version():
+    """版本号原子递增，计数行不存在时创建"""
+    updated = ScoreVersion.objects.filter(key=SCORE_VERSION_KEY).update(
+        version=F('version') + 1, updated_at=timezone.now()
+    )
+    if not updated:
+        try:
+            with transaction.atomic():
+                ScoreVersion.objects.create(key=SCORE_VERSION_KEY, version=1)
+        except IntegrityError:
+            # 并发请求已创建计数行
+            ScoreVersion.objects.filter(key=SCORE_VERSION_KEY).update(
+                version=F('version') + 1, updated_at=timezone.now()
+            )
+
+
+def bump_score_version():
+    """成绩发生变化时递增版本号，使依赖成绩的内存索引和缓存失效
+
+    在事务提交后才递增：否则其他请求可能在提交前读到新版本号，
+    用未提交的旧数据重建索引并缓存到新版本下，直到下一次写入才会失效。
+    不在事务中时立即递增。同一事务内多次调用会在提交后各递增一次，
+    只是一次单行更新，版本号只需变化，不要求连续。
+    """
+    transaction.on_commit(_increment_score_version)
+
+
+class RankIndex:
+    """单个排名维度的内存排名索引
+
+    每个分组保存按分数降序排列的分数数组（取负后升序存储，便于bisect）
+    和对应的用户ID列表，另有 用户ID -> (分组键, 位置) 映射。
+    排名为标准竞赛排名：名次 = 分数严格更高的人数 + 1。
+    """
+
+    # 维度 -> 分组字段
+    PARTITIONS = {
+        '专业': ('user__college', 'user__major'),
+        '学院': ('user__college',),
+        '全校': (),
+        '年级': ('user__grade',),
+    }
+
+    def __init__(self, dimension):
+        if dimension not in self.PARTITIONS:
+            raise ValueError(f'不支持的排名维度: {dimension}')
+        self.dimension = dimension
+        self.version = None
+        self.partitions = {}
+        self.positions = {}
+        self.build_time = 0.0
+        self.built_at = None
+
+    def build(self, version):
+        """用一次 values_list 查询构建索引"""
+        start_time = time.perf_counter()
+        fields = self.PARTITIONS[self.dimension]
+
+        rows = AcademicPerformance.objects.filter(
+            total_comprehensive_score__isnull=False
+        ).order_by('-total_comprehensive_score').values_list(
+            'user_id', 'total_comprehensive_score', *fields
+        )
+
+        partitions = {}
+        for row in rows.iterator(chunk_size=2000):
+            key = tuple(row[2:])
+            neg_scores, user_ids = partitions.setdefault(key, (array('d'), []))
+            neg_scores.append(-float(row[1]))
+            user_ids.append(row[0])
+
+        positions = {}
+        for key, (_, user_ids) in partitions.items():
+            for idx, user_id in enumerate(user_ids):
+                positions[user_id] = (key, idx)
+
+        self.partitions = partitions
+        self.positions = positions
+        self.version = version
+        self.build_time = time.perf_counter() - start_time
+        self.built_at = time.time()
+        return self
+
+    def partition_key_for(self, college=None, major=None, grade=None):
+        """根据查询参数得到分组键"""
+        values = {'user__college': college, 'user__major': major, 'user__grade': grade}
+        return tuple(values[f] for f in self.PARTITIONS[self.dimension])
+
+    def _rank_at(self, neg_scores, idx):
+        return bisect_left(neg_scores, neg_scores[idx]) + 1
+
+    def partition_size(self, key):
+        partition = self.partitions.get(key)
+        return len(partition[1]) if partition else 0
+
+    def page(self, key, page, page_size):
+        """获取分组内某一页，返回 [(名次, 用户ID, 分数)]"""
+        partition = self.partitions.get(key)
+        if not partition:
+            return []
+        neg_scores, user_ids = partition
+        start = max(page - 1, 0) * page_size
+        end = min(start + page_size, len(user_ids))
+        return [
+            (self._rank_at(neg_scores, idx), user_ids[idx], -neg_scores[idx])
+            for idx in range(start, end)
+        ]
+
+    def rank_of(self, user_id):
+        """获取学生名次，返回 (名次, 组内人数)，不在索引中返回 None"""
+        position = self.positions.get(user_id)
+        if position is None:
+            return None
+        key, idx = position
+        neg_scores, user_ids = self.partitions[key]
+        return self._rank_at(neg_scores, idx), len(user_ids)
+
+    def neighbours(self, user_id, count=5):
+        """获取学生前后各 count 名同组学生，返回 [(名次, 用户ID, 分数)]"""
+        position = self.positions.get(user_id)
+        if position is None:
+            return []
+        key, idx = position
+        neg_scores, user_ids = self.partitions[key]
+        start = max(idx - count, 0)
+        end = min(idx + count + 1, len(user_ids))
+        return [
+            (self._rank_at(neg_scores, i), user_ids[i], -neg_scores[i])
+            for i in range(start, end)
+        ]
+
+    def memory_bytes(self):
+        """估算索引占用内存（字节）"""
+        size = sys.getsizeof(self.partitions) + sys.getsizeof(self.positions)
+        for key, (neg_scores, user_ids) in self.partitions.items():
+            size += sys.getsizeof(key) + sys.getsizeof(neg_scores) + sys.getsizeof(user_ids)
+            size += sum(sys.getsizeof(user_id) for user_id in user_ids)
+        size += sum(sys.getsizeof(position) for position in self.positions.values())
+        return size
+
+    def stats(self):
+        """索引监控信息"""
+        return {
+            'dimension': self.dimension,
+            'version': self.version,
+            'students': len(self.positions),
+            'partitions': len(self.partitions),
+            'build_time': round(self.build_time, 4),
+            'built_at': self.built_at,
+            'memory_bytes': self.memory_bytes(),
+        }
+
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def get_rank_index(dimension):
+    """获取指定维度的排名索引，成绩版本变化时自动重建"""
+    version = get_score_version()
+    index = _indexes.get(dimension)
+    if index is not None and index.version == version:
+        return index
+
+    with _lock:
+        index = _indexes.get(dimension)
+        if index is None or index.version != version:
+            index = RankIndex(dimension).build(version)
+            _indexes[dimension] = index
+            print(f"✅ 重建 {dimension} 排名索引: {len(index.positions)} 名学生，耗时 {index.build_time:.3f}秒")
+        return index
+
+
+def rank_index_stats():
+    """所有已构建索引的监控信息"""
+    return {dimension: index.stats() for dimension, index in _indexes.items()}
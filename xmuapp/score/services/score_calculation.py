@@ -1,13 +1,28 @@
 # services/score_calculation.py
 import decimal
-from django.db import transaction
-from django.db.models import F, Func, Count
-from score.models import AcademicPerformance
+import time
+
+from django.db import transaction, connection, DatabaseError
+from django.db.models import F, Func, Count, Q, Value, DecimalField
+from django.db.models.functions import Least
+from django.utils import timezone
+from score.models import AcademicPerformance, RankingSnapshot
+from score.services.rank_index import bump_score_version
+from user.models import User
 
 
 class ScoreCalculationService:
     """分数计算与排名服务"""
 
+    # 加分上限：前4类（学术专长）每项5分、合计15分；后5类（综合表现）每项1分、合计5分
+    EXPERTISE_CATEGORIES = slice(0, 4)
+    COMPREHENSIVE_CATEGORIES = slice(4, 9)
+    EXPERTISE_ITEM_CAP = 5.0
+    EXPERTISE_TOTAL_CAP = 15.0
+    COMPREHENSIVE_ITEM_CAP = 1.0
+    COMPREHENSIVE_TOTAL_CAP = 5.0
+    TOTAL_SCORE_CAP = AcademicPerformance.TOTAL_SCORE_CAP
+
     @staticmethod
     def batch_calculate_academic_scores():
         """批量计算所有学生的学术分数"""
@@ -26,6 +41,7 @@ class ScoreCalculationService:
                     output_field=DecimalField(max_digits=5, decimal_places=2)
                 )
             ).update(academic_score=F('calculated_score'))
+            bump_score_version()
 
             print(f"✅ 成功更新 {updated_count} 条学术分数记录")
             return updated_count
@@ -45,14 +61,17 @@ class ScoreCalculationService:
             # 确保academic_score已计算
             ScoreCalculationService.batch_calculate_academic_scores()
 
-            # 计算综合总分
+            # 计算综合总分（封顶规则与 AcademicPerformance.calculate_total_comprehensive_score 一致）
             updated_count = AcademicPerformance.objects.update(
-                total_comprehensive_score=(
-                        F('academic_score') +
-                        F('academic_expertise_score') +
-                        F('comprehensive_performance_score')
+                total_comprehensive_score=Least(
+                    F('academic_score') +
+                    F('academic_expertise_score') +
+                    F('comprehensive_performance_score'),
+                    Value(decimal.Decimal(str(AcademicPerformance.TOTAL_SCORE_CAP))),
+                    output_field=DecimalField(max_digits=7, decimal_places=4)
                 )
             )
+            bump_score_version()
 
             print(f"✅ 成功更新 {updated_count} 条综合总分记录")
             return updated_count
@@ -63,136 +82,561 @@ class ScoreCalculationService:
             traceback.print_exc()
             return 0
 
+    # 排名维度 -> 分区字段（user表上的列）
+    RANKING_PARTITIONS = {
+        '专业': ('college', 'major'),
+        '学院': ('college',),
+        '全校': (),
+        '年级': ('grade',),
+    }
+
     @staticmethod
-    def batch_update_rankings(dimension='专业'):
-        """批量更新指定维度的排名
+    def apply_bonus_caps(academic_perf):
+        """按加分上限由 applications_score 计算学术专长、综合表现和综合总分"""
+        service = ScoreCalculationService
+        scores = [service._to_float(academic_perf.get_score(i)) for i in range(len(AcademicPerformance.SCORE_TYPES))]
 
-        Args:
-            dimension: 排名维度 ('专业', '学院', '全校')
+        expertise = min(sum(min(v, service.EXPERTISE_ITEM_CAP) for v in scores[service.EXPERTISE_CATEGORIES]),
+                        service.EXPERTISE_TOTAL_CAP)
+        comprehensive = min(sum(min(v, service.COMPREHENSIVE_ITEM_CAP) for v in scores[service.COMPREHENSIVE_CATEGORIES]),
+                            service.COMPREHENSIVE_TOTAL_CAP)
+
+        academic_perf.academic_expertise_score = decimal.Decimal(str(round(expertise, 4)))
+        academic_perf.comprehensive_performance_score = decimal.Decimal(str(round(comprehensive, 4)))
+        academic_perf.calculate_total_comprehensive_score()
+
+    @staticmethod
+    def _partition_columns(dimension):
+        """获取维度对应的分区列，未知维度抛出ValueError"""
+        if dimension not in ScoreCalculationService.RANKING_PARTITIONS:
+            raise ValueError(f'不支持的排名维度: {dimension}')
+        return ScoreCalculationService.RANKING_PARTITIONS[dimension]
+
+    @staticmethod
+    def _supports_update_from():
+        """当前数据库是否支持 UPDATE ... FROM 与窗口函数"""
+        if connection.vendor == 'postgresql':
+            return True
+        if connection.vendor == 'sqlite':
+            import sqlite3
+            # UPDATE ... FROM 需要 SQLite 3.33+
+            return sqlite3.sqlite_version_info >= (3, 33, 0)
+        return False
+
+    @staticmethod
+    def _set_based_ranking_update(dimension):
+        """使用一条 UPDATE ... FROM (窗口子查询) 写入整个维度的排名"""
+        qn = connection.ops.quote_name
+        perf_table = qn(AcademicPerformance._meta.db_table)
+        user_table = qn(User._meta.db_table)
+
+        partition_columns = ScoreCalculationService._partition_columns(dimension)
+        partition_clause = ''
+        if partition_columns:
+            partition_clause = 'PARTITION BY ' + ', '.join(f'u.{qn(col)}' for col in partition_columns)
+
+        sql = f"""
+            UPDATE {perf_table}
+            SET current_rank = ranked.rnk,
+                total_students_in_dimension = ranked.cnt,
+                ranking_dimension = %s
+            FROM (
+                SELECT p.id AS pid,
+                       RANK() OVER ({partition_clause} ORDER BY p.total_comprehensive_score DESC) AS rnk,
+                       COUNT(*) OVER ({partition_clause}) AS cnt
+                FROM {perf_table} p
+                JOIN {user_table} u ON u.id = p.user_id
+                WHERE p.total_comprehensive_score IS NOT NULL
+            ) AS ranked
+            WHERE {perf_table}.id = ranked.pid
         """
-        try:
-            print(f"=== 开始批量更新 {dimension} 排名 ===")
 
-            # 根据维度分组计算排名
-            from django.db.models import Window
-            from django.db.models.functions import Rank, DenseRank
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(sql, [dimension])
+            return cursor.rowcount
 
-            # 构建查询集
-            queryset = AcademicPerformance.objects.filter(
-                total_comprehensive_score__isnull=False
-            )
+    @staticmethod
+    def batch_update_rankings(dimension='专业'):
+        """批量更新指定维度的排名
 
-            # 添加维度过滤
-            if dimension == '专业':
-                queryset = queryset.order_by('user__college', 'user__major', '-total_comprehensive_score')
-            elif dimension == '学院':
-                queryset = queryset.order_by('user__college', '-total_comprehensive_score')
-            elif dimension == '全校':
-                queryset = queryset.order_by('-total_comprehensive_score')
-
-            # 使用窗口函数计算排名（Django 2.0+）
-            # 注意：这需要数据库支持窗口函数（PostgreSQL, MySQL 8.0+）
-            ranked_queryset = queryset.annotate(
-                rank=Window(
-                    expression=DenseRank(),
-                    order_by=F('total_comprehensive_score').desc(),
-                    partition_by=[]  # 根据维度添加partition
-                ),
-                total_in_group=Window(
-                    expression=Count('id'),
-                    partition_by=[]  # 根据维度添加partition
-                )
-            )
+        Args:
+            dimension: 排名维度 ('专业', '学院', '全校', '年级')
 
-            # 批量更新（这里简化处理，实际可能需要循环）
-            updated_count = 0
-            for record in ranked_queryset:
-                record.current_rank = record.rank
-                record.ranking_dimension = dimension
-                record.total_students_in_dimension = record.total_in_group
-                record.save()
-                updated_count += 1
+        Returns:
+            dict: {'dimension', 'updated', 'elapsed', 'method'}
+        """
+        ScoreCalculationService._partition_columns(dimension)
 
-            print(f"✅ 成功更新 {updated_count} 条排名记录（维度: {dimension}）")
-            return updated_count
+        print(f"=== 开始批量更新 {dimension} 排名 ===")
+        start_time = time.perf_counter()
+        method = 'update_from'
 
-        except Exception as e:
+        try:
+            if ScoreCalculationService._supports_update_from():
+                updated_count = ScoreCalculationService._set_based_ranking_update(dimension)
+            else:
+                method = 'traditional'
+                updated_count = ScoreCalculationService.traditional_ranking_update(dimension)
+        except DatabaseError as e:
             print(f"❌ 排名更新失败: {e}")
             # 回退到传统排名算法
-            return ScoreCalculationService.traditional_ranking_update(dimension)
+            method = 'traditional'
+            updated_count = ScoreCalculationService.traditional_ranking_update(dimension)
+
+        if updated_count:
+            bump_score_version()
+
+        elapsed = time.perf_counter() - start_time
+        print(f"✅ 成功更新 {updated_count} 条排名记录（维度: {dimension}，方式: {method}，耗时 {elapsed:.3f}秒）")
+
+        return {
+            'dimension': dimension,
+            'updated': updated_count,
+            'elapsed': round(elapsed, 4),
+            'method': method,
+        }
 
     @staticmethod
-    def traditional_ranking_update(dimension='专业'):
-        """传统排名算法（兼容所有数据库）"""
+    def traditional_ranking_update(dimension='专业', batch_size=1000):
+        """传统排名算法（兼容所有数据库）
+
+        只读取排名所需的列，在Python中分组排序后用bulk_update批量写回，
+        不触发 AcademicPerformance.save() 的分数重算。
+        """
         from collections import defaultdict
-        from django.db import transaction
+
+        partition_columns = ScoreCalculationService._partition_columns(dimension)
 
         try:
             with transaction.atomic():
-                # 获取所有需要排名的学生
-                performances = AcademicPerformance.objects.filter(
+                rows = AcademicPerformance.objects.filter(
                     total_comprehensive_score__isnull=False
-                ).select_related('user')
+                ).values_list(
+                    'id', 'total_comprehensive_score',
+                    *[f'user__{col}' for col in partition_columns]
+                )
 
                 # 按维度分组
                 groups = defaultdict(list)
+                for row in rows:
+                    groups[tuple(row[2:])].append((row[0], row[1]))
 
-                for perf in performances:
-                    if dimension == '专业':
-                        key = f"{perf.user.college}_{perf.user.major}"
-                    elif dimension == '学院':
-                        key = perf.user.college
-                    elif dimension == '全校':
-                        key = "all"
-                    else:
-                        key = "unknown"
-
-                    groups[key].append(perf)
-
-                # 对每个组进行排名
-                total_updated = 0
-                for group_key, group_performances in groups.items():
-                    # 按分数降序排序
-                    sorted_performances = sorted(
-                        group_performances,
-                        key=lambda x: x.total_comprehensive_score,
-                        reverse=True
-                    )
-
-                    # 处理并列排名
-                    current_rank = 1
+                # 对每个组进行排名（标准竞赛排名：1, 1, 3）
+                updates = []
+                for group_rows in groups.values():
+                    group_rows.sort(key=lambda item: item[1], reverse=True)
+                    group_size = len(group_rows)
+
+                    rank = 0
                     previous_score = None
-                    same_score_count = 0
-
-                    for idx, perf in enumerate(sorted_performances, start=1):
-                        current_score = perf.total_comprehensive_score
-
-                        if previous_score is None:
-                            # 第一个学生
-                            rank = 1
-                        elif current_score == previous_score:
-                            # 分数相同，排名不变
-                            rank = current_rank
-                            same_score_count += 1
-                        else:
-                            # 分数不同，更新排名
+                    for idx, (perf_id, score) in enumerate(group_rows, start=1):
+                        if score != previous_score:
                             rank = idx
-                            current_rank = rank
-
-                        # 更新记录
-                        perf.current_rank = rank
-                        perf.ranking_dimension = dimension
-                        perf.total_students_in_dimension = len(sorted_performances)
-                        perf.save()
-
-                        previous_score = current_score
-                        total_updated += 1
+                            previous_score = score
+
+                        updates.append(AcademicPerformance(
+                            id=perf_id,
+                            current_rank=rank,
+                            ranking_dimension=dimension,
+                            total_students_in_dimension=group_size,
+                        ))
+
+                AcademicPerformance.objects.bulk_update(
+                    updates,
+                    ['current_rank', 'ranking_dimension', 'total_students_in_dimension'],
+                    batch_size=batch_size
+                )
 
-                print(f"✅ 传统算法更新 {total_updated} 条排名记录（维度: {dimension}）")
-                return total_updated
+                print(f"✅ 传统算法更新 {len(updates)} 条排名记录（维度: {dimension}）")
+                return len(updates)
 
         except Exception as e:
             print(f"❌ 传统排名算法失败: {e}")
             import traceback
             traceback.print_exc()
-            return 0
\ No newline at end of file
+            return 0
+
+    # 快照维度 -> 分组字段（values_list中的列名）
+    SNAPSHOT_PARTITIONS = {
+        '专业': ('user__college', 'user__major'),
+        '学院': ('user__college',),
+        '全校': (),
+        '年级': ('user__grade',),
+    }
+
+    @staticmethod
+    def current_term(now=None):
+        """根据日期推算学期标识，如 2025-2026-1（9月至次年1月为第一学期）"""
+        now = timezone.localtime(now or timezone.now())
+        year, month = now.year, now.month
+        if month >= 9:
+            return f'{year}-{year + 1}-1'
+        if month == 1:
+            return f'{year - 1}-{year}-1'
+        return f'{year - 1}-{year}-2'
+
+    @staticmethod
+    def build_ranking_snapshots(term=None, batch_size=1000):
+        """一次排序扫描生成所有维度（专业/学院/全校/年级）的排名快照
+
+        按综合成绩降序读取一次数据，为每个维度的每个分组维护计数器，
+        标准竞赛排名（1, 1, 3），最后整体替换该学期的快照。
+
+        Returns:
+            dict: {'term', 'students', 'snapshots', 'elapsed'}
+        """
+        term = term or ScoreCalculationService.current_term()
+        partitions = ScoreCalculationService.SNAPSHOT_PARTITIONS
+
+        print(f"=== 开始生成 {term} 排名快照 ===")
+        start_time = time.perf_counter()
+
+        partition_fields = sorted({f for fields in partitions.values() for f in fields})
+        field_index = {f: i for i, f in enumerate(partition_fields, start=2)}
+
+        rows = AcademicPerformance.objects.filter(
+            total_comprehensive_score__isnull=False
+        ).order_by('-total_comprehensive_score').values_list(
+            'user_id', 'total_comprehensive_score', *partition_fields
+        )
+
+        # 每个 (维度, 分组键) 的状态：[已排人数, 上一个分数, 上一个排名]
+        counters = {}
+        snapshots = []
+        student_count = 0
+
+        for row in rows.iterator(chunk_size=batch_size):
+            student_count += 1
+            user_id, score = row[0], row[1]
+            for dimension, fields in partitions.items():
+                partition_key = '/'.join(str(row[field_index[f]] or '') for f in fields)
+                state = counters.setdefault((dimension, partition_key), [0, None, 0])
+                state[0] += 1
+                if score != state[1]:
+                    state[1] = score
+                    state[2] = state[0]
+                snapshots.append(RankingSnapshot(
+                    user_id=user_id,
+                    term=term,
+                    dimension=dimension,
+                    partition_key=partition_key,
+                    score=score,
+                    rank=state[2],
+                ))
+
+        for snapshot in snapshots:
+            snapshot.total_in_dimension = counters[(snapshot.dimension, snapshot.partition_key)][0]
+
+        with transaction.atomic():
+            RankingSnapshot.objects.filter(term=term).delete()
+            RankingSnapshot.objects.bulk_create(snapshots, batch_size=batch_size)
+
+        elapsed = time.perf_counter() - start_time
+        print(f"✅ 生成 {len(snapshots)} 条排名快照（{student_count} 名学生，耗时 {elapsed:.3f}秒）")
+
+        return {
+            'term': term,
+            'students': student_count,
+            'snapshots': len(snapshots),
+            'elapsed': round(elapsed, 4),
+        }
+
+    @staticmethod
+    def apply_score_change(academic_perf, old_score):
+        """单个学生综合成绩变化后增量维护排名，无需全量重算
+
+        分数由 old 变为 new 时，只有同组内分数落在 [min(old, new), max(old, new))
+        区间的学生名次会整体 ±1（分数上升则这些学生 +1，下降则 -1），
+        每类排名用一条有界 UPDATE 完成，再单独计算该学生自己的新名次。
+
+        Args:
+            academic_perf: 已保存新分数的 AcademicPerformance
+            old_score: 变化前的 total_comprehensive_score
+
+        Returns:
+            int: 被平移名次的记录数
+        """
+        new_score = academic_perf.total_comprehensive_score
+        if old_score is None or new_score is None:
+            return 0
+
+        old_score = decimal.Decimal(str(old_score))
+        new_score = decimal.Decimal(str(new_score))
+        if old_score == new_score:
+            return 0
+
+        shifted = 0
+        with transaction.atomic():
+            shifted += ScoreCalculationService._shift_current_rank(academic_perf, old_score, new_score)
+            shifted += ScoreCalculationService._shift_snapshot_ranks(academic_perf, new_score)
+        bump_score_version()
+
+        print(f"✅ 增量排名维护: {old_score} -> {new_score}，平移 {shifted} 条记录")
+        return shifted
+
+    @staticmethod
+    def _shift_current_rank(academic_perf, old_score, new_score):
+        """维护 AcademicPerformance.current_rank（按记录当前的 ranking_dimension）"""
+        dimension = academic_perf.ranking_dimension
+        if academic_perf.current_rank is None or dimension not in ScoreCalculationService.RANKING_PARTITIONS:
+            return 0
+
+        lower, upper = sorted([old_score, new_score])
+        delta = 1 if new_score > old_score else -1
+
+        shifted = AcademicPerformance.objects.filter(
+            **academic_perf.ranking_filter_kwargs(dimension),
+            ranking_dimension=dimension,
+            current_rank__isnull=False,
+            total_comprehensive_score__gte=lower,
+            total_comprehensive_score__lt=upper,
+        ).exclude(id=academic_perf.id).update(current_rank=F('current_rank') + delta)
+
+        academic_perf.update_ranking(dimension)
+        AcademicPerformance.objects.filter(id=academic_perf.id).update(
+            current_rank=academic_perf.current_rank,
+            total_students_in_dimension=academic_perf.total_students_in_dimension,
+        )
+        return shifted
+
+    @staticmethod
+    def _shift_snapshot_ranks(academic_perf, new_score):
+        """维护该学生最新学期的排名快照（所有维度一条 UPDATE）"""
+        snapshots = list(RankingSnapshot.objects.filter(user_id=academic_perf.user_id).order_by('-term'))
+        if not snapshots:
+            return 0
+
+        term = snapshots[0].term
+        snapshots = [snap for snap in snapshots if snap.term == term]
+
+        # 快照中记录的分数即快照口径下的旧分数
+        old_score = snapshots[0].score
+        if old_score == new_score:
+            return 0
+
+        lower, upper = sorted([old_score, new_score])
+        delta = 1 if new_score > old_score else -1
+
+        same_partitions = Q()
+        for snap in snapshots:
+            same_partitions |= Q(dimension=snap.dimension, partition_key=snap.partition_key)
+
+        others = RankingSnapshot.objects.filter(same_partitions, term=term).exclude(user_id=academic_perf.user_id)
+
+        shifted = others.filter(score__gte=lower, score__lt=upper).update(rank=F('rank') + delta)
+
+        # 自己的新名次 = 同组内分数严格更高的人数 + 1
+        higher_counts = others.filter(score__gt=new_score).aggregate(**{
+            f'higher_{idx}': Count('id', filter=Q(dimension=snap.dimension, partition_key=snap.partition_key))
+            for idx, snap in enumerate(snapshots)
+        })
+        for idx, snap in enumerate(snapshots):
+            snap.score = new_score
+            snap.rank = higher_counts[f'higher_{idx}'] + 1
+        RankingSnapshot.objects.bulk_update(snapshots, ['score', 'rank'])
+
+        return shifted
+
+    @staticmethod
+    def _to_float(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return 0.0
+
+    @staticmethod
+    def _capped_score_matrix(gpa, applications):
+        """由GPA向量和 n×9 加分矩阵计算各项分数
+
+        Returns:
+            ndarray: n×4，列依次为 学术分数、学术专长、综合表现、综合总分
+        """
+        import numpy as np
+
+        service = ScoreCalculationService
+        academic = np.round(gpa / 4.0 * 80.0, 2)
+        expertise = np.minimum(
+            np.clip(applications[:, service.EXPERTISE_CATEGORIES], None, service.EXPERTISE_ITEM_CAP).sum(axis=1),
+            service.EXPERTISE_TOTAL_CAP
+        )
+        comprehensive = np.minimum(
+            np.clip(applications[:, service.COMPREHENSIVE_CATEGORIES], None, service.COMPREHENSIVE_ITEM_CAP).sum(axis=1),
+            service.COMPREHENSIVE_TOTAL_CAP
+        )
+        total = np.minimum(np.round(academic + expertise + comprehensive, 2), service.TOTAL_SCORE_CAP)
+
+        return np.round(np.column_stack([academic, expertise, comprehensive, total]), 4)
+
+    @staticmethod
+    def vectorized_recalculate_scores(batch_size=2000, user_ids=None):
+        """向量化批量重算学术分数、学术专长、综合表现和综合总分
+
+        一次读取所有学生的GPA和 applications_score，组成 NumPy 矩阵，
+        用 clip/sum 完成各项封顶计算，只把结果有变化的记录分批 bulk_update 写回。
+
+        Args:
+            user_ids: 只重算这些学生（如导入更新了成绩的学生），默认重算全部
+
+        Returns:
+            dict: {'students', 'updated', 'load_time', 'compute_time', 'write_time', 'elapsed'}
+        """
+        import numpy as np
+
+        service = ScoreCalculationService
+        score_fields = ['academic_score', 'academic_expertise_score',
+                        'comprehensive_performance_score', 'total_comprehensive_score']
+        category_count = len(AcademicPerformance.SCORE_TYPES)
+
+        print("=== 开始向量化批量重算分数 ===")
+        start_time = time.perf_counter()
+
+        # 1. 读取
+        queryset = AcademicPerformance.objects.all()
+        if user_ids is not None:
+            queryset = queryset.filter(user_id__in=list(user_ids))
+        rows = list(queryset.values_list('id', 'gpa', *score_fields, 'applications_score'))
+        ids = [row[0] for row in rows]
+        gpa = np.array([service._to_float(row[1]) for row in rows], dtype=np.float64)
+        current = np.array([[service._to_float(v) for v in row[2:6]] for row in rows],
+                           dtype=np.float64).reshape(len(rows), len(score_fields))
+
+        applications = np.zeros((len(rows), category_count), dtype=np.float64)
+        for i, row in enumerate(rows):
+            scores = row[6] if isinstance(row[6], list) else []
+            for j, value in enumerate(scores[:category_count]):
+                applications[i, j] = service._to_float(value)
+        load_time = time.perf_counter() - start_time
+
+        # 2. 计算
+        compute_start = time.perf_counter()
+        result = service._capped_score_matrix(gpa, applications)
+        changed = np.flatnonzero(np.any(np.abs(result - current) > 1e-6, axis=1))
+        compute_time = time.perf_counter() - compute_start
+
+        # 3. 写回（只写有变化的记录）
+        write_start = time.perf_counter()
+        updates = [
+            AcademicPerformance(
+                id=ids[i],
+                **{field: decimal.Decimal(f'{result[i, k]:.4f}') for k, field in enumerate(score_fields)}
+            )
+            for i in changed
+        ]
+        with transaction.atomic():
+            AcademicPerformance.objects.bulk_update(updates, score_fields, batch_size=batch_size)
+        if updates:
+            bump_score_version()
+        write_time = time.perf_counter() - write_start
+
+        elapsed = time.perf_counter() - start_time
+        print(f"✅ 向量化重算 {len(rows)} 名学生，更新 {len(updates)} 条记录，耗时 {elapsed:.3f}秒")
+
+        return {
+            'students': len(rows),
+            'updated': len(updates),
+            'load_time': round(load_time, 4),
+            'compute_time': round(compute_time, 4),
+            'write_time': round(write_time, 4),
+            'elapsed': round(elapsed, 4),
+        }
+
+    @staticmethod
+    def reconcile_application_scores(dry_run=False, batch_size=2000, report_limit=500):
+        """对账：根据已通过的申请重建每个学生的9类加分向量
+
+        一条 GROUP BY (user, Type) SUM(Real_Score) 查询汇总所有审核通过的申请，
+        重建 applications_score 并重新计算封顶后的各项分数，
+        只写回与数据库现值不一致的记录，并生成差异报告。
+
+        Args:
+            dry_run: 为True时只生成差异报告，不写数据库
+            batch_size: bulk_update 每批条数
+            report_limit: 报告中最多列出的差异明细条数
+
+        Returns:
+            dict: {'students', 'mismatched', 'updated', 'dry_run', 'elapsed', 'diffs'}
+        """
+        import numpy as np
+        from django.db.models import Sum
+        from application.models import Application
+
+        service = ScoreCalculationService
+        score_fields = ['academic_score', 'academic_expertise_score',
+                        'comprehensive_performance_score', 'total_comprehensive_score']
+        category_count = len(AcademicPerformance.SCORE_TYPES)
+
+        print(f"=== 开始加分对账{'（试运行）' if dry_run else ''} ===")
+        start_time = time.perf_counter()
+
+        # 1. 汇总审核通过的申请
+        approved_totals = Application.objects.filter(
+            review_status=2
+        ).values('user_id', 'Type').annotate(total=Sum('Real_Score')).values_list('user_id', 'Type', 'total')
+
+        expected_by_user = {}
+        for user_id, app_type, total in approved_totals:
+            if 0 <= app_type < category_count:
+                vector = expected_by_user.setdefault(user_id, [0.0] * category_count)
+                vector[app_type] = round(service._to_float(total), 4)
+
+        # 2. 读取现有成绩
+        rows = list(AcademicPerformance.objects.values_list(
+            'id', 'user_id', 'user__school_id', 'gpa', *score_fields, 'applications_score'
+        ))
+        expected = np.array([expected_by_user.get(row[1], [0.0] * category_count) for row in rows],
+                            dtype=np.float64).reshape(len(rows), category_count)
+        actual = np.zeros((len(rows), category_count), dtype=np.float64)
+        for i, row in enumerate(rows):
+            scores = row[8] if isinstance(row[8], list) else []
+            for j, value in enumerate(scores[:category_count]):
+                actual[i, j] = service._to_float(value)
+        gpa = np.array([service._to_float(row[3]) for row in rows], dtype=np.float64)
+        current = np.array([[service._to_float(v) for v in row[4:8]] for row in rows],
+                           dtype=np.float64).reshape(len(rows), len(score_fields))
+
+        # 3. 重新计算并找出差异
+        result = service._capped_score_matrix(gpa, expected)
+        vector_changed = np.any(np.abs(expected - actual) > 1e-6, axis=1)
+        score_changed = np.any(np.abs(result - current) > 1e-6, axis=1)
+        mismatched = np.flatnonzero(vector_changed | score_changed)
+
+        diffs = []
+        updates = []
+        for i in mismatched:
+            row = rows[i]
+            if len(diffs) < report_limit:
+                diffs.append({
+                    'school_id': row[2],
+                    'applications_score_before': actual[i].tolist(),
+                    'applications_score_after': expected[i].tolist(),
+                    'total_before': float(current[i, 3]),
+                    'total_after': float(result[i, 3]),
+                })
+            updates.append(AcademicPerformance(
+                id=row[0],
+                applications_score=expected[i].tolist(),
+                **AcademicPerformance.score_columns_from_list(expected[i].tolist()),
+                **{field: decimal.Decimal(f'{result[i, k]:.4f}') for k, field in enumerate(score_fields)}
+            ))
+
+        # 4. 写回
+        if updates and not dry_run:
+            with transaction.atomic():
+                AcademicPerformance.objects.bulk_update(
+                    updates,
+                    ['applications_score', *AcademicPerformance.SCORE_COLUMNS.values(), *score_fields],
+                    batch_size=batch_size
+                )
+            bump_score_version()
+
+        elapsed = time.perf_counter() - start_time
+        print(f"✅ 对账完成: {len(rows)} 名学生，{len(updates)} 条不一致，耗时 {elapsed:.3f}秒")
+
+        return {
+            'students': len(rows),
+            'mismatched': len(updates),
+            'updated': 0 if dry_run else len(updates),
+            'dry_run': dry_run,
+            'elapsed': round(elapsed, 4),
+            'diffs': diffs,
+        }
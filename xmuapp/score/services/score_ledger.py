@@ -0,0 +1,107 @@
+# services/score_ledger.py
+from decimal import Decimal
+
+from django.db import DatabaseError, IntegrityError, transaction
+from django.db.models import Sum
+
+from score.models import AcademicPerformance, ScoreLedgerEntry
+from score.services.score_calculation import ScoreCalculationService
+
+
+class ScoreLedgerService:
+    """加分流水服务：审核变动只追加流水，并在行锁内累加对应类别分数"""
+
+    @staticmethod
+    def credited_amount(application):
+        """该申请当前已计入的加分（流水合计）"""
+        total = ScoreLedgerEntry.objects.filter(application=application).aggregate(total=Sum('amount'))['total']
+        return total or Decimal('0')
+
+    @staticmethod
+    def post_application_score(application, target_amount, reason, operator=None, previous_amount=None):
+        """把申请计入的加分调整为 target_amount
+
+        只写入差额流水（target - 已计入），并在 select_for_update 行锁内累加该类别分数，
+        同一学生的并发审核会依次累加而不会互相覆盖。
+        行锁事务只包含流水写入和分数更新；同组其他学生的排名平移在事务提交后进行，
+        不在持有行锁时锁定同组大量记录，避免同专业/学院的并发审核互相等待甚至死锁。
+
+        Args:
+            application: 申请
+            target_amount: 该申请应计入的加分（撤销、撤回时为0）
+            reason: 流水原因，见 ScoreLedgerEntry.REASONS
+            operator: 操作人
+            previous_amount: 启用流水前该申请已计入的加分，仅在该申请尚无流水时作为期初余额
+
+        Returns:
+            ScoreLedgerEntry 或 None（无变化时）
+        """
+        category = application.Type
+        if category not in AcademicPerformance.SCORE_TYPES:
+            return None
+
+        target = Decimal(str(target_amount or 0))
+
+        try:
+            AcademicPerformance.objects.get_or_create(user_id=application.user_id)
+        except IntegrityError:
+            # 并发请求已创建该学生的成绩记录，下面加锁时重新读取
+            pass
+
+        with transaction.atomic():
+            # 锁定该学生的成绩行
+            academic_perf = AcademicPerformance.objects.select_for_update().get(user_id=application.user_id)
+
+            entries = ScoreLedgerEntry.objects.filter(application=application)
+            if not entries.exists() and previous_amount:
+                # 启用流水前已计入的分数记为期初余额
+                ScoreLedgerEntry.objects.create(
+                    user_id=application.user_id,
+                    application=application,
+                    category=category,
+                    amount=Decimal(str(previous_amount)),
+                    reason='opening',
+                    operator=operator,
+                )
+
+            delta = target - ScoreLedgerService.credited_amount(application)
+            if delta == 0:
+                return None
+
+            # 类别分数不低于0：流水记录实际变动的分数，使类别分数始终等于其流水合计
+            current = Decimal(str(academic_perf.get_score(category) or 0))
+            new_value = max(current + delta, Decimal('0'))
+            if new_value == current:
+                return None
+
+            entry = ScoreLedgerEntry.objects.create(
+                user_id=application.user_id,
+                application=application,
+                category=category,
+                amount=new_value - current,
+                reason=reason,
+                operator=operator,
+            )
+
+            old_total_score = academic_perf.total_comprehensive_score
+            academic_perf.set_score(category, new_value)
+            ScoreCalculationService.apply_bonus_caps(academic_perf)
+            academic_perf.save()
+
+            # 事务提交后增量维护排名
+            transaction.on_commit(
+                lambda: ScoreLedgerService.maintain_ranks(academic_perf, old_total_score)
+            )
+
+        return entry
+
+    @staticmethod
+    def maintain_ranks(academic_perf, old_total_score):
+        """
+        加分流水提交后增量维护排名
+        排名只是派生数据：失败时不影响已提交的加分，由定时的全量排名更新修正
+        """
+        try:
+            ScoreCalculationService.apply_score_change(academic_perf, old_total_score)
+        except DatabaseError as e:
+            print(f"❌ 增量排名维护失败（等待全量排名更新修正）: {academic_perf.user_id} - {e}")
@@ -0,0 +1,117 @@
+# services/score_statistics.py
+import time
+
+from django.core.cache import cache
+
+from score.models import AcademicPerformance
+from score.services.rank_index import get_score_version
+
+# 统计指标（直方图取值范围见 metric_ranges）
+STATISTIC_METRICS = ['gpa', 'academic_score', 'total_comprehensive_score']
+
+# 分组方式 -> user表字段
+STATISTIC_GROUPS = {
+    'school': (),
+    'college': ('user__college',),
+    'major': ('user__college', 'user__major'),
+    'grade': ('user__grade',),
+}
+
+STATISTICS_CACHE_TIMEOUT = 60 * 60
+
+
+class ScoreStatisticsService:
+    """成绩分布与分位数统计服务（结果按成绩版本号缓存）"""
+
+    @staticmethod
+    def get_statistics(group_by='school', bins=10, top_n=10):
+        """获取统计结果，成绩版本号未变化时直接返回缓存"""
+        if group_by not in STATISTIC_GROUPS:
+            raise ValueError(f'不支持的分组方式: {group_by}')
+
+        version = get_score_version()
+        cache_key = f'score_statistics:{version}:{group_by}:{bins}:{top_n}'
+        result = cache.get(cache_key)
+        if result is not None:
+            return dict(result, cached=True)
+
+        result = ScoreStatisticsService.compute_statistics(group_by, bins, top_n)
+        result['version'] = version
+        cache.set(cache_key, result, STATISTICS_CACHE_TIMEOUT)
+        return dict(result, cached=False)
+
+    @staticmethod
+    def metric_ranges():
+        """
+        各指标直方图取值范围，与数据校验上限一致：
+        GPA 取 AcademicPerformance.GPA_RANGE，学业成绩按 GPA/4*80 折算，综合总分取封顶分
+        """
+        gpa_min, gpa_max = (float(v) for v in AcademicPerformance.GPA_RANGE)
+        return {
+            'gpa': (gpa_min, gpa_max),
+            'academic_score': (gpa_min / 4.0 * 80.0, gpa_max / 4.0 * 80.0),
+            'total_comprehensive_score': (0.0, AcademicPerformance.TOTAL_SCORE_CAP),
+        }
+
+    @staticmethod
+    def compute_statistics(group_by='school', bins=10, top_n=10):
+        """一次查询读取所有学生成绩，用 NumPy 按组计算直方图、分位数、均值/标准差和前N名"""
+        import numpy as np
+
+        start_time = time.perf_counter()
+        group_fields = STATISTIC_GROUPS[group_by]
+        metrics = STATISTIC_METRICS
+        ranges = ScoreStatisticsService.metric_ranges()
+
+        rows = AcademicPerformance.objects.values_list(
+            'user__school_id', 'user__name', *metrics, *group_fields
+        )
+
+        groups = {}
+        for row in rows.iterator(chunk_size=2000):
+            key = '/'.join(str(v or '') for v in row[2 + len(metrics):]) or '全校'
+            groups.setdefault(key, []).append(row[:2 + len(metrics)])
+
+        result_groups = {}
+        for key, group_rows in groups.items():
+            values = np.array([[float(v or 0) for v in row[2:]] for row in group_rows], dtype=np.float64)
+            group_result = {'count': len(group_rows)}
+
+            for col, metric in enumerate(metrics):
+                column = values[:, col]
+                # 超出范围的值（如历史数据）计入两端的桶，各桶人数之和始终等于组内人数
+                counts, edges = np.histogram(np.clip(column, *ranges[metric]), bins=bins, range=ranges[metric])
+                p10, p50, p90 = np.percentile(column, [10, 50, 90])
+                top_indices = np.argsort(-column, kind='stable')[:top_n]
+
+                group_result[metric] = {
+                    'mean': round(float(column.mean()), 4),
+                    'stdev': round(float(column.std()), 4),
+                    'min': round(float(column.min()), 4),
+                    'max': round(float(column.max()), 4),
+                    'p10': round(float(p10), 4),
+                    'p50': round(float(p50), 4),
+                    'p90': round(float(p90), 4),
+                    'histogram': {
+                        'counts': counts.tolist(),
+                        'edges': [round(float(e), 4) for e in edges],
+                    },
+                    'top': [
+                        {
+                            'school_id': group_rows[i][0],
+                            'name': group_rows[i][1],
+                            'value': round(float(column[i]), 4),
+                        }
+                        for i in top_indices
+                    ],
+                }
+
+            result_groups[key] = group_result
+
+        return {
+            'group_by': group_by,
+            'bins': bins,
+            'top_n': top_n,
+            'groups': result_groups,
+            'elapsed': round(time.perf_counter() - start_time, 4),
+        }
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from score.models import AcademicPerformance
+from score.services.rank_index import bump_score_version
+
+
+@receiver(post_save, sender=AcademicPerformance)
+@receiver(post_delete, sender=AcademicPerformance)
+def academic_performance_changed(sender, instance, **kwargs):
+    """学业成绩保存或删除后递增成绩版本号"""
+    bump_score_version()
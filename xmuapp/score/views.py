@@ -65,13 +65,25 @@ class CalculateScoresView(APIView):
         try:
             # 获取参数
             dimension = request.data.get('dimension', '专业')
-            action = request.data.get('action', 'all')  # all, academic, total, ranking
+            action = request.data.get('action', 'all')  # all, academic, total, ranking, snapshot, vectorized, reconcile
 
             start_time = time.time()
             results = {}
 
             # 执行计算
-            from services.score_calculation import ScoreCalculationService
+            from .services.score_calculation import ScoreCalculationService
+
+            if action in ['all', 'ranking'] and dimension not in ScoreCalculationService.RANKING_PARTITIONS:
+                return Response({'error': f'不支持的排名维度: {dimension}'}, status=400)
+
+            if action == 'vectorized':
+                # 向量化重算学术/专长/综合表现/总分，替代 academic + total
+                results['vectorized'] = ScoreCalculationService.vectorized_recalculate_scores()
+
+            if action == 'reconcile':
+                # 根据审核通过的申请重建加分向量
+                dry_run = str(request.data.get('dry_run', False)).lower() in ['true', '1']
+                results['reconcile'] = ScoreCalculationService.reconcile_application_scores(dry_run=dry_run)
 
             if action in ['all', 'academic']:
                 academic_count = ScoreCalculationService.batch_calculate_academic_scores()
@@ -82,8 +94,13 @@ class CalculateScoresView(APIView):
                 results['total_score_updated'] = total_count
 
             if action in ['all', 'ranking']:
-                ranking_count = ScoreCalculationService.batch_update_rankings(dimension)
-                results['ranking_updated'] = ranking_count
+                ranking_stats = ScoreCalculationService.batch_update_rankings(dimension)
+                results['ranking_updated'] = ranking_stats['updated']
+                results['ranking_timings'] = {dimension: ranking_stats['elapsed']}
+                results['ranking_method'] = ranking_stats['method']
+
+            if action in ['all', 'snapshot']:
+                results['snapshot'] = ScoreCalculationService.build_ranking_snapshots(request.data.get('term'))
 
             elapsed_time = time.time() - start_time
 
@@ -131,11 +148,33 @@ class StudentRankingView(APIView):
                         'error': f'学生 {school_id} 无成绩记录'
                     }, status=404)
 
-                # 如果未计算排名，则计算
-                if academic.current_rank is None:
-                    academic.update_ranking(dimension)
-
-                return Response({
+                # 优先读取排名快照（各维度独立存储，单次索引查询）
+                from .models import RankingSnapshot
+                term = request.query_params.get('term')
+                snapshots = RankingSnapshot.objects.filter(user=user)
+                if term:
+                    snapshots = snapshots.filter(term=term)
+                else:
+                    latest = snapshots.order_by('-term').values_list('term', flat=True).first()
+                    snapshots = snapshots.filter(term=latest)
+                rankings = {
+                    snap.dimension: {'rank': snap.rank, 'total': snap.total_in_dimension, 'term': snap.term}
+                    for snap in snapshots
+                }
+
+                if dimension in rankings:
+                    rank = rankings[dimension]['rank']
+                    ranking_dimension = dimension
+                    total_in_dimension = rankings[dimension]['total']
+                else:
+                    # 无快照时回退到实时计算
+                    if academic.current_rank is None or academic.ranking_dimension != dimension:
+                        academic.update_ranking(dimension)
+                    rank = academic.current_rank
+                    ranking_dimension = academic.ranking_dimension
+                    total_in_dimension = academic.total_students_in_dimension
+
+                response_data = {
                     'school_id': user.school_id,
                     'name': user.name,
                     'college': user.college,
@@ -144,43 +183,69 @@ class StudentRankingView(APIView):
                     'academic_score': float(academic.academic_score) if academic.academic_score else 0,
                     'total_comprehensive_score': float(
                         academic.total_comprehensive_score) if academic.total_comprehensive_score else 0,
-                    'rank': academic.current_rank,
-                    'ranking_dimension': academic.ranking_dimension,
-                    'total_in_dimension': academic.total_students_in_dimension
-                })
+                    'rank': rank,
+                    'ranking_dimension': ranking_dimension,
+                    'total_in_dimension': total_in_dimension,
+                    'rankings': rankings
+                }
+
+                # 可选：返回同组前后相邻的学生
+                neighbours = request.query_params.get('neighbours')
+                if neighbours:
+                    from .services.rank_index import get_rank_index
+                    index = get_rank_index(dimension)
+                    neighbour_entries = index.neighbours(user.id, min(int(neighbours), 50))
+                    neighbour_users = User.objects.in_bulk([user_id for _, user_id, _ in neighbour_entries])
+                    response_data['neighbours'] = [
+                        {
+                            'rank': rank,
+                            'school_id': neighbour_users[user_id].school_id,
+                            'name': neighbour_users[user_id].name,
+                            'total_comprehensive_score': score
+                        }
+                        for rank, user_id, score in neighbour_entries
+                        if user_id in neighbour_users
+                    ]
+
+                return Response(response_data)
             else:
-                # 查询排名列表
+                # 查询排名列表（内存排名索引，按页二分定位，无需 COUNT/OFFSET）
                 from .models import AcademicPerformance
+                from .services.rank_index import get_rank_index
 
-                page = int(request.query_params.get('page', 1))
+                page = max(int(request.query_params.get('page', 1)), 1)
                 page_size = min(int(request.query_params.get('page_size', 50)), 100)
 
-                # 构建查询
-                queryset = AcademicPerformance.objects.filter(
-                    total_comprehensive_score__isnull=False
-                ).select_related('user')
+                college = request.query_params.get('college')
+                major = request.query_params.get('major')
+                grade = request.query_params.get('grade')
+
+                # 维度过滤：未提供分组参数时按全校排序
+                index_dimension = '全校'
+                if dimension == '专业' and college and major:
+                    index_dimension = '专业'
+                elif dimension == '学院' and college:
+                    index_dimension = '学院'
+                elif dimension == '年级' and grade:
+                    index_dimension = '年级'
 
-                # 维度过滤
-                if dimension == '专业':
-                    # 这里可以根据需要添加专业过滤
-                    pass
-                elif dimension == '学院':
-                    college = request.query_params.get('college')
-                    if college:
-                        queryset = queryset.filter(user__college=college)
+                index = get_rank_index(index_dimension)
+                key = index.partition_key_for(college=college, major=major, grade=grade)
 
-                # 排序
-                queryset = queryset.order_by('-total_comprehensive_score')
+                total = index.partition_size(key)
+                page_entries = index.page(key, page, page_size)
 
-                # 分页
-                total = queryset.count()
-                start = (page - 1) * page_size
-                end = start + page_size
+                performances = AcademicPerformance.objects.filter(
+                    user_id__in=[user_id for _, user_id, _ in page_entries]
+                ).select_related('user').in_bulk(field_name='user_id')
 
                 rankings = []
-                for idx, perf in enumerate(queryset[start:end], start=start + 1):
+                for rank, user_id, _ in page_entries:
+                    perf = performances.get(user_id)
+                    if perf is None:
+                        continue
                     rankings.append({
-                        'rank': idx,
+                        'rank': rank,
                         'school_id': perf.user.school_id,
                         'name': perf.user.name,
                         'college': perf.user.college,
@@ -197,11 +262,42 @@ class StudentRankingView(APIView):
                     'total': total,
                     'total_pages': (total + page_size - 1) // page_size,
                     'dimension': dimension,
-                    'rankings': rankings
+                    'rankings': rankings,
+                    'index_stats': index.stats()
                 })
 
         except User.DoesNotExist:
             return Response({'error': '用户不存在'}, status=404)
         except Exception as e:
             print(f"❌ 排名查询错误: {e}")
-            return Response({'error': str(e)}, status=500)
\ No newline at end of file
+            return Response({'error': str(e)}, status=500)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class ScoreStatisticsView(APIView):
+    """成绩分布统计API"""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """按学院/专业/年级统计GPA、学术分数、综合成绩的分布"""
+        if request.user.user_type not in [1, 2]:
+            return Response({'error': '权限不足，只有老师和管理员可以查看成绩统计'}, status=403)
+
+        from .services.score_statistics import ScoreStatisticsService, STATISTIC_GROUPS
+
+        group_by = request.query_params.get('group_by', 'school')
+        if group_by not in STATISTIC_GROUPS:
+            return Response({'error': f'不支持的分组方式: {group_by}'}, status=400)
+
+        try:
+            bins = min(max(int(request.query_params.get('bins', 10)), 1), 100)
+            top_n = min(max(int(request.query_params.get('top_n', 10)), 0), 100)
+        except (TypeError, ValueError):
+            return Response({'error': 'bins 和 top_n 必须为整数'}, status=400)
+
+        try:
+            return Response(ScoreStatisticsService.get_statistics(group_by, bins, top_n))
+        except Exception as e:
+            print(f"❌ 成绩统计错误: {e}")
+            return Response({'error': str(e)}, status=500)
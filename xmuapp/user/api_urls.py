@@ -22,11 +22,15 @@ urlpatterns = [
     path('admin/download_stu_template/', views.DownloadStudentTemplateView.as_view(), name='admin_update'),
     path('admin/import_teacher/', views.BulkTeacherRegistrationView.as_view(), name='admin_import_users'),
     path('admin/download_tea_template/', views.DownloadTeacherTemplateView.as_view(), name='admin_update'),
+    path('admin/import_jobs/', views.ImportJobStatusView.as_view(), name='admin_import_jobs'),
     path('update/contact/', views.UserContactUpdateView.as_view(), name='student_update'),
     path('user/change-password/', views.ChangePasswordView.as_view(), name='user_change_password'),
     path('admin/destroy/', views.DeleteUserView.as_view(), name='admin_destroy'),
     path('admin/reset_password/', views.AdminResetPasswordView.as_view(), name='admin_reset_password'),
     path('admin/export-users/', views.ExportUsersView.as_view(), name='export-users'),
+    path('admin/exports/', views.ListExportsView.as_view(), name='export-list'),
+    path('admin/exports/cleanup/', views.CleanupExportsView.as_view(), name='export-cleanup'),
+    path('admin/exports/download/', views.DownloadExportView.as_view(), name='export-download'),
 
     path('feedback/create/', views.CreateFeedbackView.as_view(), name='feedback_list'),
     path('feedback/list/', views.ListFeedbacksView.as_view(), name='feedback_update'),
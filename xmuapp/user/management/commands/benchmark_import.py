@@ -0,0 +1,96 @@
+import contextlib
+import csv
+import io
+import json
+import os
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from openpyxl import Workbook
+
+from user.utils.import_engine import ImportEngine
+from user.utils.import_schemas import StudentImportSchema
+
+HEADER = ['学号', '姓名', '单位', '绩点', '英语四级成绩', '英语六级成绩']
+COLLEGES = ['信息学院-软件工程', '信息学院-计算机科学', '经济学院-金融学', '化学化工学院-化学']
+
+
+def student_rows(count):
+    """生成测试用学生数据"""
+    for i in range(count):
+        yield [
+            str(2024000000 + i),
+            f'学生{i}',
+            COLLEGES[i % len(COLLEGES)],
+            round(2 + (i % 300) / 100, 2),
+            425 + i % 200,
+            -1 if i % 3 else 450 + i % 150,
+        ]
+
+
+def write_file(path, file_format, count, encoding):
+    if file_format == 'xlsx':
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(HEADER)
+        for row in student_rows(count):
+            sheet.append(row)
+        workbook.save(path)
+    else:
+        with open(path, 'w', encoding=encoding, newline='') as f:
+            writer = csv.writer(f, delimiter='\t' if file_format == 'tsv' else ',')
+            writer.writerow(HEADER)
+            writer.writerows(student_rows(count))
+
+
+class Command(BaseCommand):
+    help = '对比 Excel 与 CSV/TSV 导入路径的读取和校验耗时（只解析，不写数据库）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000], help='测试行数')
+        parser.add_argument('--formats', nargs='+', choices=['xlsx', 'csv', 'tsv'], default=['xlsx', 'csv'],
+                            help='测试的文件格式')
+        parser.add_argument('--encoding', default='gbk', help='CSV/TSV 文件编码')
+        parser.add_argument('--report', help='结果输出文件（JSON）')
+
+    def handle(self, *args, **options):
+        results = []
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for count in options['rows']:
+                # 基准测试不受单次导入行数限制
+                schema = StudentImportSchema()
+                schema.max_rows = count
+
+                for file_format in options['formats']:
+                    path = os.path.join(tmp_dir, f'students_{count}.{file_format}')
+                    write_file(path, file_format, count, options['encoding'])
+
+                    engine = ImportEngine(schema)
+                    start_time = time.time()
+                    with open(path, 'rb') as f, contextlib.redirect_stdout(io.StringIO()):
+                        reader = engine.open(f)
+                        records, errors = engine.parse(reader)
+                    elapsed = time.time() - start_time
+
+                    result = {
+                        'format': file_format,
+                        'rows': count,
+                        'file_size': os.path.getsize(path),
+                        'valid_rows': len(records),
+                        'errors': len(errors),
+                        'seconds': round(elapsed, 3),
+                        'rows_per_second': round(count / elapsed) if elapsed else None,
+                    }
+                    results.append(result)
+                    self.stdout.write(
+                        f"{file_format:>5} {count:>8} 行  {result['file_size'] / 1024 / 1024:7.2f} MB  "
+                        f"{result['seconds']:8.3f} 秒  {result['rows_per_second']} 行/秒"
+                    )
+
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8') as f:
+                json.dump(results, f, ensure_ascii=False, indent=2)
+
+        self.stdout.write(self.style.SUCCESS(f"基准测试完成: {len(results)} 组"))
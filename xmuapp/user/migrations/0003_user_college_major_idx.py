@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0002_user_email'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['college', 'major'], name='user_college_major_idx'),
+        ),
+    ]
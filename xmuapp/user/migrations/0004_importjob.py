@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:10
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0003_user_college_major_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('job_type', models.CharField(choices=[('student', '学生导入'), ('teacher', '教师导入')], max_length=20, verbose_name='任务类型')),
+                ('status', models.CharField(choices=[('pending', '等待中'), ('running', '执行中'), ('success', '已完成'), ('failed', '失败')], default='pending', max_length=20, verbose_name='状态')),
+                ('file_name', models.CharField(max_length=255, verbose_name='原始文件名')),
+                ('file_path', models.CharField(max_length=500, verbose_name='暂存文件路径')),
+                ('parsed_rows', models.IntegerField(default=0, verbose_name='已解析行数')),
+                ('inserted_rows', models.IntegerField(default=0, verbose_name='已插入行数')),
+                ('failed_rows', models.IntegerField(default=0, verbose_name='失败行数')),
+                ('report', models.JSONField(blank=True, null=True, verbose_name='导入报告')),
+                ('error_message', models.TextField(blank=True, default='', verbose_name='错误信息')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='开始时间')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='结束时间')),
+                ('operator', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='import_jobs', to=settings.AUTH_USER_MODEL, verbose_name='操作者')),
+            ],
+            options={
+                'verbose_name': '导入任务',
+                'verbose_name_plural': '导入任务',
+                'db_table': 'import_job',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
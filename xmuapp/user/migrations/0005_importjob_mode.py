@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0004_importjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='mode',
+            field=models.CharField(default='create', max_length=20, verbose_name='导入模式'),
+        ),
+    ]
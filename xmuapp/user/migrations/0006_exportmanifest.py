@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:10
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0005_importjob_mode'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportManifest',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255, unique=True, verbose_name='文件名')),
+                ('export_format', models.CharField(default='xlsx', max_length=20, verbose_name='导出格式')),
+                ('fingerprint', models.CharField(db_index=True, max_length=64, verbose_name='内容指纹')),
+                ('size', models.BigIntegerField(default=0, verbose_name='文件大小（字节）')),
+                ('row_count', models.IntegerField(default=0, verbose_name='导出行数')),
+                ('duration', models.FloatField(default=0, verbose_name='导出耗时（秒）')),
+                ('download_count', models.IntegerField(default=0, verbose_name='下载次数')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='创建时间')),
+                ('last_downloaded_at', models.DateTimeField(blank=True, null=True, verbose_name='最后下载时间')),
+                ('creator', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='export_manifests', to=settings.AUTH_USER_MODEL, verbose_name='导出者')),
+            ],
+            options={
+                'verbose_name': '导出文件',
+                'verbose_name_plural': '导出文件',
+                'db_table': 'export_manifest',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
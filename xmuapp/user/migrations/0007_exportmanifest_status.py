@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0006_exportmanifest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportmanifest',
+            name='export_type',
+            field=models.CharField(choices=[('users', '用户信息'), ('applications', '申请审核记录')], default='users', max_length=20, verbose_name='导出内容'),
+        ),
+        migrations.AddField(
+            model_name='exportmanifest',
+            name='status',
+            field=models.CharField(choices=[('pending', '等待中'), ('running', '执行中'), ('success', '已完成'), ('failed', '失败')], default='success', max_length=20, verbose_name='状态'),
+        ),
+        migrations.AddField(
+            model_name='exportmanifest',
+            name='error_message',
+            field=models.TextField(blank=True, default='', verbose_name='错误信息'),
+        ),
+    ]
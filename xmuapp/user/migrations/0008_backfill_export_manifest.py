@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:30
+
+import os
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import migrations
+
+# 导出目录中可登记的文件格式（.tmp 等写了一半的临时文件不登记）
+EXPORT_EXTENSIONS = ('xlsx', 'csv', 'parquet')
+
+
+def backfill_export_manifest(apps, schema_editor):
+    """
+    为启用导出文件索引前生成的导出文件补登记索引，使其能被列出、下载计数和按时间清理
+    创建时间取文件修改时间；指纹未知，记为空字符串，不会被当作缓存复用
+    """
+    ExportManifest = apps.get_model('user', 'ExportManifest')
+
+    export_dir = os.path.join(settings.MEDIA_ROOT, 'exports')
+    if not os.path.isdir(export_dir):
+        return
+
+    registered = set(ExportManifest.objects.values_list('filename', flat=True))
+    for entry in os.scandir(export_dir):
+        extension = entry.name.rsplit('.', 1)[-1].lower()
+        if not entry.is_file() or entry.name in registered or extension not in EXPORT_EXTENSIONS:
+            continue
+
+        stat = entry.stat()
+        manifest = ExportManifest.objects.create(
+            filename=entry.name,
+            export_format=extension,
+            export_type='applications' if entry.name.startswith('applications_export_') else 'users',
+            status='success',
+            fingerprint='',
+            size=stat.st_size,
+        )
+        # created_at 为 auto_now_add，创建后再改为文件修改时间
+        ExportManifest.objects.filter(id=manifest.id).update(
+            created_at=datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0007_exportmanifest_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_export_manifest, migrations.RunPython.noop),
+    ]
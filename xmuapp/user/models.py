@@ -89,6 +89,9 @@ class User(AbstractBaseUser, PermissionsMixin):
         db_table = 'user'
         verbose_name = '用户'
         verbose_name_plural = '用户'
+        indexes = [
+            models.Index(fields=['college', 'major'], name='user_college_major_idx'),
+        ]
 
 
     def __str__(self):
@@ -176,4 +179,148 @@ class Feedback(models.Model):
     def mark_as_unprocessed(self):
         """标记为未处理"""
         self.status = 0
-        self.save()
\ No newline at end of file
+        self.save()
+
+class ImportJob(models.Model):
+    """批量导入任务：上传后立即返回任务ID，由后台线程执行解析、校验和插入"""
+    JOB_TYPES = [
+        ('student', '学生导入'),
+        ('teacher', '教师导入'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', '等待中'),
+        ('running', '执行中'),
+        ('success', '已完成'),
+        ('failed', '失败'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    job_type = models.CharField(max_length=20, choices=JOB_TYPES, verbose_name='任务类型')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name='状态')
+    mode = models.CharField(max_length=20, default='create', verbose_name='导入模式')
+    file_name = models.CharField(max_length=255, verbose_name='原始文件名')
+    file_path = models.CharField(max_length=500, verbose_name='暂存文件路径')
+    operator = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True,
+                                 related_name='import_jobs', verbose_name='操作者')
+
+    # 进度
+    parsed_rows = models.IntegerField(default=0, verbose_name='已解析行数')
+    inserted_rows = models.IntegerField(default=0, verbose_name='已插入行数')
+    failed_rows = models.IntegerField(default=0, verbose_name='失败行数')
+
+    report = models.JSONField(null=True, blank=True, verbose_name='导入报告')
+    error_message = models.TextField(blank=True, default='', verbose_name='错误信息')
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='创建时间')
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name='开始时间')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='结束时间')
+
+    class Meta:
+        db_table = 'import_job'
+        verbose_name = '导入任务'
+        verbose_name_plural = '导入任务'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.get_job_type_display()} {self.file_name} ({self.get_status_display()})"
+
+    @property
+    def elapsed_seconds(self):
+        """已运行时间（秒）"""
+        if not self.started_at:
+            return 0
+        end_time = self.finished_at or timezone.now()
+        return (end_time - self.started_at).total_seconds()
+
+    def to_dict(self, include_report=True):
+        """任务进度信息"""
+        elapsed = self.elapsed_seconds
+        processed = self.inserted_rows + self.failed_rows
+        data = {
+            'job_id': str(self.id),
+            'job_type': self.job_type,
+            'mode': self.mode,
+            'status': self.status,
+            'file_name': self.file_name,
+            'operator': self.operator.school_id if self.operator else None,
+            'progress': {
+                'parsed_rows': self.parsed_rows,
+                'inserted_rows': self.inserted_rows,
+                'failed_rows': self.failed_rows,
+            },
+            'throughput': {
+                'elapsed_seconds': round(elapsed, 2),
+                'rows_per_second': round(processed / elapsed, 1) if elapsed > 0 else 0,
+            },
+            'error_message': self.error_message,
+            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S') if self.created_at else None,
+            'started_at': self.started_at.strftime('%Y-%m-%d %H:%M:%S') if self.started_at else None,
+            'finished_at': self.finished_at.strftime('%Y-%m-%d %H:%M:%S') if self.finished_at else None,
+        }
+        if include_report:
+            data['report'] = self.report
+        return data
+
+
+class ExportManifest(models.Model):
+    """
+    导出文件索引：导出时登记文件信息，列出、复用、清理和下载计数都只查这张表而不扫描导出目录
+    后台导出任务先登记为等待中，写完文件后再更新为已完成
+    """
+    EXPORT_TYPES = [
+        ('users', '用户信息'),
+        ('applications', '申请审核记录'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', '等待中'),
+        ('running', '执行中'),
+        ('success', '已完成'),
+        ('failed', '失败'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    filename = models.CharField(max_length=255, unique=True, verbose_name='文件名')
+    export_format = models.CharField(max_length=20, default='xlsx', verbose_name='导出格式')
+    export_type = models.CharField(max_length=20, choices=EXPORT_TYPES, default='users', verbose_name='导出内容')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='success', verbose_name='状态')
+    error_message = models.TextField(blank=True, default='', verbose_name='错误信息')
+    fingerprint = models.CharField(max_length=64, db_index=True, verbose_name='内容指纹')
+    size = models.BigIntegerField(default=0, verbose_name='文件大小（字节）')
+    row_count = models.IntegerField(default=0, verbose_name='导出行数')
+    creator = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True,
+                                related_name='export_manifests', verbose_name='导出者')
+    duration = models.FloatField(default=0, verbose_name='导出耗时（秒）')
+    download_count = models.IntegerField(default=0, verbose_name='下载次数')
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='创建时间')
+    last_downloaded_at = models.DateTimeField(null=True, blank=True, verbose_name='最后下载时间')
+
+    class Meta:
+        db_table = 'export_manifest'
+        verbose_name = '导出文件'
+        verbose_name_plural = '导出文件'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.filename} ({self.row_count} 行)"
+
+    def to_dict(self):
+        """导出文件信息"""
+        from user.utils.export_utils import UserExporter
+
+        return {
+            'id': str(self.id),
+            'filename': self.filename,
+            'url': UserExporter.get_export_url(self.filename) if self.status == 'success' else None,
+            'format': self.export_format,
+            'export_type': self.export_type,
+            'status': self.status,
+            'error_message': self.error_message,
+            'size': self.size,
+            'row_count': self.row_count,
+            'creator': self.creator.school_id if self.creator else None,
+            'duration': round(self.duration, 2),
+            'created_time': int(self.created_at.timestamp() * 1000) if self.created_at else None,
+            'download_count': self.download_count,
+        }
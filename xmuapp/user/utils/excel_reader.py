@@ -0,0 +1,182 @@
+# utils/excel_reader.py
+import codecs
+import csv
+import io
+
+from openpyxl import load_workbook
+
+# 支持导入的文件格式
+SUPPORTED_EXTENSIONS = ('.xlsx', '.xls', '.csv', '.tsv')
+
+# 编码检测读取的字节数
+ENCODING_SAMPLE_SIZE = 256 * 1024
+
+
+def detect_encoding(stream):
+    """
+    检测CSV文件编码：带BOM或能按UTF-8解码的视为UTF-8，否则按GBK（使用其超集GB18030）处理
+    只读取文件开头的一段样本，读取后回到文件开头
+    """
+    sample = stream.read(ENCODING_SAMPLE_SIZE)
+    stream.seek(0)
+
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        # 样本末尾可能截断多字节字符，使用增量解码器忽略未完成的字节
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'gb18030'
+
+
+def normalize_column_name(column, column_mapping):
+    """
+    标准化单个列名：先完整匹配中文映射，再部分匹配，否则使用小写原列名
+    """
+    cleaned_col = str(column).strip().replace(' ', '').replace('\n', '').replace('\t', '')
+
+    # 1. 完整匹配
+    if cleaned_col in column_mapping:
+        return column_mapping[cleaned_col]
+
+    # 2. 部分匹配
+    for chinese_name, sys_name in column_mapping.items():
+        if chinese_name in cleaned_col:
+            return sys_name
+
+    # 3. 默认使用原始列名（小写）
+    return cleaned_col.lower()
+
+
+def normalize_header(header, column_mapping):
+    """
+    标准化表头，重复列名添加后缀（与 DataFrame 版本的处理一致）
+    """
+    columns = []
+    col_count = {}
+    for column in header:
+        if column is None or str(column).strip() == '':
+            columns.append(None)
+            continue
+
+        mapped_col = normalize_column_name(column, column_mapping)
+        if mapped_col in col_count:
+            col_count[mapped_col] += 1
+            print(f"警告: 发现重复列名: {mapped_col}")
+            mapped_col = f"{mapped_col}_{col_count[mapped_col]}"
+        else:
+            col_count[mapped_col] = 1
+        columns.append(mapped_col)
+
+    return columns
+
+
+class StreamingExcelReader:
+    """
+    流式Excel/CSV读取器
+
+    .xlsx 使用 openpyxl read_only 模式逐行读取，.csv/.tsv 使用 csv 模块逐行读取（自动识别UTF-8/GBK），
+    内存占用与文件行数无关；每行以 {标准化列名: 值, '_row_num': 行号} 的字典返回，空行自动跳过。
+    """
+
+    def __init__(self, excel_file, column_mapping, max_rows=None, entity='记录'):
+        self.excel_file = excel_file
+        self.column_mapping = column_mapping
+        self.max_rows = max_rows
+        self.entity = entity
+        self.columns = []
+        self.row_count = 0
+        self._workbook = None
+        self._text_stream = None
+        self._rows = None
+
+    def open(self):
+        """打开文件并读取表头，返回标准化后的列名列表"""
+        name = self.excel_file.name.lower()
+        if not name.endswith(SUPPORTED_EXTENSIONS):
+            raise ValueError("只支持.xlsx、.xls格式的Excel文件或.csv、.tsv格式的文本文件")
+
+        if name.endswith(('.csv', '.tsv')):
+            header = self._open_csv(delimiter='\t' if name.endswith('.tsv') else ',')
+        elif name.endswith('.xls'):
+            # openpyxl 不支持旧版 .xls，回退到 pandas 读取
+            import pandas as pd
+            df = pd.read_excel(self.excel_file)
+            header = list(df.columns)
+            self._rows = (
+                tuple(None if pd.isna(value) else value for value in row)
+                for row in df.itertuples(index=False, name=None)
+            )
+        else:
+            self._workbook = load_workbook(self.excel_file, read_only=True, data_only=True)
+            rows = self._workbook.worksheets[0].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                self.close()
+                raise ValueError("Excel文件为空")
+            self._rows = rows
+
+        self.columns = normalize_header(header, self.column_mapping)
+        print(f"原始列名: {list(header)}")
+        print(f"标准化后列名: {self.columns}")
+        return self.columns
+
+    def _open_csv(self, delimiter):
+        """以检测到的编码打开CSV/TSV文件，返回表头"""
+        # Django 上传文件对象的底层文件支持 TextIOWrapper 所需的缓冲区接口
+        stream = getattr(self.excel_file, 'file', self.excel_file)
+        stream.seek(0)
+        encoding = detect_encoding(stream)
+        print(f"CSV文件编码: {encoding}")
+
+        self._text_stream = io.TextIOWrapper(stream, encoding=encoding, newline='')
+        rows = csv.reader(self._text_stream, delimiter=delimiter)
+        try:
+            header = next(rows, None)
+        except UnicodeDecodeError:
+            self.close()
+            raise ValueError("CSV文件编码无法识别，请使用UTF-8或GBK编码保存")
+        if header is None:
+            self.close()
+            raise ValueError("CSV文件为空")
+
+        self._rows = rows
+        return header
+
+    def __iter__(self):
+        if self._rows is None:
+            self.open()
+
+        try:
+            for row_num, values in enumerate(self._rows, start=2):  # Excel行号（从2开始）
+                if values is None or all(value is None or str(value).strip() == '' for value in values):
+                    continue
+
+                self.row_count += 1
+                if self.max_rows is not None and self.row_count > self.max_rows:
+                    raise ValueError(f"单次导入不能超过{self.max_rows}个{self.entity}")
+
+                # 短行补齐为 None，保证每行都包含全部列
+                row = dict.fromkeys(column for column in self.columns if column is not None)
+                for column, value in zip(self.columns, values):
+                    if column is not None:
+                        row[column] = value
+                row['_row_num'] = row_num
+                yield row
+
+            if self.row_count == 0:
+                raise ValueError("Excel文件为空")
+        except UnicodeDecodeError:
+            raise ValueError("CSV文件编码无法识别，请使用UTF-8或GBK编码保存")
+        finally:
+            self.close()
+
+    def close(self):
+        if self._workbook is not None:
+            self._workbook.close()
+            self._workbook = None
+        if self._text_stream is not None:
+            # 分离而不是关闭，避免关闭上传文件本身
+            self._text_stream.detach()
+            self._text_stream = None
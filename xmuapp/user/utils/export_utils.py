@@ -1,19 +1,68 @@
 # utils/export_utils.py
+import csv
+import json
 import os
-from datetime import datetime
+import pickle
+import tempfile
+from datetime import datetime, timedelta
 import pandas as pd
 import hashlib
 import time
 from io import BytesIO
 from django.conf import settings
 from django.db import transaction
-from user.models import User
+from django.db.models import Count, F, Max
+from django.utils import timezone
+from user.models import User, ExportManifest
 from score.models import AcademicPerformance
 
 # 导入 openpyxl 样式
-from openpyxl.styles import Alignment, Font, Border, Side, PatternFill
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, Border, Side, PatternFill, NamedStyle
 from openpyxl.utils import get_column_letter
 
+# 导出列（精简字段）及对应的查询字段
+BASE_COLUMNS = ['学号/工号', '姓名', '用户类型', '学院', '联系方式', '邮箱', '创建时间']
+BASE_FIELDS = ['school_id', 'name', 'user_type', 'college', 'contact', 'email', 'date_joined']
+
+# 学生特定列，只有导出范围内包含学生时才输出
+STUDENT_COLUMNS = ['绩点(GPA)', '四级成绩', '六级成绩', '综合总分', '学业成绩', '加权分数', '绩点排名', '排名维度']
+STUDENT_FIELDS = [
+    'academic_performance__id',
+    'academic_performance__gpa',
+    'academic_performance__cet4',
+    'academic_performance__cet6',
+    'academic_performance__total_comprehensive_score',
+    'academic_performance__academic_score',
+    'academic_performance__weighted_score',
+    'academic_performance__gpa_ranking',
+    'academic_performance__ranking_dimension',
+]
+
+# 每次从数据库读取的行数
+EXPORT_CHUNK_SIZE = 2000
+
+# 导出格式 -> 写出方法
+EXPORT_FORMATS = {
+    'xlsx': 'write_users_excel',
+    'csv': 'write_users_csv',
+    'parquet': 'write_users_parquet',
+}
+
+# 导出内容格式版本：导出列或格式变化时修改，使已缓存的导出文件失效
+EXPORT_VERSION = 1
+
+# 文件名中保留的指纹长度
+FINGERPRINT_LENGTH = 12
+
+# 指纹相同的导出文件复用时限（秒）
+EXPORT_CACHE_MAX_AGE = getattr(settings, 'EXPORT_CACHE_MAX_AGE', 3600)
+
+# 命名样式
+HEADER_STYLE = 'export_header'
+CELL_STYLE = 'export_cell'
+
 
 class UserExporter:
     """用户信息导出器 - 精简版"""
@@ -49,11 +98,16 @@ class UserExporter:
         return filename
 
     @staticmethod
-    def get_export_path(filename):
-        """获取导出文件完整路径"""
+    def get_export_dir():
+        """获取导出目录"""
         export_dir = os.path.join(settings.MEDIA_ROOT, 'exports')
         os.makedirs(export_dir, exist_ok=True)
-        return os.path.join(export_dir, filename)
+        return export_dir
+
+    @staticmethod
+    def get_export_path(filename):
+        """获取导出文件完整路径"""
+        return os.path.join(UserExporter.get_export_dir(), filename)
 
     @staticmethod
     def get_export_url(filename):
@@ -64,10 +118,24 @@ class UserExporter:
     def export_users_to_excel(accounts, request_user):
         """
         导出用户信息到Excel文件，返回文件信息
+        按块流式读取用户并以 write_only 模式写入，内存占用与导出人数无关
+        """
+        return UserExporter.export_users(accounts, request_user, 'xlsx')
+
+    @staticmethod
+    def export_users(accounts, request_user, export_format='xlsx'):
+        """
+        导出用户信息到文件，返回文件信息
+        export_format: xlsx（带样式的Excel）、csv（UTF-8 BOM，Excel可直接打开）或 parquet（列式，按块写入行组）
         """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"不支持的导出格式: {export_format}，可选: {', '.join(EXPORT_FORMATS)}")
+
         print("=== 开始导出用户信息 ===")
         print(f"📋 请求用户: {request_user.school_id} ({request_user.name})")
         print(f"📋 导出账号: {accounts}")
+        print(f"📋 导出格式: {export_format}")
+        start_time = time.time()
 
         # 确定导出范围
         export_all = (len(accounts) == 1 and accounts[0] == "*")
@@ -75,123 +143,172 @@ class UserExporter:
         # 查询用户数据
         with transaction.atomic():
             if export_all:
-                users = User.objects.all().select_related('academic_performance')
+                users = User.objects.all()
                 user_type = 'all'
                 print("✅ 导出范围: 所有用户")
             else:
-                users = User.objects.filter(
-                    school_id__in=accounts
-                ).select_related('academic_performance')
+                users = User.objects.filter(school_id__in=accounts)
                 user_type = 'selected'
                 print(f"✅ 导出范围: 指定账号 {len(accounts)} 个")
 
-            user_count = users.count()
+            # 一次聚合查询得到导出指纹，输入未变化时直接复用已有文件
+            fingerprint, user_count = UserExporter.export_fingerprint(users, accounts, export_format)
             if user_count == 0:
                 raise ValueError("未找到符合条件的用户")
 
             print(f"✅ 查询到 {user_count} 个用户")
 
-            # 准备数据
-            data_list = UserExporter.prepare_user_data(users)
-
-            # 生成Excel（带样式）
-            excel_data = UserExporter.generate_styled_excel(data_list)
+            manifest = UserExporter.find_cached_export(fingerprint, export_format)
+            if manifest:
+                print(f"✅ 导出内容未变化，复用已有文件: {manifest.filename}")
+                return UserExporter.file_info(manifest, cached=True)
 
-            # 生成文件名并保存
+            # 生成文件名（带指纹，便于下次查找）
             filename = UserExporter.generate_filename(
                 accounts if not export_all else [],
                 user_type
             )
+            filename = f"{os.path.splitext(filename)[0]}_{fingerprint[:FINGERPRINT_LENGTH]}.{export_format}"
             filepath = UserExporter.get_export_path(filename)
 
-            # 保存文件
-            with open(filepath, 'wb') as f:
-                f.write(excel_data)
+            # 流式生成文件，先写临时文件再替换，避免下载到写了一半的文件
+            include_student_columns = users.filter(user_type=0).exists()
+            writer = getattr(UserExporter, EXPORT_FORMATS[export_format])
+            temp_path = f"{filepath}.tmp"
+            try:
+                row_count = writer(users.order_by('pk'), temp_path, include_student_columns)
+                os.replace(temp_path, filepath)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+            # 登记到导出文件索引
+            manifest = ExportManifest.objects.create(
+                filename=filename,
+                export_format=export_format,
+                fingerprint=fingerprint,
+                size=os.path.getsize(filepath),
+                row_count=row_count,
+                creator=request_user,
+                duration=time.time() - start_time,
+            )
 
-            print(f"✅ Excel文件保存成功: {filename}")
-            print(f"📁 文件大小: {len(excel_data)} 字节")
+            print(f"✅ 导出文件保存成功: {filename}")
+            print(f"📁 文件大小: {manifest.size} 字节，耗时 {manifest.duration:.2f}秒")
+            return UserExporter.file_info(manifest)
 
-            # 返回文件信息
-            return {
-                'filename': filename,
-                'filepath': filepath,
-                'url': UserExporter.get_export_url(filename),
-                'size': len(excel_data),
-                'count': user_count,
-                'export_time': int(time.time() * 1000)
-            }
+    @staticmethod
+    def file_info(manifest, cached=False):
+        """导出文件信息"""
+        return {
+            'filename': manifest.filename,
+            'filepath': UserExporter.get_export_path(manifest.filename),
+            'url': UserExporter.get_export_url(manifest.filename),
+            'size': manifest.size,
+            'count': manifest.row_count,
+            'fingerprint': manifest.fingerprint,
+            'cached': cached,
+            'export_time': int(time.time() * 1000)
+        }
 
     @staticmethod
-    def prepare_user_data(users):
-        """准备用户数据（精简字段） - 增强容错性"""
-        data_list = []
+    def export_fingerprint(users, accounts, export_format='xlsx'):
+        """
+        计算导出输入的指纹，返回 (指纹, 用户数)
+        由导出格式、账号集合、用户数、最后注册时间、成绩最后更新时间和成绩版本号组成；
+        批量重算、对账和排名更新不修改 updated_at，但都会递增成绩版本号
+        """
+        from score.services.rank_index import get_score_version
 
-        for user in users:
-            try:
-                # 尝试获取关联的成绩信息，如果不存在则设为None
-                academic = getattr(user, 'academic_performance', None)
-
-                # 基础用户信息（精简版）
-                user_data = {
-                    '学号/工号': user.school_id,
-                    '姓名': user.name,
-                    '用户类型': UserExporter.get_user_type_display(user.user_type),
-                    '学院': user.college or '',
-                    '联系方式': user.contact or '',
-                    '邮箱': user.email or '',
-                    '创建时间': user.date_joined.strftime('%Y-%m-%d %H:%M:%S') if user.date_joined else '',
-                }
-
-                # 学生特定字段（精简）- 安全处理
-                if user.user_type == 0:  # 学生
-                    if academic:
-                        # 有成绩信息
-                        user_data.update({
-                            '绩点(GPA)': UserExporter.format_decimal(academic.gpa),
-                            '四级成绩': academic.cet4 if academic.cet4 != -1 else '未参加',
-                            '六级成绩': academic.cet6 if academic.cet6 != -1 else '未参加',
-                            '综合总分': UserExporter.format_decimal(academic.total_comprehensive_score),
-                            '学业成绩': UserExporter.format_decimal(academic.academic_score),
-                            '加权分数': UserExporter.format_decimal(academic.weighted_score),
-                            '绩点排名': academic.gpa_ranking if academic.gpa_ranking else '',
-                            '排名维度': academic.ranking_dimension if academic.ranking_dimension else '',
-                        })
-                    else:
-                        # 没有成绩信息，显示空值
-                        user_data.update({
-                            '绩点(GPA)': '',
-                            '四级成绩': '未参加',
-                            '六级成绩': '未参加',
-                            '综合总分': '',
-                            '学业成绩': '',
-                            '加权分数': '',
-                            '绩点排名': '',
-                            '排名维度': '未设置',
-                        })
-                        print(f"⚠️ 用户 {user.school_id} 缺少 AcademicPerformance 记录")
-
-                # 教师特定字段
-                elif user.user_type == 1:
-                    user_data.update({
-                    })
-
-                data_list.append(user_data)
-
-            except Exception as e:
-                print(f"❌ 处理用户 {user.school_id} 数据时出错: {e}")
-                # 即使出错也添加基础信息
-                data_list.append({
-                    '学号/工号': user.school_id,
-                    '姓名': user.name,
-                    '用户类型': UserExporter.get_user_type_display(user.user_type),
-                    '学院': '数据错误',
-                    '专业': '数据错误',
-                    '联系方式': '',
-                    '邮箱': '',
-                    '创建时间': '',
-                })
-
-        return data_list
+        stats = users.aggregate(
+            count=Count('pk'),
+            last_joined=Max('date_joined'),
+            last_updated=Max('academic_performance__updated_at'),
+        )
+        source = json.dumps({
+            'version': EXPORT_VERSION,
+            'format': export_format,
+            'accounts': sorted(set(accounts)),
+            'count': stats['count'],
+            'last_joined': stats['last_joined'].isoformat() if stats['last_joined'] else None,
+            'last_updated': stats['last_updated'].isoformat() if stats['last_updated'] else None,
+            'score_version': get_score_version(),
+        }, sort_keys=True)
+        return hashlib.sha256(source.encode('utf-8')).hexdigest(), stats['count']
+
+    @staticmethod
+    def find_cached_export(fingerprint, export_format='xlsx', max_age_seconds=EXPORT_CACHE_MAX_AGE, creator=None):
+        """
+        从导出文件索引中查找指纹相同且未过期的导出文件，返回 ExportManifest 或 None
+        用户基本信息修改不改变指纹，因此缓存文件只在 max_age_seconds 内复用
+        指定 creator 时只复用该用户导出的文件
+        """
+        manifests = ExportManifest.objects.filter(
+            fingerprint=fingerprint,
+            export_format=export_format,
+            status='success',
+            created_at__gte=timezone.now() - timedelta(seconds=max_age_seconds),
+        )
+        if creator is not None:
+            manifests = manifests.filter(creator=creator)
+        manifest = manifests.order_by('-created_at').first()
+
+        if manifest and not os.path.exists(UserExporter.get_export_path(manifest.filename)):
+            # 文件已被手动删除，索引记录作废
+            manifest.delete()
+            return None
+        return manifest
+
+    @staticmethod
+    def record_download(filename):
+        """下载计数，返回 ExportManifest；文件不在索引中返回 None"""
+        updated = ExportManifest.objects.filter(filename=filename).update(
+            download_count=F('download_count') + 1,
+            last_downloaded_at=timezone.now(),
+        )
+        if not updated:
+            return None
+        return ExportManifest.objects.get(filename=filename)
+
+    @staticmethod
+    def user_row(values, include_student_columns):
+        """由 values() 查询结果生成一行导出数据（精简字段），顺序与导出列一致"""
+        date_joined = values['date_joined']
+        row = [
+            values['school_id'],
+            values['name'],
+            UserExporter.get_user_type_display(values['user_type']),
+            values['college'] or '',
+            values['contact'] or '',
+            values['email'] or '',
+            date_joined.strftime('%Y-%m-%d %H:%M:%S') if date_joined else '',
+        ]
+
+        if not include_student_columns:
+            return row
+
+        if values['user_type'] != 0:
+            # 非学生没有成绩列
+            row.extend([None] * len(STUDENT_COLUMNS))
+        elif values['academic_performance__id'] is not None:
+            # 有成绩信息
+            cet4 = values['academic_performance__cet4']
+            cet6 = values['academic_performance__cet6']
+            row.extend([
+                UserExporter.format_decimal(values['academic_performance__gpa']),
+                cet4 if cet4 != -1 else '未参加',
+                cet6 if cet6 != -1 else '未参加',
+                UserExporter.format_decimal(values['academic_performance__total_comprehensive_score']),
+                UserExporter.format_decimal(values['academic_performance__academic_score']),
+                UserExporter.format_decimal(values['academic_performance__weighted_score']),
+                values['academic_performance__gpa_ranking'] or '',
+                values['academic_performance__ranking_dimension'] or '',
+            ])
+        else:
+            # 没有成绩信息，显示空值
+            row.extend(['', '未参加', '未参加', '', '', '', '', '未设置'])
+
+        return row
 
     @staticmethod
     def format_decimal(value):
@@ -204,140 +321,251 @@ class UserExporter:
             return ''
 
     @staticmethod
-    def generate_styled_excel(data_list):
-        """生成带样式的Excel文件（列宽自适应 + 内容居中）"""
-        if not data_list:
-            raise ValueError("没有数据可以导出")
-
-        df = pd.DataFrame(data_list)
-
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            # 写入数据
-            df.to_excel(writer, index=False, sheet_name='用户信息')
-
-            # 获取worksheet
-            worksheet = writer.sheets['用户信息']
-
-            # 🔧 1. 智能调整列宽（根据最大字数适配）
-            UserExporter.adjust_column_width_smart(worksheet, df)
-
-            # 🎯 2. 设置内容居中
-            UserExporter.center_all_cells(worksheet)
-
-            # 🎨 3. 应用表格样式（可选）
-            UserExporter.apply_table_styles(worksheet, df)
-
-        return output.getvalue()
+    def display_width(value):
+        """单元格显示宽度：含中文的内容宽度加倍"""
+        value_str = str(value)
+        if any('\u4e00' <= c <= '\u9fff' for c in value_str):
+            return len(value_str) * 2
+        return len(value_str)
 
     @staticmethod
-    def adjust_column_width_smart(worksheet, df):
-        """智能调整列宽 - 根据最大字数适配"""
-        print("🔧 开始智能调整列宽...")
-
-        for i, column_name in enumerate(df.columns, start=1):
-            column_letter = get_column_letter(i)
-            column_data = df.iloc[:, i - 1]
+    def column_width(column_name, max_width):
+        """根据最大显示宽度计算列宽：添加边距，最小8，最大50，特定字段单独限制"""
+        adjusted_width = min(max(max_width + 2, 8), 50)
 
-            # 计算最大宽度
-            max_width = 0
+        if '邮箱' in column_name or 'Email' in column_name:
+            adjusted_width = min(adjusted_width, 30)
+        elif '联系方式' in column_name or '电话' in column_name:
+            adjusted_width = min(adjusted_width, 15)
+        elif '学号' in column_name or '工号' in column_name:
+            adjusted_width = min(adjusted_width, 12)
 
-            # 1. 表头宽度
-            header_width = len(str(column_name))
-            if any('\u4e00' <= c <= '\u9fff' for c in str(column_name)):
-                header_width *= 2  # 中文字符宽度加倍
+        return adjusted_width
 
-            max_width = max(max_width, header_width)
-
-            # 2. 数据行最大宽度
-            for value in column_data:
-                if pd.notna(value):
-                    value_str = str(value)
-                    value_width = len(value_str)
-
-                    # 考虑中文字符宽度
-                    if any('\u4e00' <= c <= '\u9fff' for c in value_str):
-                        value_width = value_width * 2
-
-                    max_width = max(max_width, value_width)
-
-            # 3. 添加边距并设置限制
-            adjusted_width = min(max(max_width + 2, 8), 50)  # 最小8，最大50
-
-            # 4. 特定字段的特殊处理
-            column_name_str = str(column_name)
-            if '邮箱' in column_name_str or 'Email' in column_name_str:
-                adjusted_width = min(adjusted_width, 30)
-            elif '联系方式' in column_name_str or '电话' in column_name_str:
-                adjusted_width = min(adjusted_width, 15)
-            elif '学号' in column_name_str or '工号' in column_name_str:
-                adjusted_width = min(adjusted_width, 12)
-
-            # 设置列宽
-            worksheet.column_dimensions[column_letter].width = adjusted_width
+    @staticmethod
+    def create_styled_workbook():
+        """创建 write_only 工作簿并注册表头和内容的命名样式（边框 + 居中，表头加粗灰底）"""
+        thin_side = Side(style='thin', color='000000')
+        thin_border = Border(left=thin_side, right=thin_side, top=thin_side, bottom=thin_side)
+        center_alignment = Alignment(horizontal='center', vertical='center', wrap_text=False)
+
+        header_style = NamedStyle(name=HEADER_STYLE)
+        header_style.font = Font(bold=True, size=11, color="000000")
+        header_style.fill = PatternFill(start_color="E0E0E0", end_color="E0E0E0", fill_type="solid")
+        header_style.border = thin_border
+        header_style.alignment = center_alignment
+
+        cell_style = NamedStyle(name=CELL_STYLE)
+        cell_style.border = thin_border
+        cell_style.alignment = center_alignment
+
+        workbook = Workbook(write_only=True)
+        workbook.add_named_style(header_style)
+        workbook.add_named_style(cell_style)
+        return workbook
 
-            print(f"  {column_name_str}: {adjusted_width:.1f} 字符宽度")
+    @staticmethod
+    def styled_cells(worksheet, values, style):
+        """生成带命名样式的一行 write_only 单元格"""
+        cells = []
+        for value in values:
+            cell = WriteOnlyCell(worksheet, value=value)
+            cell.style = style
+            cells.append(cell)
+        return cells
 
     @staticmethod
-    def center_all_cells(worksheet):
-        """设置所有单元格内容居中"""
-        print("🎯 设置单元格内容居中...")
-
-        # 创建居中对齐样式
-        center_alignment = Alignment(
-            horizontal='center',  # 水平居中
-            vertical='center',  # 垂直居中
-            wrap_text=False  # 不自动换行
-        )
+    def write_users_excel(users, filepath, include_student_columns, chunk_size=EXPORT_CHUNK_SIZE):
+        """流式写出用户Excel：values().iterator() 按块读取，逐行格式化后交给 write_rows_excel"""
+        columns = BASE_COLUMNS + (STUDENT_COLUMNS if include_student_columns else [])
+        fields = BASE_FIELDS + (STUDENT_FIELDS if include_student_columns else [])
+        missing_performance = 0
+
+        def rows():
+            nonlocal missing_performance
+            for values in users.values(*fields).iterator(chunk_size=chunk_size):
+                if include_student_columns and values['user_type'] == 0 and values['academic_performance__id'] is None:
+                    missing_performance += 1
+                yield UserExporter.user_row(values, include_student_columns)
+
+        row_count = UserExporter.write_rows_excel(columns, rows(), filepath, '用户信息', chunk_size)
+        if missing_performance:
+            print(f"⚠️ {missing_performance} 个学生缺少 AcademicPerformance 记录")
+        return row_count
 
-        # 应用到所有单元格
-        for row in worksheet.iter_rows():
-            for cell in row:
-                cell.alignment = center_alignment
+    @staticmethod
+    def write_rows_excel(columns, rows, filepath, sheet_name, chunk_size=EXPORT_CHUNK_SIZE):
+        """
+        流式写出带样式的Excel，rows 为逐行产生导出数据的迭代器：
+        1. 每块数据暂存到临时文件，同时累计每列最大宽度；
+        2. write_only 模式要求写入数据前确定列宽，因此读完后设置列宽，再从临时文件逐块写入
+        内存中最多只有一块数据，耗时与行数成线性关系
+        """
+        max_widths = [UserExporter.display_width(column) for column in columns]
+        row_count = 0
+
+        with tempfile.TemporaryFile() as spool:
+            chunk = []
+            for row in rows:
+                for index, value in enumerate(row):
+                    if value is not None:
+                        width = UserExporter.display_width(value)
+                        if width > max_widths[index]:
+                            max_widths[index] = width
+
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    pickle.dump(chunk, spool, protocol=pickle.HIGHEST_PROTOCOL)
+                    row_count += len(chunk)
+                    chunk = []
+
+            if chunk:
+                pickle.dump(chunk, spool, protocol=pickle.HIGHEST_PROTOCOL)
+                row_count += len(chunk)
+
+            if row_count == 0:
+                raise ValueError("没有数据可以导出")
+
+            workbook = UserExporter.create_styled_workbook()
+            worksheet = workbook.create_sheet(sheet_name)
+
+            # 🔧 列宽根据最大字数适配
+            for index, column in enumerate(columns):
+                worksheet.column_dimensions[get_column_letter(index + 1)].width = \
+                    UserExporter.column_width(column, max_widths[index])
+
+            worksheet.append(UserExporter.styled_cells(worksheet, columns, HEADER_STYLE))
+
+            spool.seek(0)
+            while True:
+                try:
+                    chunk = pickle.load(spool)
+                except EOFError:
+                    break
+                for row in chunk:
+                    worksheet.append(UserExporter.styled_cells(worksheet, row, CELL_STYLE))
 
-        # 表头加粗
-        for cell in worksheet[1]:  # 第一行是表头
-            cell.font = Font(bold=True, size=11)
+            workbook.save(filepath)
 
-        print(f"✅ 已完成 {worksheet.max_row} 行 × {worksheet.max_column} 列的内容居中")
+        print(f"✅ 已流式写出 {row_count} 行 × {len(columns)} 列")
+        return row_count
 
     @staticmethod
-    def apply_table_styles(worksheet, df):
-        """应用表格样式（美化）"""
-        print("🎨 应用表格样式...")
-
-        # 创建边框样式
-        thin_border = Border(
-            left=Side(style='thin', color='000000'),
-            right=Side(style='thin', color='000000'),
-            top=Side(style='thin', color='000000'),
-            bottom=Side(style='thin', color='000000')
+    def write_users_csv(users, filepath, include_student_columns, chunk_size=EXPORT_CHUNK_SIZE):
+        """流式写出用户CSV：内容与Excel导出一致"""
+        columns = BASE_COLUMNS + (STUDENT_COLUMNS if include_student_columns else [])
+        fields = BASE_FIELDS + (STUDENT_FIELDS if include_student_columns else [])
+        rows = (
+            UserExporter.user_row(values, include_student_columns)
+            for values in users.values(*fields).iterator(chunk_size=chunk_size)
         )
+        return UserExporter.write_rows_csv(columns, rows, filepath)
 
-        # 表头背景色
-        header_fill = PatternFill(
-            start_color="E0E0E0",  # 浅灰色
-            end_color="E0E0E0",
-            fill_type="solid"
-        )
+    @staticmethod
+    def write_rows_csv(columns, rows, filepath):
+        """流式写出CSV：逐行写入，使用带BOM的UTF-8以便Excel直接打开"""
+        row_count = 0
+
+        with open(filepath, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow(row)
+                row_count += 1
+
+        if row_count == 0:
+            raise ValueError("没有数据可以导出")
 
-        # 应用样式
-        max_row = len(df) + 1
-        max_col = len(df.columns)
+        print(f"✅ 已流式写出 {row_count} 行 × {len(columns)} 列")
+        return row_count
 
-        for row in range(1, max_row + 1):
-            for col in range(1, max_col + 1):
-                cell = worksheet.cell(row=row, column=col)
+    @staticmethod
+    def user_record(values, include_student_columns):
+        """
+        由 values() 查询结果生成一行列式导出数据：保留原始类型，
+        缺失值（未参加考试、没有成绩记录、非学生）统一为空值而不是提示文字
+        """
+        record = [
+            values['school_id'],
+            values['name'],
+            UserExporter.get_user_type_display(values['user_type']),
+            values['college'] or '',
+            values['contact'] or '',
+            values['email'] or '',
+            values['date_joined'],
+        ]
+
+        if not include_student_columns:
+            return record
+
+        if values['user_type'] != 0 or values['academic_performance__id'] is None:
+            record.extend([None] * len(STUDENT_COLUMNS))
+        else:
+            cet4 = values['academic_performance__cet4']
+            cet6 = values['academic_performance__cet6']
+            record.extend([
+                UserExporter.format_number(values['academic_performance__gpa']),
+                cet4 if cet4 != -1 else None,
+                cet6 if cet6 != -1 else None,
+                UserExporter.format_number(values['academic_performance__total_comprehensive_score']),
+                UserExporter.format_number(values['academic_performance__academic_score']),
+                UserExporter.format_number(values['academic_performance__weighted_score']),
+                values['academic_performance__gpa_ranking'],
+                values['academic_performance__ranking_dimension'] or None,
+            ])
+
+        return record
 
-                # 设置边框
-                cell.border = thin_border
+    @staticmethod
+    def format_number(value):
+        """Decimal 转为 float，空值保留为 None"""
+        return None if value is None else float(value)
 
-                # 设置表头样式
-                if row == 1:
-                    cell.fill = header_fill
-                    cell.font = Font(bold=True, size=11, color="000000")
+    @staticmethod
+    def write_users_parquet(users, filepath, include_student_columns, chunk_size=EXPORT_CHUNK_SIZE):
+        """
+        流式写出用户Parquet：每读取一块数据写入一个行组，内存中最多只有一块数据
+        需要安装 pyarrow
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("导出Parquet格式需要安装 pyarrow，请联系管理员或改用 csv/xlsx 格式")
+
+        string, integer, number = pa.string(), pa.int32(), pa.float64()
+        types = [string, string, string, string, string, string, pa.timestamp('us', tz='UTC')]
+        if include_student_columns:
+            types += [number, integer, integer, number, number, number, integer, string]
+
+        columns = BASE_COLUMNS + (STUDENT_COLUMNS if include_student_columns else [])
+        fields = BASE_FIELDS + (STUDENT_FIELDS if include_student_columns else [])
+        schema = pa.schema(list(zip(columns, types)))
+        row_count = 0
+
+        def write_chunk(writer, chunk):
+            # 行转列后写入一个行组
+            arrays = [pa.array(list(values), type=column_type) for values, column_type in zip(zip(*chunk), types)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+        with pq.ParquetWriter(filepath, schema, compression='snappy') as writer:
+            chunk = []
+            for values in users.values(*fields).iterator(chunk_size=chunk_size):
+                chunk.append(UserExporter.user_record(values, include_student_columns))
+                if len(chunk) >= chunk_size:
+                    write_chunk(writer, chunk)
+                    row_count += len(chunk)
+                    chunk = []
+
+            if chunk:
+                write_chunk(writer, chunk)
+                row_count += len(chunk)
+
+        if row_count == 0:
+            raise ValueError("没有数据可以导出")
 
-        print("✅ 表格样式应用完成")
+        print(f"✅ 已流式写出 {row_count} 行 × {len(columns)} 列（{(row_count - 1) // chunk_size + 1} 个行组）")
+        return row_count
 
     @staticmethod
     def generate_excel_old(data_list):
@@ -372,34 +600,40 @@ class UserExporter:
         return {0: '学生', 1: '教师', 2: '超级管理员'}.get(user_type, '未知')
 
     @staticmethod
-    def cleanup_old_files(max_age_hours=24, max_files=100):
-        """清理旧的导出文件"""
-        import glob
-        import time
-
-        export_dir = os.path.join(settings.MEDIA_ROOT, 'exports')
-        if not os.path.exists(export_dir):
-            return
-
-        files = glob.glob(os.path.join(export_dir, '*.xlsx'))
-        files.sort(key=os.path.getmtime, reverse=True)
+    def cleanup_old_files(max_age_hours=24, max_files=100, max_total_size=None):
+        """
+        按导出文件索引清理旧的导出文件，返回 (清理文件数, 释放字节数)
+        超过 max_age_hours 的文件、最新 max_files 个之外的文件、
+        以及保留文件从新到旧累计超过 max_total_size 字节之后的文件都会被删除
+        未过期的后台导出任务尚未写完文件，不参与清理
+        """
+        cutoff = timezone.now() - timedelta(hours=float(max_age_hours))
+        max_files = int(max_files)
+
+        expired_ids = []
+        freed_size = 0
+        total_size = 0
+        manifests = ExportManifest.objects.exclude(
+            status__in=['pending', 'running'], created_at__gte=cutoff
+        ).order_by('-created_at').values_list('id', 'filename', 'size', 'created_at')
+        for index, (manifest_id, filename, size, created_at) in enumerate(manifests.iterator()):
+            if created_at < cutoff:
+                reason = '过期文件'
+            elif index >= max_files:
+                reason = '旧文件'
+            elif max_total_size is not None and total_size + size > max_total_size:
+                reason = '超出空间配额的文件'
+            else:
+                total_size += size
+                continue
 
-        # 按数量清理
-        if len(files) > max_files:
-            for file_to_remove in files[max_files:]:
-                try:
-                    os.remove(file_to_remove)
-                    print(f"🗑️ 清理旧文件: {os.path.basename(file_to_remove)}")
-                except:
-                    pass
-
-        # 按时间清理
-        current_time = time.time()
-        for filepath in files:
             try:
-                file_age = current_time - os.path.getmtime(filepath)
-                if file_age > max_age_hours * 3600:
-                    os.remove(filepath)
-                    print(f"🗑️ 清理过期文件: {os.path.basename(filepath)}")
-            except:
-                pass
\ No newline at end of file
+                os.remove(UserExporter.get_export_path(filename))
+                print(f"🗑️ 清理{reason}: {filename}")
+            except FileNotFoundError:
+                pass
+            expired_ids.append(manifest_id)
+            freed_size += size
+
+        ExportManifest.objects.filter(id__in=expired_ids).delete()
+        return len(expired_ids), freed_size
@@ -0,0 +1,405 @@
+# utils/import_engine.py
+import time
+from itertools import islice
+
+import pandas as pd
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from user.utils.excel_reader import StreamingExcelReader
+from user.utils.import_validation import (
+    RowErrors, text_column, numeric_column, mark_duplicates, frame_records
+)
+
+
+class ImportColumn:
+    """
+    导入列定义
+
+    Args:
+        field: 系统字段名
+        aliases: Excel中可能出现的列名（按顺序做完整匹配和部分匹配）
+        kind: 'text' 或 'number'
+        required: 是否为必需列（表头必须存在）；没有 default 时单元格也不能为空
+        default: 空值时的默认值
+        clip: (下限, 上限)，超出范围修正到边界
+        valid_range: (下限, 上限)，超出范围替换为 default
+        unique: 是否检测重复值（保留第一次出现）
+        label: 错误信息中使用的名称
+    """
+
+    def __init__(self, field, aliases, kind='text', required=False, default=None,
+                 clip=None, valid_range=None, unique=False, label=None):
+        self.field = field
+        self.aliases = aliases
+        self.kind = kind
+        self.required = required
+        self.default = default
+        self.clip = clip
+        self.valid_range = valid_range
+        self.unique = unique
+        self.label = label or field
+
+
+class ImportSchema:
+    """
+    导入模式基类：声明列、派生字段和目标模型，由 ImportEngine 执行
+    流式读取 -> 分块向量化校验 -> 分批插入
+    """
+    entity = '记录'
+    result_key = 'records'
+    max_rows = 1000
+    # 每次校验的行数，每块单独构造 DataFrame
+    chunk_size = 1000
+    batch_size = 500
+    default_password = '123456'
+    columns = []
+
+    @property
+    def column_mapping(self):
+        """列名别名 -> 系统字段名"""
+        mapping = {}
+        for column in self.columns:
+            for alias in column.aliases:
+                mapping.setdefault(alias, column.field)
+        return mapping
+
+    @property
+    def required_columns(self):
+        return [column.field for column in self.columns if column.required]
+
+    @property
+    def unique_column(self):
+        return next(column for column in self.columns if column.unique)
+
+    def derive(self, records):
+        """在校验通过的记录上计算派生字段（如学院、专业、年级），返回 DataFrame"""
+        return records
+
+    def build_objects(self, record, hashed_password):
+        """由一条记录构造待插入的模型对象列表，按依赖顺序排列"""
+        raise NotImplementedError
+
+    def success_entry(self, record, objects):
+        """导入报告中的成功记录"""
+        raise NotImplementedError
+
+    def after_insert(self, results):
+        """插入完成后的处理（如使缓存失效）"""
+
+
+class ImportEngine:
+    """通用导入引擎：所有导入共用同一套读取、校验和批量插入流程"""
+
+    def __init__(self, schema):
+        self.schema = schema
+        # 最近一次校验中被判定为重复的行
+        self.duplicates = []
+
+    # ---------- 读取 ----------
+
+    def open(self, excel_file):
+        """打开Excel并校验表头，返回逐行产出数据的流式读取器"""
+        schema = self.schema
+        print(f"=== 读取{schema.entity}Excel文件 ===")
+        print(f"文件名: {excel_file.name}")
+
+        reader = StreamingExcelReader(
+            excel_file, schema.column_mapping, max_rows=schema.max_rows, entity=schema.entity
+        )
+        columns = reader.open()
+
+        missing_columns = [column for column in schema.required_columns if column not in columns]
+        if missing_columns:
+            reader.close()
+            # 提示可能的中文列名
+            suggested_names = []
+            for column in schema.columns:
+                if column.field in missing_columns:
+                    suggested_names.append(f"{column.field}(可能的中文名: {', '.join(column.aliases)})")
+
+            error_msg = f"Excel缺少必需列: {missing_columns}"
+            if suggested_names:
+                error_msg += f"\n建议使用以下中文列名: {', '.join(suggested_names)}"
+            print(f"读取Excel失败: {error_msg}")
+            raise ValueError(error_msg)
+
+        return reader
+
+    # ---------- 校验 ----------
+
+    def parse(self, rows):
+        """
+        按 schema.chunk_size 行分块解析并校验全部行，返回 (有效记录列表, 错误信息列表)
+        同一时间只有一块数据在 DataFrame 中；重复值检测跨块进行
+        """
+        print(f"=== 开始解析{self.schema.entity}数据 ===")
+        start_time = time.time()
+
+        records, errors, duplicates = [], [], []
+        # 之前各块中校验通过的唯一列值 -> 行号
+        seen = {}
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.schema.chunk_size))
+            if not chunk:
+                break
+            chunk_records, chunk_errors = self.validate(pd.DataFrame(chunk), seen)
+            records.extend(chunk_records)
+            errors.extend(chunk_errors)
+            duplicates.extend(self.duplicates)
+        self.duplicates = duplicates
+
+        for error_msg in errors[:20]:
+            print(f"❌ {error_msg}")
+        print(f"=== 解析完成 ===")
+        print(f"成功: {len(records)} 条, 失败: {len(errors)} 条, 耗时 {time.time() - start_time:.2f}秒")
+
+        return records, errors
+
+    def validate(self, df, seen=None):
+        """
+        按列向量化校验，一次得到所有有效记录和逐行错误
+        seen 为之前各块中校验通过的 {唯一列值: 行号}，校验后追加本块的有效记录
+        """
+        self.duplicates = []
+        if df.empty:
+            return [], []
+
+        df = df.reset_index(drop=True)
+        row_nums = df['_row_num']
+        row_errors = RowErrors(df.index)
+        cleaned = {}
+
+        for column in self.schema.columns:
+            raw = df[column.field] if column.field in df.columns else pd.Series(None, index=df.index, dtype=object)
+            field = column.field
+
+            if column.kind == 'number':
+                values, invalid = numeric_column(raw)
+                row_errors.add(invalid, lambda i, field=field, raw=raw: (
+                    f"第{row_nums[i]}行列'{field}'值'{raw[i]}'转换失败"
+                ))
+                missing = values.isna() & ~invalid
+            else:
+                values = text_column(raw)
+                missing = values.isna()
+
+            if column.required and column.default is None:
+                row_errors.add(missing, lambda i, field=field: f"第{row_nums[i]}行列'{field}'不能为空")
+
+            if column.clip is not None:
+                low, high = column.clip
+                out_of_range = values.notna() & ~values.between(low, high)
+                if out_of_range.any():
+                    print(f"    警告: {int(out_of_range.sum())} 行{column.label}超出范围，已修正为{low}或{high}")
+                values = values.clip(low, high)
+
+            if column.valid_range is not None:
+                low, high = column.valid_range
+                in_range = values.between(low, high)
+                out_of_range = values.notna() & ~in_range & values.ne(column.default)
+                if out_of_range.any():
+                    print(f"    警告: {int(out_of_range.sum())} 行{column.label}无效，设为{column.default}")
+                values = values.where(in_range, column.default)
+
+            if column.default is not None:
+                values = values.fillna(column.default)
+
+            cleaned[field] = values
+
+        # 重复值：在其余校验通过的记录中只保留第一次出现的
+        unique = self.schema.unique_column
+        duplicate_messages = mark_duplicates(
+            cleaned[unique.field].where(~row_errors.has_error()), row_nums, unique.label, seen
+        )
+        row_errors.add_messages(duplicate_messages)
+        self.duplicates = [
+            {'row_num': int(row_nums[index]), unique.field: cleaned[unique.field][index], 'message': message}
+            for index, message in sorted(duplicate_messages.items())
+        ]
+
+        valid = ~row_errors.has_error()
+        if seen is not None:
+            seen.update(zip(cleaned[unique.field][valid], row_nums[valid]))
+        records = []
+        # 整块都没有有效记录时跳过派生字段计算（空列上无法使用字符串操作）
+        if valid.any():
+            valid_records = pd.DataFrame({field: values[valid] for field, values in cleaned.items()})
+            valid_records['_row_num'] = row_nums[valid]
+            records = frame_records(self.schema.derive(valid_records))
+
+        errors = [
+            f"第{row_nums[index]}行数据解析失败: {'; '.join(messages)}"
+            for index, messages in sorted(row_errors.errors.items())
+        ]
+        return records, errors
+
+    # ---------- 插入 ----------
+
+    def existing_ids(self, ids, batch_size=None):
+        """分批查询系统中已存在的学号/工号，batch_size 默认取 schema.batch_size"""
+        from user.models import User
+
+        batch_size = batch_size or self.schema.batch_size
+        existing = set()
+        for offset in range(0, len(ids), batch_size):
+            existing.update(User.objects.filter(
+                school_id__in=ids[offset:offset + batch_size]
+            ).values_list('school_id', flat=True))
+        return existing
+
+    # ---------- 预检 ----------
+
+    def dry_run(self, excel_file, update_existing=False):
+        """
+        预检导入文件：完整解析和校验全部行，并用一次集合查询检查与系统中已有学号/工号的冲突，
+        返回完整的错误、重复和冲突报告以及预计导入数量，不写入数据库
+
+        Args:
+            update_existing: upsert 模式下已存在的记录计为待更新而不是冲突
+        """
+        schema = self.schema
+        timings = {}
+        start_time = time.time()
+
+        reader = self.open(excel_file)
+        timings['open'] = time.time() - start_time
+
+        parse_start = time.time()
+        records, parse_errors = self.parse(reader)
+        timings['parse'] = time.time() - parse_start
+
+        # 文件内已去重，学号/工号唯一，最多 max_rows 个，一次查询即可
+        check_start = time.time()
+        ids = [record['school_id'] for record in records]
+        existing = self.existing_ids(ids, batch_size=max(len(ids), 1))
+        timings['conflict_check'] = time.time() - check_start
+        timings['total'] = time.time() - start_time
+
+        existing_records = [
+            {
+                'row_num': record.get('_row_num', '未知'),
+                'school_id': record['school_id'],
+                'name': record.get('name', '未知'),
+                'message': f"{schema.unique_column.label} {record['school_id']} 在系统中已存在"
+            }
+            for record in records if record['school_id'] in existing
+        ]
+
+        summary = {
+            'total_rows': reader.row_count,
+            'valid_rows': len(records),
+            'error_rows': len(parse_errors),
+            'duplicate_rows': len(self.duplicates),
+            'conflict_rows': 0 if update_existing else len(existing_records),
+            'would_insert_count': len(records) - len(existing_records),
+        }
+        if update_existing:
+            summary['would_update_count'] = len(existing_records)
+
+        print(f"✅ 预检完成: 有效 {len(records)} 条, 错误 {len(parse_errors)} 条, "
+              f"已存在 {len(existing_records)} 条, 耗时 {timings['total']:.2f}秒")
+
+        return {
+            'dry_run': True,
+            'file_name': excel_file.name,
+            'summary': summary,
+            'parse_errors': parse_errors,
+            'duplicates': self.duplicates,
+            'existing': existing_records,
+            'timings': {stage: round(seconds, 3) for stage, seconds in timings.items()},
+        }
+
+    def new_results(self):
+        key = self.schema.result_key
+        return {
+            'success_count': 0,
+            'failed_count': 0,
+            f'success_{key}': [],
+            f'failed_{key}': []
+        }
+
+    def record_success(self, results, record, objects):
+        results['success_count'] += 1
+        results[f'success_{self.schema.result_key}'].append(self.schema.success_entry(record, objects))
+
+    def record_failure(self, results, record, error_msg):
+        row_num = record.get('_row_num', '未知')
+        results['failed_count'] += 1
+        results[f'failed_{self.schema.result_key}'].append({
+            'row_num': row_num,
+            'school_id': record['school_id'],
+            'name': record.get('name', '未知'),
+            'error': error_msg
+        })
+        print(f"❌ 行{row_num}: 创建失败 - {error_msg}")
+
+    def insert(self, records, progress=None):
+        """
+        批量插入：一次查询预取已存在的学号/工号，默认密码只哈希一次，按批 bulk_create；
+        某一批插入失败时该批回退到逐行插入，以便逐行报告失败原因
+
+        Args:
+            progress: 可选回调 progress(success_count, failed_count)，每批完成后调用
+        """
+        schema = self.schema
+        unique_label = schema.unique_column.label
+        results = self.new_results()
+
+        print(f"=== 开始批量创建 {len(records)} 个{schema.entity} ===")
+        start_time = time.time()
+
+        # 按学号/工号去重，只保留第一次出现的记录
+        id_map = {}
+        for record in records:
+            id_map.setdefault(record['school_id'], record)
+
+        # 一次性预取系统中已存在的学号/工号
+        existing = self.existing_ids(list(id_map.keys()))
+
+        # 默认密码只哈希一次
+        hashed_password = make_password(schema.default_password)
+
+        pending = []
+        for school_id, record in id_map.items():
+            if school_id in existing:
+                self.record_failure(results, record, f"{unique_label} {school_id} 在系统中已存在")
+            else:
+                pending.append(record)
+
+        for offset in range(0, len(pending), schema.batch_size):
+            batch = pending[offset:offset + schema.batch_size]
+            rows = [(record, schema.build_objects(record, hashed_password)) for record in batch]
+            batch_num = offset // schema.batch_size + 1
+
+            try:
+                with transaction.atomic():
+                    for position in range(len(rows[0][1])):
+                        objects = [row_objects[position] for _, row_objects in rows]
+                        type(objects[0]).objects.bulk_create(objects)
+                for record, row_objects in rows:
+                    self.record_success(results, record, row_objects)
+                print(f"✅ 第{batch_num}批: 创建 {len(rows)} 个{schema.entity}")
+            except Exception as e:
+                # 整批失败时逐行插入，定位具体失败的行
+                print(f"❌ 第{batch_num}批批量插入失败，改为逐行插入: {e}")
+                for record in batch:
+                    row_objects = schema.build_objects(record, hashed_password)
+                    try:
+                        with transaction.atomic():
+                            for obj in row_objects:
+                                type(obj).objects.bulk_create([obj])
+                        self.record_success(results, record, row_objects)
+                    except Exception as row_error:
+                        self.record_failure(results, record, str(row_error))
+
+            if progress:
+                progress(results['success_count'], results['failed_count'])
+
+        if results['success_count']:
+            schema.after_insert(results)
+
+        print(f"批量创建完成: 成功 {results['success_count']} 个, 失败 {results['failed_count']} 个, "
+              f"耗时 {time.time() - start_time:.2f}秒")
+        return results
@@ -0,0 +1,124 @@
+# utils/import_jobs.py
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from user.models import ImportJob
+
+# 后台导入线程池（进程内，无需外部消息队列）
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'IMPORT_JOB_WORKERS', 2),
+    thread_name_prefix='import-job'
+)
+
+# 解析阶段每隔多少行写一次进度
+PROGRESS_INTERVAL = 500
+
+
+class ImportJobService:
+    """批量导入任务：暂存上传文件，提交到后台线程池执行并记录进度"""
+
+    @staticmethod
+    def get_import_dir():
+        """获取导入文件暂存目录"""
+        import_dir = os.path.join(settings.MEDIA_ROOT, 'imports')
+        os.makedirs(import_dir, exist_ok=True)
+        return import_dir
+
+    @staticmethod
+    def submit(job_type, uploaded_file, operator, mode='create'):
+        """保存上传文件并创建导入任务，立即返回任务对象"""
+        job = ImportJob(job_type=job_type, mode=mode, file_name=uploaded_file.name, operator=operator)
+
+        extension = os.path.splitext(uploaded_file.name)[1].lower()
+        job.file_path = os.path.join(ImportJobService.get_import_dir(), f"{job.id}{extension}")
+        with open(job.file_path, 'wb') as destination:
+            for chunk in uploaded_file.chunks():
+                destination.write(chunk)
+
+        job.save()
+        _executor.submit(ImportJobService.run, job.id)
+        print(f"✅ 导入任务已提交: {job.id} ({job.get_job_type_display()}, {job.file_name})")
+        return job
+
+    @staticmethod
+    def _importer_for(job_type, mode='create'):
+        from user.views import (
+            ExcelStudentImporterV2, BulkStudentRegistrationViewV2,
+            ExcelTeacherImporter, BulkTeacherRegistrationView
+        )
+
+        if job_type == 'student':
+            return (ExcelStudentImporterV2.read_and_validate_excel, ExcelStudentImporterV2.parse_student_data,
+                    BulkStudentRegistrationViewV2, BulkStudentRegistrationViewV2.IMPORT_MODES[mode])
+        return (ExcelTeacherImporter.read_and_validate_excel, ExcelTeacherImporter.parse_teacher_data,
+                BulkTeacherRegistrationView, 'bulk_create_teachers')
+
+    @staticmethod
+    def _track_parsed(job_id, rows):
+        """包装行迭代器，定期写入已解析行数"""
+        parsed = 0
+        for row in rows:
+            parsed += 1
+            if parsed % PROGRESS_INTERVAL == 0:
+                ImportJob.objects.filter(id=job_id).update(parsed_rows=parsed)
+            yield row
+        ImportJob.objects.filter(id=job_id).update(parsed_rows=parsed)
+
+    @staticmethod
+    def run(job_id):
+        """在后台线程中执行导入任务：解析 -> 校验 -> 批量插入 -> 生成报告"""
+        close_old_connections()
+        job = ImportJob.objects.select_related('operator').get(id=job_id)
+        job.status = 'running'
+        job.started_at = timezone.now()
+        job.save(update_fields=['status', 'started_at'])
+        start_time = time.time()
+
+        try:
+            read_file, parse_rows, view_class, create_method = ImportJobService._importer_for(job.job_type, job.mode)
+
+            with open(job.file_path, 'rb') as excel_file:
+                reader = read_file(excel_file)
+                records, parse_errors = parse_rows(ImportJobService._track_parsed(job.id, reader))
+
+            view = view_class()
+
+            def progress(success_count, failed_count):
+                ImportJob.objects.filter(id=job.id).update(inserted_rows=success_count, failed_rows=failed_count)
+
+            results = getattr(view, create_method)(records, progress=progress)
+            operator = job.operator.school_id if job.operator else None
+            report = view.generate_import_report(results, parse_errors, len(records), operator=operator)
+
+            ImportJob.objects.filter(id=job.id).update(
+                status='success',
+                inserted_rows=results['success_count'],
+                failed_rows=results['failed_count'],
+                report=report,
+                finished_at=timezone.now()
+            )
+            print(f"✅ 导入任务完成: {job.id}，成功 {results['success_count']} 个，"
+                  f"失败 {results['failed_count']} 个，耗时 {time.time() - start_time:.2f}秒")
+
+        except Exception as e:
+            traceback.print_exc()
+            ImportJob.objects.filter(id=job.id).update(
+                status='failed',
+                error_message=str(e),
+                finished_at=timezone.now()
+            )
+            print(f"❌ 导入任务失败: {job.id} - {e}")
+
+        finally:
+            try:
+                os.remove(job.file_path)
+            except OSError:
+                pass
+            # 工作线程不经过请求周期，需手动关闭数据库连接
+            connection.close()
@@ -0,0 +1,237 @@
+# utils/import_schemas.py
+import re
+from datetime import datetime
+from decimal import Decimal
+
+from score.models import AcademicPerformance
+from user.models import User
+from user.utils.import_engine import ImportColumn, ImportSchema
+from user.utils.import_validation import grades_from_school_ids, split_departments
+
+# 单位字段的分隔符
+DEPARTMENT_SEPARATORS = ['-', '/', '\\', '、', '，', ',', ' ', '|']
+
+
+def parse_student_department(department_str):
+    """
+    智能解析department字段为college和major
+    支持多种格式：
+    1. "计算机学院" -> college="计算机学院", major="计算机学院"
+    2. "计算机学院-软件工程" -> college="计算机学院", major="软件工程"
+    3. "计算机学院/软件工程" -> college="计算机学院", major="软件工程"
+    4. "计算机学院软件工程系" -> college="计算机学院", major="软件工程系"
+    """
+    if not department_str:
+        return "未知学院", "未知专业"
+
+    # 尝试多种分隔符
+    for sep in DEPARTMENT_SEPARATORS:
+        if sep in department_str:
+            parts = [p.strip() for p in department_str.split(sep) if p.strip()]
+            if len(parts) >= 2:
+                # 取第一个作为学院，最后一个作为专业
+                return parts[0], parts[-1]
+
+    # 如果没有分隔符，尝试智能分割
+    # 常见学院关键词
+    college_keywords = ['学院', '大学', '学校', '系', '学部', '中心']
+
+    # 查找学院关键词位置
+    college_end = -1
+    for keyword in college_keywords:
+        idx = department_str.find(keyword)
+        if idx != -1:
+            college_end = idx + len(keyword)
+            break
+
+    if college_end != -1 and college_end < len(department_str):
+        # 找到学院关键词，分割
+        college = department_str[:college_end]
+        major = department_str[college_end:].strip()
+        return college, major or college
+
+    # 无法分割，整个作为学院和专业
+    return department_str, department_str
+
+
+def parse_teacher_department(department_str):
+    """
+    解析department字段为学院
+    教师通常只有学院信息，没有专业
+    """
+    if not department_str:
+        return "未知学院"
+
+    for sep in DEPARTMENT_SEPARATORS:
+        if sep in department_str:
+            parts = [p.strip() for p in department_str.split(sep) if p.strip()]
+            if parts:
+                # 取第一个作为学院
+                return parts[0]
+
+    # 如果没有分隔符，直接使用整个字符串
+    return department_str
+
+
+def extract_grade_from_school_id(school_id):
+    """
+    从学号提取年级
+    支持多种学号格式
+    """
+    school_id_str = str(school_id).strip()
+
+    # 常见学号模式
+    patterns = [
+        r'^(\d{4})',  # 前4位是年级，如2024001001
+        r'^(\d{2})',  # 前2位是年级（简写），如241001
+        r'[A-Za-z]*(\d{4})',  # 包含字母和4位数字
+    ]
+
+    for pattern in patterns:
+        match = re.search(pattern, school_id_str)
+        if match:
+            grade_part = match.group(1)
+            if len(grade_part) == 4 and grade_part.isdigit():
+                grade_num = int(grade_part)
+                if 2000 <= grade_num <= 2030:
+                    return grade_part
+            elif len(grade_part) == 2 and grade_part.isdigit():
+                # 2位年份，补全为4位
+                year_num = int(grade_part)
+                full_year = 2000 + year_num if year_num < 30 else 1900 + year_num
+                if 2000 <= full_year <= 2030:
+                    return str(full_year)
+
+    # 无法提取，使用当前年份
+    return str(datetime.now().year)
+
+
+class StudentImportSchema(ImportSchema):
+    """学生导入：学号、姓名、单位、绩点必填，四六级成绩可选；同时创建用户和学业成绩记录"""
+    entity = '学生'
+    result_key = 'students'
+    max_rows = 10000
+
+    columns = [
+        ImportColumn('school_id', ['学号', '学号/工号', 'student_id', 'student id'],
+                     required=True, unique=True, label='学号'),
+        ImportColumn('name', ['姓名', '名字', '学生姓名', 'name'], required=True),
+        ImportColumn('department', ['单位', '部门', '院系', '学院专业', '所属单位'], required=True, default=''),
+        ImportColumn('academy_score', ['绩点', '学分绩点', 'gpa', 'GPA', '平均绩点'],
+                     kind='number', required=True, clip=AcademicPerformance.GPA_RANGE, label='绩点'),
+        ImportColumn('cet4', ['英语四级成绩', '四级成绩', 'CET4', 'cet4', '英语四级'],
+                     kind='number', default=-1, valid_range=(0, 710), label='CET4成绩'),
+        ImportColumn('cet6', ['英语六级成绩', '六级成绩', 'CET6', 'cet6', '英语六级'],
+                     kind='number', default=-1, valid_range=(0, 710), label='CET6成绩'),
+    ]
+
+    def derive(self, records):
+        # 解析单位为学院/专业，从学号提取年级
+        college_major = split_departments(records['department'], parse_student_department)
+        records['college'] = college_major.str[0]
+        records['major'] = college_major.str[1]
+        records['grade'] = grades_from_school_ids(records['school_id'])
+        # 字段映射：academy_score -> gpa
+        records['gpa'] = records['academy_score']
+        records['academic_score'] = 0.0000
+        records['weighted_score'] = 0.0000
+        records['password'] = self.default_password
+        return records
+
+    def build_objects(self, record, hashed_password):
+        student = User(
+            school_id=record['school_id'],
+            name=record['name'],
+            college=record['college'],
+            major=record['major'],
+            grade=record['grade'],
+            user_type=0,  # 学生
+            password=hashed_password,
+        )
+
+        performance = AcademicPerformance(
+            user=student,
+            gpa=Decimal(str(record.get('gpa', 0.0000))),
+            cet4=int(record.get('cet4', -1)),
+            cet6=int(record.get('cet6', -1)),
+            academic_score=Decimal('0.0000'),
+            weighted_score=Decimal('0.0000'),
+            academic_expertise_score=Decimal('0.0000'),
+            comprehensive_performance_score=Decimal('0.0000'),
+            total_comprehensive_score=Decimal('0.0000'),
+            applications_score=[],
+            total_courses=0,
+            total_credits=Decimal('0.0000'),
+            gpa_ranking=0,
+            ranking_dimension='专业内排名',
+            failed_courses=0,
+        )
+        # bulk_create 不调用 save()，在此完成 save() 中的分数计算
+        performance.calculate_academic_score()
+        performance.calculate_total_comprehensive_score()
+        performance.sync_score_columns()
+
+        return [student, performance]
+
+    def success_entry(self, record, objects):
+        student = objects[0]
+        return {
+            'row_num': record.get('_row_num', '未知'),
+            'school_id': student.school_id,
+            'name': student.name,
+            'college': student.college,
+            'major': student.major,
+            'grade': student.grade,
+            'gpa': float(record.get('gpa', 0.0000)),
+            'cet4': record.get('cet4', -1),
+            'cet6': record.get('cet6', -1),
+        }
+
+    def after_insert(self, results):
+        # bulk_create 不触发 post_save 信号，手动使排名索引和统计缓存失效
+        from score.services.rank_index import bump_score_version
+        bump_score_version()
+
+
+class TeacherImportSchema(ImportSchema):
+    """教师导入：职工号、姓名、单位必填；只创建用户"""
+    entity = '教师'
+    result_key = 'teachers'
+    max_rows = 1000
+
+    columns = [
+        ImportColumn('school_id', ['职工号', '工号', '教职工号', '教师工号', 'teacher_id'],
+                     required=True, unique=True, label='职工号'),
+        ImportColumn('name', ['姓名', '教师姓名', '老师姓名', 'teacher_name'], required=True),
+        ImportColumn('department', ['单位', '部门', '院系', '所属单位', '所在学院', 'college'],
+                     required=True, default=''),
+    ]
+
+    def derive(self, records):
+        records['college'] = split_departments(records['department'], parse_teacher_department)
+        records['password'] = self.default_password
+        records['user_type'] = 1  # 教师类型
+        return records
+
+    def build_objects(self, record, hashed_password):
+        teacher = User(
+            school_id=record['school_id'],
+            name=record['name'],
+            college=record['college'],
+            user_type=1,  # 教师类型
+            password=hashed_password,
+            # 教师不需要专业和年级字段
+            major='',
+            grade='',
+        )
+        return [teacher]
+
+    def success_entry(self, record, objects):
+        teacher = objects[0]
+        return {
+            'row_num': record.get('_row_num', '未知'),
+            'school_id': teacher.school_id,
+            'name': teacher.name,
+            'college': teacher.college,
+            'user_type': '教师',
+        }
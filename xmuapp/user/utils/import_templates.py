@@ -0,0 +1,147 @@
+# utils/import_templates.py
+import glob
+import hashlib
+import io
+import json
+import os
+import threading
+
+from django.conf import settings
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Border, Font, Side
+
+from user.utils.import_schemas import StudentImportSchema, TeacherImportSchema
+
+# 模板内容：表头取各导入模式每列的首选列名，导入列变化时模板自动重建
+IMPORT_TEMPLATES = {
+    'student': {
+        'schema': StudentImportSchema,
+        'sheet_name': '学生数据',
+        'filename': '学生批量导入模板.xlsx',
+        'sample_rows': [
+            ['2024001001', '张三', '信息学院-软件工程', 3.8, 550, 520],
+            ['2024001002', '李四', '信息学院-计算机科学与技术', 3.9, 580, 540],
+            ['2024001003', '王五', '信息学院', 3.5, 500, 480],
+        ],
+    },
+    'teacher': {
+        'schema': TeacherImportSchema,
+        'sheet_name': '老师数据',
+        'filename': '老师批量导入模板.xlsx',
+        'sample_rows': [
+            ['T001', '张老师', '信息学院'],
+            ['T002', '李老师', '信息学院'],
+            ['T003', '王老师', '信息学院'],
+        ],
+    },
+}
+
+# 生成方式变化时修改此版本号，使已缓存的模板失效
+TEMPLATE_VERSION = 1
+
+
+class ImportTemplateCache:
+    """
+    导入模板缓存：模板只在首次请求时生成一次，字节内容同时缓存在内存和 MEDIA_ROOT/templates 下，
+    多个进程共用文件缓存；文件名包含模板定义的指纹，模板定义变化时才重新生成
+    """
+    _cache = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_template_dir():
+        """获取模板缓存目录"""
+        template_dir = os.path.join(settings.MEDIA_ROOT, 'templates')
+        os.makedirs(template_dir, exist_ok=True)
+        return template_dir
+
+    @staticmethod
+    def headers(key):
+        """模板表头：导入模式中每列的首选列名"""
+        return [column.aliases[0] for column in IMPORT_TEMPLATES[key]['schema'].columns]
+
+    @staticmethod
+    def fingerprint(key):
+        """模板定义指纹（表头、示例数据、工作表名和生成版本）"""
+        template = IMPORT_TEMPLATES[key]
+        definition = json.dumps({
+            'version': TEMPLATE_VERSION,
+            'headers': ImportTemplateCache.headers(key),
+            'sheet_name': template['sheet_name'],
+            'sample_rows': template['sample_rows'],
+        }, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(definition.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def build(key):
+        """生成模板Excel字节内容（表头加粗带边框，列宽自适应）"""
+        template = IMPORT_TEMPLATES[key]
+        headers = ImportTemplateCache.headers(key)
+
+        workbook = Workbook()
+        worksheet = workbook.active
+        worksheet.title = template['sheet_name']
+        worksheet.append(headers)
+        for row in template['sample_rows']:
+            worksheet.append(row)
+
+        thin = Side(style='thin')
+        for cell in worksheet[1]:
+            cell.font = Font(bold=True)
+            cell.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+            cell.alignment = Alignment(horizontal='center', vertical='top')
+
+        # 设置列宽
+        for column in worksheet.columns:
+            max_length = max(len(str(cell.value)) for cell in column if cell.value is not None)
+            worksheet.column_dimensions[column[0].column_letter].width = min(max_length + 2, 30)
+
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        return buffer.getvalue()
+
+    @staticmethod
+    def get(key):
+        """
+        获取模板，返回 {'filename', 'content', 'etag'}
+        优先使用内存缓存，其次文件缓存，都没有时生成并写入文件
+        """
+        fingerprint = ImportTemplateCache.fingerprint(key)
+        cached = ImportTemplateCache._cache.get(key)
+        if cached and cached['fingerprint'] == fingerprint:
+            return cached
+
+        with ImportTemplateCache._lock:
+            cached = ImportTemplateCache._cache.get(key)
+            if cached and cached['fingerprint'] == fingerprint:
+                return cached
+
+            template_dir = ImportTemplateCache.get_template_dir()
+            path = os.path.join(template_dir, f"{key}_{fingerprint[:16]}.xlsx")
+
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    content = f.read()
+                print(f"✅ 从文件加载导入模板: {path}")
+            else:
+                content = ImportTemplateCache.build(key)
+                temp_path = f"{path}.{os.getpid()}.tmp"
+                with open(temp_path, 'wb') as f:
+                    f.write(content)
+                os.replace(temp_path, path)
+
+                # 删除旧版本模板
+                for old_path in glob.glob(os.path.join(template_dir, f"{key}_*.xlsx")):
+                    if old_path != path:
+                        os.remove(old_path)
+                print(f"✅ 导入模板已生成: {path}")
+
+            cached = {
+                'fingerprint': fingerprint,
+                'filename': IMPORT_TEMPLATES[key]['filename'],
+                'content': content,
+                # 强 ETag 取自实际字节内容，同一 ETag 对应的内容一定相同
+                'etag': f'"{hashlib.sha256(content).hexdigest()[:32]}"',
+            }
+            ImportTemplateCache._cache[key] = cached
+            return cached
@@ -0,0 +1,18 @@
+# utils/query_params.py
+
+# 列表接口默认返回条数和最大条数
+DEFAULT_LIST_LIMIT = 20
+MAX_LIST_LIMIT = 100
+
+
+def parse_limit(value, default=DEFAULT_LIST_LIMIT, maximum=MAX_LIST_LIMIT):
+    """解析 limit 查询参数：为空时取默认值，超过上限时取上限，非正整数抛出 ValueError"""
+    if value in (None, ''):
+        return default
+    try:
+        limit = int(value)
+    except (ValueError, TypeError):
+        raise ValueError(f"limit 参数必须是正整数: {value}")
+    if limit < 1:
+        raise ValueError(f"limit 参数必须是正整数: {value}")
+    return min(limit, maximum)
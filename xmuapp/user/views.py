@@ -1277,441 +1277,59 @@ import re
 from datetime import datetime
 from decimal import Decimal
 
+from user.utils.excel_reader import SUPPORTED_EXTENSIONS
+from user.utils.import_engine import ImportEngine
+from user.utils.import_schemas import (
+    StudentImportSchema, TeacherImportSchema, parse_student_department, parse_teacher_department,
+    extract_grade_from_school_id
+)
+
 
 class ExcelStudentImporterV2:
     """
-    Excel学生导入工具类 V2 - 支持中文列名
+    Excel学生导入工具类 V2 - 支持中文列名（列定义见 StudentImportSchema，由通用导入引擎执行）
     """
+    schema = StudentImportSchema()
 
     # 🎯 中文列名到系统字段名的映射
-    CHINESE_COLUMN_MAPPING = {
-        # 必需字段
-        '学号': 'school_id',
-        '学号/工号': 'school_id',
-        'student_id': 'school_id',
-        'student id': 'school_id',
-
-        '姓名': 'name',
-        '名字': 'name',
-        '学生姓名': 'name',
-        'name': 'name',
-
-        '单位': 'department',
-        '部门': 'department',
-        '院系': 'department',
-        '学院专业': 'department',
-        '所属单位': 'department',
-
-        # 成绩字段
-        '绩点': 'academy_score',
-        '学分绩点': 'academy_score',
-        'gpa': 'academy_score',
-        'GPA': 'academy_score',
-        '平均绩点': 'academy_score',
-
-        '英语四级成绩': 'cet4',
-        '四级成绩': 'cet4',
-        'CET4': 'cet4',
-        'cet4': 'cet4',
-        '英语四级': 'cet4',
-
-        '英语六级成绩': 'cet6',
-        '六级成绩': 'cet6',
-        'CET6': 'cet6',
-        'cet6': 'cet6',
-        '英语六级': 'cet6',
-    }
+    CHINESE_COLUMN_MAPPING = schema.column_mapping
 
-    REQUIRED_COLUMNS = ['school_id', 'name', 'department', 'academy_score']
+    REQUIRED_COLUMNS = schema.required_columns
     OPTIONAL_COLUMNS = ['cet4', 'cet6']
 
-    @staticmethod
-    def read_and_validate_excel(excel_file):
-        """
-        读取并验证Excel文件（支持中文列名）
-        """
-        try:
-            print(f"=== 读取Excel文件 ===")
-            print(f"文件名: {excel_file.name}")
-
-            # 验证文件格式
-            if not (excel_file.name.endswith('.xlsx') or excel_file.name.endswith('.xls')):
-                raise ValueError("只支持.xlsx或.xls格式的Excel文件")
-
-            # 🎯 读取Excel，尝试不同的编码
-            try:
-                df = pd.read_excel(excel_file)
-            except Exception as e:
-                print(f"第一次读取失败，尝试其他编码: {e}")
-                df = pd.read_excel(excel_file, engine='openpyxl')
-
-            print(f"Excel形状: {df.shape} (行×列)")
-            print(f"原始列名: {list(df.columns)}")
-
-            # 🎯 标准化列名：去除空格，统一大小写，应用中文映射
-            df = ExcelStudentImporterV2.normalize_column_names(df)
-            print(f"标准化后列名: {list(df.columns)}")
-
-            # 🎯 验证必需列是否存在
-            missing_columns = []
-            for required_col in ExcelStudentImporterV2.REQUIRED_COLUMNS:
-                if required_col not in df.columns:
-                    missing_columns.append(required_col)
-
-            if missing_columns:
-                # 尝试提示用户可能的中文列名
-                suggested_names = []
-                for missing_col in missing_columns:
-                    # 反向查找：系统字段名 -> 可能的中文列名
-                    possible_names = []
-                    for chinese_name, sys_name in ExcelStudentImporterV2.CHINESE_COLUMN_MAPPING.items():
-                        if sys_name == missing_col:
-                            possible_names.append(chinese_name)
-                    if possible_names:
-                        suggested_names.append(f"{missing_col}(可能的中文名: {', '.join(possible_names)})")
-
-                error_msg = f"Excel缺少必需列: {missing_columns}"
-                if suggested_names:
-                    error_msg += f"\n建议使用以下中文列名: {', '.join(suggested_names)}"
-
-                raise ValueError(error_msg)
+    # 单次导入的最大行数（分批插入后可一次导入整个年级）
+    MAX_IMPORT_ROWS = schema.max_rows
 
-            # 验证数据行数
-            if len(df) == 0:
-                raise ValueError("Excel文件为空")
-
-            if len(df) > 1000:
-                raise ValueError("单次导入不能超过1000个学生")
-
-            print(f"找到 {len(df)} 个学生记录")
-
-            return df
-
-        except Exception as e:
-            print(f"读取Excel失败: {e}")
-            raise
+    parse_department = staticmethod(parse_student_department)
+    extract_grade_from_school_id = staticmethod(extract_grade_from_school_id)
 
     @staticmethod
-    def normalize_column_names(df):
+    def read_and_validate_excel(excel_file):
         """
-        标准化列名：支持中文列名映射
+        读取并验证Excel或CSV/TSV文件（支持中文列名）
+        只读取并校验表头，返回逐行产出数据的流式读取器
         """
-        # 创建副本
-        normalized_df = df.copy()
-
-        # 新的列名列表
-        new_columns = []
-
-        for col in normalized_df.columns:
-            original_col = str(col)
-            # 清理列名：去除空格、特殊字符
-            cleaned_col = original_col.strip().replace(' ', '').replace('\n', '').replace('\t', '')
-
-            # 🎯 应用映射：先尝试完整匹配，然后尝试包含匹配
-            mapped_col = None
-
-            # 1. 完整匹配
-            if cleaned_col in ExcelStudentImporterV2.CHINESE_COLUMN_MAPPING:
-                mapped_col = ExcelStudentImporterV2.CHINESE_COLUMN_MAPPING[cleaned_col]
-                print(f"列名映射: '{original_col}' -> '{mapped_col}' (完整匹配)")
-
-            # 2. 部分匹配（如果完整匹配失败）
-            if mapped_col is None:
-                for chinese_name, sys_name in ExcelStudentImporterV2.CHINESE_COLUMN_MAPPING.items():
-                    if chinese_name in cleaned_col:
-                        mapped_col = sys_name
-                        print(f"列名映射: '{original_col}' -> '{mapped_col}' (部分匹配: 包含'{chinese_name}')")
-                        break
-
-            # 3. 默认使用原始列名（小写）
-            if mapped_col is None:
-                mapped_col = cleaned_col.lower()
-                print(f"列名未映射: '{original_col}' -> '{mapped_col}' (使用小写)")
-
-            new_columns.append(mapped_col)
-
-        normalized_df.columns = new_columns
-
-        # 🎯 检查是否有重复列名
-        column_counts = {}
-        for col in normalized_df.columns:
-            column_counts[col] = column_counts.get(col, 0) + 1
-
-        duplicate_columns = [col for col, count in column_counts.items() if count > 1]
-        if duplicate_columns:
-            print(f"警告: 发现重复列名: {duplicate_columns}")
-            # 处理重复列名：添加后缀
-            new_columns = []
-            col_count = {}
-            for col in normalized_df.columns:
-                if col in col_count:
-                    col_count[col] += 1
-                    new_columns.append(f"{col}_{col_count[col]}")
-                else:
-                    col_count[col] = 1
-                    new_columns.append(col)
-            normalized_df.columns = new_columns
-
-        return normalized_df
+        return ImportEngine(ExcelStudentImporterV2.schema).open(excel_file)
 
     @staticmethod
-    def parse_student_data(df):
+    def parse_student_data(rows):
         """
         解析Excel数据为学生列表
         支持中文列名和字段转换
-        """
-        students_data = []
-        errors = []
-
-        print("=== 开始解析学生数据 ===")
-
-        for index, row in df.iterrows():
-            try:
-                row_num = index + 2  # Excel行号（从2开始）
-
-                print(f"\n--- 解析第{row_num}行 ---")
-
-                # 提取基础数据
-                student_data = {
-                    'school_id': ExcelStudentImporterV2._extract_value(row, 'school_id', row_num, str),
-                    'name': ExcelStudentImporterV2._extract_value(row, 'name', row_num, str),
-                    'department': ExcelStudentImporterV2._extract_value(row, 'department', row_num, str, default=''),
-                    'academy_score': ExcelStudentImporterV2._extract_value(row, 'academy_score', row_num, float),
-                    '_row_num': row_num,
-                }
-
-                # 🎯 提取可选字段
-                if 'cet4' in df.columns:
-                    student_data['cet4'] = ExcelStudentImporterV2._extract_value(row, 'cet4', row_num, float,
-                                                                                 default=-1)
-                else:
-                    student_data['cet4'] = -1
-
-                if 'cet6' in df.columns:
-                    student_data['cet6'] = ExcelStudentImporterV2._extract_value(row, 'cet6', row_num, float,
-                                                                                 default=-1)
-                else:
-                    student_data['cet6'] = -1
-
-                print(f"原始数据: {student_data}")
-
-                # 🎯 数据清洗和验证
-                student_data = ExcelStudentImporterV2.clean_student_data(student_data)
-
-                # 🎯 解析department为college和major
-                college, major = ExcelStudentImporterV2.parse_department(student_data['department'])
-                student_data['college'] = college
-                student_data['major'] = major
-
-                # 🎯 从学号提取年级
-                school_id = student_data['school_id']
-                grade = ExcelStudentImporterV2.extract_grade_from_school_id(school_id)
-                student_data['grade'] = grade
-
-                # 🎯 字段映射：academy_score -> gpa
-                student_data['gpa'] = student_data['academy_score']
-                student_data['academic_score'] = 0.0000
-                student_data['weighted_score'] = 0.0000
-                student_data['password'] = '123456'
-
-                students_data.append(student_data)
-
-                print(f"✅ 行{row_num}: 解析成功 - {student_data['school_id']} {student_data['name']}")
-                print(f"   学院: {college}, 专业: {major}, 绩点: {student_data['gpa']}")
-
-            except Exception as e:
-                error_msg = f"第{row_num}行数据解析失败: {str(e)}"
-                errors.append(error_msg)
-                print(f"❌ {error_msg}")
-                import traceback
-                print(f"错误详情: {traceback.format_exc()}")
 
-        print(f"\n=== 解析完成 ===")
-        print(f"成功: {len(students_data)} 条, 失败: {len(errors)} 条")
-
-        return students_data, errors
-
-    @staticmethod
-    def _extract_value(row, column_name, row_num, value_type, default=None):
+        Args:
+            rows: 逐行产出 {标准化列名: 值, '_row_num': 行号} 的可迭代对象（如流式读取器）
         """
-        安全提取单元格值
-        """
-        if column_name not in row:
-            if default is not None:
-                return default
-            raise ValueError(f"列 '{column_name}' 不存在")
-
-        raw_value = row[column_name]
-
-        # 处理NaN/空值
-        if pd.isna(raw_value):
-            if default is not None:
-                return default
-            raise ValueError(f"第{row_num}行列'{column_name}'不能为空")
-
-        try:
-            # 转换为字符串清理
-            str_value = str(raw_value).strip()
-
-            if value_type == str:
-                return str_value
-            elif value_type == int:
-                # 尝试转换为int，支持浮点数
-                try:
-                    return int(float(str_value))
-                except:
-                    return int(str_value)
-            elif value_type == float:
-                return float(str_value)
-            else:
-                return value_type(str_value)
-
-        except Exception as e:
-            raise ValueError(f"第{row_num}行列'{column_name}'值'{raw_value}'转换失败: {str(e)}")
+        return ImportEngine(ExcelStudentImporterV2.schema).parse(rows)
 
     @staticmethod
-    def clean_student_data(student_data):
+    def validate_student_frame(df):
         """
-        清洗学生数据
+        按列向量化校验学生数据，一次得到所有有效记录和逐行错误
+        学号、姓名、绩点必填；绩点超出0-5修正到边界；CET成绩不在0-710视为未参加(-1)；
+        重复学号只保留第一次出现的记录
         """
-        cleaned = student_data.copy()
-
-        # 1. 学号：去除空格
-        cleaned['school_id'] = str(cleaned['school_id']).strip()
-        if not cleaned['school_id']:
-            raise ValueError("学号不能为空")
-
-        # 2. 姓名：去除空格
-        cleaned['name'] = str(cleaned['name']).strip()
-        if not cleaned['name']:
-            raise ValueError("姓名不能为空")
-
-        # 3. department：去除空格
-        cleaned['department'] = str(cleaned.get('department', '')).strip()
-
-        # 4. academy_score：验证范围
-        academy_score = cleaned['academy_score']
-        if isinstance(academy_score, (int, float)):
-            if academy_score < 0 or academy_score > 5:
-                # 自动修正：如果超出范围，设为0或5
-                if academy_score < 0:
-                    cleaned['academy_score'] = 0.0
-                else:
-                    cleaned['academy_score'] = 5.0
-                print(f"    警告: 绩点{academy_score}超出范围，修正为{cleaned['academy_score']}")
-        else:
-            cleaned['academy_score'] = 0.0
-
-        # 5. cet4：验证范围
-        cet4 = cleaned['cet4']
-        if isinstance(cet4, (int, float)):
-            if cet4 < 0 or cet4 > 710:
-                # 如果不在有效范围，设为-1（未参加）
-                cleaned['cet4'] = -1
-                print(f"    警告: CET4成绩{cet4}无效，设为未参加(-1)")
-        else:
-            cleaned['cet4'] = -1
-
-        # 6. cet6：验证范围
-        cet6 = cleaned['cet6']
-        if isinstance(cet6, (int, float)):
-            if cet6 < 0 or cet6 > 710:
-                cleaned['cet6'] = -1
-                print(f"    警告: CET6成绩{cet6}无效，设为未参加(-1)")
-        else:
-            cleaned['cet6'] = -1
-
-        return cleaned
-
-    @staticmethod
-    def parse_department(department_str):
-        """
-        智能解析department字段为college和major
-        支持多种格式：
-        1. "计算机学院" -> college="计算机学院", major="计算机学院"
-        2. "计算机学院-软件工程" -> college="计算机学院", major="软件工程"
-        3. "计算机学院/软件工程" -> college="计算机学院", major="软件工程"
-        4. "计算机学院软件工程系" -> college="计算机学院", major="软件工程系"
-        """
-        if not department_str:
-            return "未知学院", "未知专业"
-
-        print(f"    解析单位字段: '{department_str}'")
-
-        # 尝试多种分隔符
-        separators = ['-', '/', '\\', '、', '，', ',', ' ', '|']
-
-        for sep in separators:
-            if sep in department_str:
-                parts = [p.strip() for p in department_str.split(sep) if p.strip()]
-                if len(parts) >= 2:
-                    # 取第一个作为学院，最后一个作为专业
-                    college = parts[0]
-                    major = parts[-1]
-                    print(f"    使用分隔符'{sep}': college={college}, major={major}")
-                    return college, major
-
-        # 如果没有分隔符，尝试智能分割
-        # 常见学院关键词
-        college_keywords = ['学院', '大学', '学校', '系', '学部', '中心']
-        major_keywords = ['专业', '方向', '班', '类', '系']
-
-        # 查找学院关键词位置
-        college_end = -1
-        for keyword in college_keywords:
-            if keyword in department_str:
-                idx = department_str.find(keyword)
-                if idx != -1:
-                    college_end = idx + len(keyword)
-                    break
-
-        if college_end != -1 and college_end < len(department_str):
-            # 找到学院关键词，分割
-            college = department_str[:college_end]
-            major = department_str[college_end:].strip()
-            if not major:
-                major = college
-            print(f"    智能分割: college={college}, major={major}")
-            return college, major
-        else:
-            # 无法分割，整个作为学院和专业
-            print(f"    无法分割，整体使用: college={department_str}, major={department_str}")
-            return department_str, department_str
-
-    @staticmethod
-    def extract_grade_from_school_id(school_id):
-        """
-        从学号提取年级
-        支持多种学号格式
-        """
-        school_id_str = str(school_id).strip()
-
-        # 常见学号模式
-        patterns = [
-            r'^(\d{4})',  # 前4位是年级，如2024001001
-            r'^(\d{2})',  # 前2位是年级（简写），如241001
-            r'[A-Za-z]*(\d{4})',  # 包含字母和4位数字
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, school_id_str)
-            if match:
-                grade_part = match.group(1)
-                if len(grade_part) == 4 and grade_part.isdigit():
-                    grade_num = int(grade_part)
-                    if 2000 <= grade_num <= 2030:
-                        return grade_part
-                elif len(grade_part) == 2 and grade_part.isdigit():
-                    # 2位年份，补全为4位
-                    year_num = int(grade_part)
-                    if 0 <= year_num <= 99:
-                        full_year = 2000 + year_num if year_num < 30 else 1900 + year_num
-                        if 2000 <= full_year <= 2030:
-                            return str(full_year)
-
-        # 无法提取，使用当前年份或默认
-        current_year = datetime.now().year
-        return str(current_year)
+        return ImportEngine(ExcelStudentImporterV2.schema).validate(df)
 
 
 @method_decorator(csrf_exempt, name='dispatch')
@@ -1722,6 +1340,15 @@ class BulkStudentRegistrationViewV2(APIView):
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
 
+    # 导入模式 -> 处理方法
+    IMPORT_MODES = {
+        'create': 'bulk_create_students',
+        'upsert': 'upsert_students',
+    }
+
+    # upsert 模式下可以更新的成绩字段
+    UPSERT_FIELDS = ['gpa', 'cet4', 'cet6']
+
     def post(self, request):
         try:
             print("=== 批量学生注册请求开始 ===")
@@ -1745,7 +1372,7 @@ class BulkStudentRegistrationViewV2(APIView):
             excel_file = None
             for field_name, file_obj in request.FILES.items():
                 print(f"检查字段: '{field_name}' -> '{file_obj.name}'")
-                if file_obj.name.lower().endswith(('.xlsx', '.xls')):
+                if file_obj.name.lower().endswith(SUPPORTED_EXTENSIONS):
                     excel_file = file_obj
                     print(f"✅ 找到Excel文件")
                     break
@@ -1754,7 +1381,7 @@ class BulkStudentRegistrationViewV2(APIView):
                 print("❌ 没有找到Excel文件")
                 return Response({
                     'success': False,
-                    'message': '请上传Excel文件（.xlsx或.xls格式）',
+                    'message': '请上传Excel文件（.xlsx或.xls格式）或CSV文件（.csv或.tsv格式，UTF-8或GBK编码）',
                     'data': {
                         'available_files': [
                             {'field': k, 'name': v.name, 'size': v.size}
@@ -1765,11 +1392,36 @@ class BulkStudentRegistrationViewV2(APIView):
 
             print(f"✅ 找到Excel文件: {excel_file.name} ({excel_file.size} bytes)")
 
+            # 🎯 导入模式：create 只创建新学生；upsert 同时更新已存在学生的绩点和四六级成绩
+            mode = request.data.get('mode', 'create')
+            if mode not in self.IMPORT_MODES:
+                return Response({
+                    'success': False,
+                    'message': f'不支持的导入模式: {mode}，可选: {", ".join(self.IMPORT_MODES)}',
+                    'data': None
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            # 🎯 预检：完整校验文件并返回全部错误和预计导入数量，不写入数据库
+            if str(request.data.get('dry_run', False)).lower() in ['true', '1']:
+                return self.dry_run_response(
+                    ImportEngine(ExcelStudentImporterV2.schema), excel_file, update_existing=(mode == 'upsert')
+                )
+
+            # 🎯 后台导入：立即返回任务ID，通过任务接口查询进度
+            if str(request.data.get('async', False)).lower() in ['true', '1']:
+                from user.utils.import_jobs import ImportJobService
+                job = ImportJobService.submit('student', excel_file, request.user, mode=mode)
+                return Response({
+                    'success': True,
+                    'message': '导入任务已提交，请通过任务ID查询进度',
+                    'data': job.to_dict()
+                }, status=status.HTTP_202_ACCEPTED)
+
             # 🎯 读取和解析Excel
             try:
                 print("开始解析Excel文件...")
-                df = ExcelStudentImporterV2.read_and_validate_excel(excel_file)
-                students_data, parse_errors = ExcelStudentImporterV2.parse_student_data(df)
+                reader = ExcelStudentImporterV2.read_and_validate_excel(excel_file)
+                students_data, parse_errors = ExcelStudentImporterV2.parse_student_data(reader)
             except Exception as e:
                 error_msg = str(e)
                 print(f"❌ Excel解析失败: {error_msg}")
@@ -1791,14 +1443,17 @@ class BulkStudentRegistrationViewV2(APIView):
                     'message': 'Excel文件中没有有效的学生数据',
                     'data': {
                         'parse_errors': parse_errors[:5] if parse_errors else [],
-                        'total_rows': len(df) if 'df' in locals() else 0
+                        'total_rows': reader.row_count
                     }
                 }, status=status.HTTP_400_BAD_REQUEST)
 
-            print(f"✅ 解析成功，准备注册 {len(students_data)} 个学生")
+            print(f"✅ 解析成功，准备导入 {len(students_data)} 个学生 (模式: {mode})")
 
-            # 🎯 批量注册学生
-            results = self.bulk_create_students(students_data)
+            # 🎯 批量注册学生（upsert 模式下同时更新已存在学生的成绩）
+            if mode == 'upsert':
+                results = self.upsert_students(students_data)
+            else:
+                results = self.bulk_create_students(students_data)
 
             # 🎯 生成导入报告
             report = self.generate_import_report(results, parse_errors, len(students_data))
@@ -1821,108 +1476,160 @@ class BulkStudentRegistrationViewV2(APIView):
                 'data': None
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def bulk_create_students(self, students_data):
+    @staticmethod
+    def dry_run_response(engine, excel_file, update_existing=False):
+        """预检导入文件，返回完整的错误/重复/冲突报告和预计导入数量"""
+        try:
+            print("开始预检Excel文件...")
+            report = engine.dry_run(excel_file, update_existing=update_existing)
+        except Exception as e:
+            error_msg = str(e)
+            print(f"❌ Excel预检失败: {error_msg}")
+            return Response({
+                'success': False,
+                'message': f'Excel文件解析失败: {error_msg}',
+                'data': {
+                    'error': error_msg,
+                    'file_name': excel_file.name
+                }
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        summary = report['summary']
+        return Response({
+            'success': True,
+            'message': f'预检完成，可导入 {summary["would_insert_count"]} 个，'
+                       f'错误 {summary["error_rows"]} 行，与系统冲突 {summary["conflict_rows"]} 个（未写入数据库）',
+            'data': report
+        }, status=status.HTTP_200_OK)
+
+    def bulk_create_students(self, students_data, progress=None):
         """
-        批量创建学生 - 核心方法
+        批量创建学生 - 核心方法（通用导入引擎分批插入）
+
+        Args:
+            progress: 可选回调 progress(success_count, failed_count)，每批完成后调用
         """
-        results = {
-            'success_count': 0,
-            'failed_count': 0,
-            'success_students': [],
-            'failed_students': []
-        }
+        return ImportEngine(ExcelStudentImporterV2.schema).insert(students_data, progress=progress)
 
-        print(f"=== 开始批量创建 {len(students_data)} 个学生 ===")
+    def upsert_students(self, students_data, progress=None):
+        """
+        更新模式：按学号匹配已存在的学生，对比当前绩点和四六级成绩，只把有变化的字段分批 bulk_update；
+        之后对受影响的学生做一次向量化重算学术分数和综合总分。系统中不存在的学号按新学生批量创建。
 
-        # 按学号分组，处理重复
-        school_id_map = {}
-        duplicate_school_ids = []
+        Args:
+            progress: 可选回调 progress(success_count, failed_count)，每批完成后调用
+        """
+        from django.utils import timezone
+        from score.services.score_calculation import ScoreCalculationService
+
+        print(f"=== 开始批量更新 {len(students_data)} 个学生成绩 ===")
+        start_time = time.time()
+        engine = ImportEngine(ExcelStudentImporterV2.schema)
+        batch_size = engine.schema.batch_size
 
+        # 按学号去重，只保留第一次出现的记录
+        school_id_map = {}
         for student_data in students_data:
-            school_id = student_data['school_id']
-            if school_id in school_id_map:
-                duplicate_school_ids.append(school_id)
-            else:
-                school_id_map[school_id] = student_data
+            school_id_map.setdefault(student_data['school_id'], student_data)
+        school_ids = list(school_id_map.keys())
+
+        # 一次性（分批）预取已存在学生的当前成绩
+        current = {}
+        existing_users = {}
+        for offset in range(0, len(school_ids), batch_size):
+            chunk = school_ids[offset:offset + batch_size]
+            existing_users.update(User.objects.filter(school_id__in=chunk).values_list('school_id', 'user_type'))
+            for perf_id, user_id, school_id, *values in AcademicPerformance.objects.filter(
+                    user__school_id__in=chunk
+            ).values_list('id', 'user_id', 'user__school_id', *self.UPSERT_FIELDS):
+                current[school_id] = (perf_id, user_id, dict(zip(self.UPSERT_FIELDS, values)))
 
-        if duplicate_school_ids:
-            print(f"警告: 发现重复学号: {set(duplicate_school_ids)}")
+        results = {
+            **engine.new_results(),
+            'created_count': 0,
+            'updated_count': 0,
+            'unchanged_count': 0,
+            'updated_students': [],
+        }
 
-        # 处理每个唯一学号
+        # 对比成绩，按变化的字段集合分组
+        new_students = []
+        updates_by_fields = {}
+        affected_user_ids = []
+        now = timezone.now()
         for school_id, student_data in school_id_map.items():
-            row_num = student_data.get('_row_num', '未知')
-
-            try:
-                with transaction.atomic():
-                    # 检查学号是否已存在
-                    if User.objects.filter(school_id=school_id).exists():
-                        raise ValueError(f"学号 {school_id} 在系统中已存在")
-
-                    # 准备User数据
-                    user_data = {
-                        'school_id': student_data['school_id'],
-                        'name': student_data['name'],
-                        'college': student_data['college'],
-                        'major': student_data['major'],
-                        'grade': student_data['grade'],
-                        'user_type': 0,  # 学生
-                        'password': '123456',
-                    }
-
-                    print(f"创建用户: {user_data['school_id']} - {user_data['name']}")
-
-                    # 创建User
-                    student = User.objects.create_user(**user_data)
-
-                    # 创建AcademicPerformance
-                    AcademicPerformance.objects.create(
-                        user=student,
-                        gpa=Decimal(str(student_data.get('gpa', 0.0000))),
-                        cet4=int(student_data.get('cet4', -1)),
-                        cet6=int(student_data.get('cet6', -1)),
-                        academic_score=Decimal('0.0000'),
-                        weighted_score=Decimal('0.0000'),
-                        academic_expertise_score=Decimal('0.0000'),
-                        comprehensive_performance_score=Decimal('0.0000'),
-                        total_comprehensive_score=Decimal('0.0000'),
-                        applications_score=[],
-                        total_courses=0,
-                        total_credits=Decimal('0.0000'),
-                        gpa_ranking=0,
-                        ranking_dimension='专业内排名',
-                        failed_courses=0,
-                    )
-
-                    results['success_count'] += 1
-                    results['success_students'].append({
-                        'row_num': row_num,
-                        'school_id': student.school_id,
-                        'name': student.name,
-                        'college': student.college,
-                        'major': student.major,
-                        'grade': student.grade,
-                        'gpa': float(student_data.get('gpa', 0.0000)),
-                        'cet4': student_data.get('cet4', -1),
-                        'cet6': student_data.get('cet6', -1),
-                    })
+            if school_id not in existing_users:
+                new_students.append(student_data)
+                continue
+            if school_id not in current:
+                reason = '不是学生账号' if existing_users[school_id] != 0 else '没有成绩记录'
+                engine.record_failure(results, student_data, f"学号 {school_id} {reason}，无法更新成绩")
+                continue
+
+            perf_id, user_id, old_values = current[school_id]
+            new_values = {
+                'gpa': Decimal(str(student_data.get('gpa', 0.0000))).quantize(Decimal('0.0001')),
+                'cet4': int(student_data.get('cet4', -1)),
+                'cet6': int(student_data.get('cet6', -1)),
+            }
+            changes = {
+                field: {'old': old_values[field], 'new': new_values[field]}
+                for field in self.UPSERT_FIELDS
+                if old_values[field] != new_values[field]
+            }
 
-                    print(f"✅ 行{row_num}: 创建成功 - {student.school_id} {student.name}")
+            results['success_count'] += 1
+            if not changes:
+                results['unchanged_count'] += 1
+                continue
+
+            results['updated_count'] += 1
+            results['updated_students'].append({
+                'row_num': student_data.get('_row_num', '未知'),
+                'school_id': school_id,
+                'name': student_data.get('name'),
+                'changes': {
+                    field: {key: float(value) if isinstance(value, Decimal) else value for key, value in change.items()}
+                    for field, change in changes.items()
+                },
+            })
+            updates_by_fields.setdefault(tuple(changes), []).append(
+                AcademicPerformance(id=perf_id, updated_at=now, **{field: new_values[field] for field in changes})
+            )
+            affected_user_ids.append(user_id)
 
-            except Exception as e:
-                error_msg = str(e)
-                results['failed_count'] += 1
-                results['failed_students'].append({
-                    'row_num': row_num,
-                    'school_id': school_id,
-                    'name': student_data.get('name', '未知'),
-                    'error': error_msg
-                })
-                print(f"❌ 行{row_num}: 创建失败 - {error_msg}")
-
-        print(f"批量创建完成: 成功 {results['success_count']} 个, 失败 {results['failed_count']} 个")
+        # 只更新有变化的字段
+        with transaction.atomic():
+            for fields, performances in updates_by_fields.items():
+                AcademicPerformance.objects.bulk_update(
+                    performances, list(fields) + ['updated_at'], batch_size=batch_size
+                )
+        if progress:
+            progress(results['success_count'], results['failed_count'])
+
+        # 受影响学生一次性重算学术分数和综合总分（分数有变化时由重算递增成绩版本号）
+        if affected_user_ids:
+            ScoreCalculationService.vectorized_recalculate_scores(user_ids=affected_user_ids)
+
+        # 新学号批量创建
+        if new_students:
+            def create_progress(success_count, failed_count):
+                if progress:
+                    progress(results['success_count'] + success_count, results['failed_count'] + failed_count)
+
+            created = self.bulk_create_students(new_students, progress=create_progress)
+            results['created_count'] = created['success_count']
+            results['success_count'] += created['success_count']
+            results['failed_count'] += created['failed_count']
+            results['success_students'].extend(created['success_students'])
+            results['failed_students'].extend(created['failed_students'])
+
+        print(f"批量更新完成: 新建 {results['created_count']} 个, 更新 {results['updated_count']} 个, "
+              f"未变化 {results['unchanged_count']} 个, 失败 {results['failed_count']} 个, "
+              f"耗时 {time.time() - start_time:.2f}秒")
         return results
 
-    def generate_import_report(self, results, parse_errors, total_records):
+    def generate_import_report(self, results, parse_errors, total_records, operator=None):
         """
         生成详细的导入报告
         """
@@ -1937,7 +1644,7 @@ class BulkStudentRegistrationViewV2(APIView):
                 'parse_errors_count': len(parse_errors),
                 'success_rate': f"{(results['success_count'] / total_records * 100):.1f}%" if total_records > 0 else "0%",
                 'import_time': timezone.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'operator': self.request.user.school_id,
+                'operator': operator or self.request.user.school_id,
             },
             'field_mapping_info': {
                 'supported_chinese_columns': [
@@ -1964,6 +1671,17 @@ class BulkStudentRegistrationViewV2(APIView):
             ]
         }
 
+        # upsert 模式：新建/更新/未变化统计和成绩变化明细
+        if 'updated_count' in results:
+            report['summary'].update({
+                'mode': 'upsert',
+                'created_count': results['created_count'],
+                'updated_count': results['updated_count'],
+                'unchanged_count': results['unchanged_count'],
+            })
+            report['updated_students_sample'] = results['updated_students'][:50]
+            report['notes'].append('更新模式下已存在学号只更新有变化的绩点和四六级成绩，并重算学术分数和综合总分')
+
         return report
 
     def _group_by_college(self, students):
@@ -1986,9 +1704,15 @@ class BulkStudentRegistrationViewV2(APIView):
 class DownloadStudentTemplateView(APIView):
     """
     下载学生导入Excel模板
+    模板只生成一次并缓存，使用强 ETag 支持条件请求
     """
     permission_classes = []
 
+    template_key = 'student'
+
+    # 模板只在部署时变化，浏览器缓存1小时，过期后凭 ETag 重新验证
+    CACHE_CONTROL = 'public, max-age=3600'
+
     def get(self, request):
         """
         下载Excel模板
@@ -2002,74 +1726,30 @@ class DownloadStudentTemplateView(APIView):
             #         'message': '只有超级管理员可以下载模板'
             #     }, status=status.HTTP_403_FORBIDDEN)
 
-            # 创建示例数据
-            sample_data = [
-                {
-                    '学号': '2024001001',
-                    '姓名': '张三',
-                    '单位': '信息学院-软件工程',
-                    '绩点': 3.8,
-                    '英语四级成绩': 550,
-                    '英语六级成绩': 520
-                },
-                {
-                    '学号': '2024001002',
-                    '姓名': '李四',
-                    '单位': '信息学院-计算机科学与技术',
-                    '绩点': 3.9,
-                    '英语四级成绩': 580,
-                    '英语六级成绩': 540
-                },
-                {
-                    '学号': '2024001003',
-                    '姓名': '王五',
-                    '单位': '信息学院',
-                    '绩点': 3.5,
-                    '英语四级成绩': 500,
-                    '英语六级成绩': 480
-                }
-            ]
-
-            # 创建DataFrame
-            df = pd.DataFrame(sample_data)
-
-            # 创建Excel文件
-            excel_buffer = io.BytesIO()
-            with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='学生数据', index=False)
+            from django.utils.cache import get_conditional_response
+            from user.utils.import_templates import ImportTemplateCache
 
-                # 获取worksheet进行格式设置
-                worksheet = writer.sheets['学生数据']
-
-                # 设置列宽
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = min(max_length + 2, 30)
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
+            template = ImportTemplateCache.get(self.template_key)
 
-            excel_buffer.seek(0)
-
-            # 🎯 方法1：直接设置文件名（推荐）
-            filename = "学生批量导入模板.xlsx"
+            # 🎯 客户端已有相同内容时返回304
+            not_modified = get_conditional_response(request, etag=template['etag'])
+            if not_modified is not None:
+                not_modified['ETag'] = template['etag']
+                not_modified['Cache-Control'] = self.CACHE_CONTROL
+                return not_modified
 
             # 创建响应
             response = HttpResponse(
-                excel_buffer.getvalue(),
+                template['content'],
                 content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
             )
 
             # 🎯 关键：设置Content-Disposition头部
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            response['Cache-Control'] = 'no-cache'
+            response['Content-Disposition'] = f'attachment; filename="{template["filename"]}"'
+            response['ETag'] = template['etag']
+            response['Cache-Control'] = self.CACHE_CONTROL
 
-            print(f"✅ 模板下载成功: {filename}")
+            print(f"✅ 模板下载成功: {template['filename']}")
             return response
 
         except Exception as e:
@@ -2082,291 +1762,43 @@ class DownloadStudentTemplateView(APIView):
 
 class ExcelTeacherImporter:
     """
-    Excel教师导入工具类
+    Excel教师导入工具类（列定义见 TeacherImportSchema，由通用导入引擎执行）
     """
+    schema = TeacherImportSchema()
 
     # 中文列名到系统字段名的映射
-    CHINESE_COLUMN_MAPPING = {
-        # 必需字段
-        '职工号': 'school_id',
-        '工号': 'school_id',
-        '教职工号': 'school_id',
-        '教师工号': 'school_id',
-        'teacher_id': 'school_id',
-
-        '姓名': 'name',
-        '教师姓名': 'name',
-        '老师姓名': 'name',
-        'teacher_name': 'name',
-
-        '单位': 'department',
-        '部门': 'department',
-        '院系': 'department',
-        '所属单位': 'department',
-        '所在学院': 'department',
-        'college': 'department',
-    }
+    CHINESE_COLUMN_MAPPING = schema.column_mapping
+    REQUIRED_COLUMNS = schema.required_columns
+
+    # 单次导入的最大行数
+    MAX_IMPORT_ROWS = schema.max_rows
 
-    REQUIRED_COLUMNS = ['school_id', 'name', 'department']
+    parse_department = staticmethod(parse_teacher_department)
 
     @staticmethod
     def read_and_validate_excel(excel_file):
         """
         读取并验证教师Excel文件
+        只读取并校验表头，返回逐行产出数据的流式读取器
         """
-        try:
-            print(f"=== 读取教师Excel文件 ===")
-            print(f"文件名: {excel_file.name}")
-
-            # 验证文件格式
-            if not (excel_file.name.endswith('.xlsx') or excel_file.name.endswith('.xls')):
-                raise ValueError("只支持.xlsx或.xls格式的Excel文件")
-
-            # 读取Excel
-            try:
-                df = pd.read_excel(excel_file)
-            except Exception as e:
-                print(f"第一次读取失败，尝试其他编码: {e}")
-                df = pd.read_excel(excel_file, engine='openpyxl')
-
-            print(f"Excel形状: {df.shape} (行×列)")
-            print(f"原始列名: {list(df.columns)}")
-
-            # 标准化列名
-            df = ExcelTeacherImporter.normalize_column_names(df)
-            print(f"标准化后列名: {list(df.columns)}")
-
-            # 验证必需列是否存在
-            missing_columns = []
-            for required_col in ExcelTeacherImporter.REQUIRED_COLUMNS:
-                if required_col not in df.columns:
-                    missing_columns.append(required_col)
-
-            if missing_columns:
-                # 提示可能的中文列名
-                suggested_names = []
-                for missing_col in missing_columns:
-                    possible_names = []
-                    for chinese_name, sys_name in ExcelTeacherImporter.CHINESE_COLUMN_MAPPING.items():
-                        if sys_name == missing_col:
-                            possible_names.append(chinese_name)
-                    if possible_names:
-                        suggested_names.append(f"{missing_col}(可能的中文名: {', '.join(possible_names)})")
-
-                error_msg = f"Excel缺少必需列: {missing_columns}"
-                if suggested_names:
-                    error_msg += f"\n建议使用以下中文列名: {', '.join(suggested_names)}"
-
-                raise ValueError(error_msg)
-
-            # 验证数据行数
-            if len(df) == 0:
-                raise ValueError("Excel文件为空")
-
-            if len(df) > 1000:
-                raise ValueError("单次导入不能超过1000个教师")
-
-            print(f"找到 {len(df)} 个教师记录")
-
-            return df
-
-        except Exception as e:
-            print(f"读取Excel失败: {e}")
-            raise
-
-    @staticmethod
-    def normalize_column_names(df):
-        """
-        标准化列名：支持中文列名映射
-        """
-        normalized_df = df.copy()
-        new_columns = []
-
-        for col in normalized_df.columns:
-            original_col = str(col)
-            cleaned_col = original_col.strip().replace(' ', '').replace('\n', '').replace('\t', '')
-
-            mapped_col = None
-
-            # 1. 完整匹配
-            if cleaned_col in ExcelTeacherImporter.CHINESE_COLUMN_MAPPING:
-                mapped_col = ExcelTeacherImporter.CHINESE_COLUMN_MAPPING[cleaned_col]
-                print(f"列名映射: '{original_col}' -> '{mapped_col}' (完整匹配)")
-
-            # 2. 部分匹配
-            if mapped_col is None:
-                for chinese_name, sys_name in ExcelTeacherImporter.CHINESE_COLUMN_MAPPING.items():
-                    if chinese_name in cleaned_col:
-                        mapped_col = sys_name
-                        print(f"列名映射: '{original_col}' -> '{mapped_col}' (部分匹配: 包含'{chinese_name}')")
-                        break
-
-            # 3. 默认使用原始列名（小写）
-            if mapped_col is None:
-                mapped_col = cleaned_col.lower()
-                print(f"列名未映射: '{original_col}' -> '{mapped_col}' (使用小写)")
-
-            new_columns.append(mapped_col)
-
-        normalized_df.columns = new_columns
-
-        # 检查重复列名
-        column_counts = {}
-        for col in normalized_df.columns:
-            column_counts[col] = column_counts.get(col, 0) + 1
-
-        duplicate_columns = [col for col, count in column_counts.items() if count > 1]
-        if duplicate_columns:
-            print(f"警告: 发现重复列名: {duplicate_columns}")
-            new_columns = []
-            col_count = {}
-            for col in normalized_df.columns:
-                if col in col_count:
-                    col_count[col] += 1
-                    new_columns.append(f"{col}_{col_count[col]}")
-                else:
-                    col_count[col] = 1
-                    new_columns.append(col)
-            normalized_df.columns = new_columns
-
-        return normalized_df
+        return ImportEngine(ExcelTeacherImporter.schema).open(excel_file)
 
     @staticmethod
-    def parse_teacher_data(df):
+    def parse_teacher_data(rows):
         """
         解析Excel数据为教师列表
-        """
-        teachers_data = []
-        errors = []
-
-        print("=== 开始解析教师数据 ===")
-
-        for index, row in df.iterrows():
-            try:
-                row_num = index + 2  # Excel行号（从2开始）
-
-                print(f"\n--- 解析第{row_num}行 ---")
-
-                # 提取基础数据
-                teacher_data = {
-                    'school_id': ExcelTeacherImporter._extract_value(row, 'school_id', row_num, str),
-                    'name': ExcelTeacherImporter._extract_value(row, 'name', row_num, str),
-                    'department': ExcelTeacherImporter._extract_value(row, 'department', row_num, str, default=''),
-                    '_row_num': row_num,
-                    'password': '123456',
-                    'user_type': 1,  # 教师类型
-                }
-
-                print(f"原始数据: {teacher_data}")
 
-                # 数据清洗和验证
-                teacher_data = ExcelTeacherImporter.clean_teacher_data(teacher_data)
-
-                # 解析department为college
-                college = ExcelTeacherImporter.parse_department(teacher_data['department'])
-                teacher_data['college'] = college
-
-                teachers_data.append(teacher_data)
-
-                print(f"✅ 行{row_num}: 解析成功 - {teacher_data['school_id']} {teacher_data['name']}")
-                print(f"   学院: {college}")
-
-            except Exception as e:
-                error_msg = f"第{row_num}行数据解析失败: {str(e)}"
-                errors.append(error_msg)
-                print(f"❌ {error_msg}")
-                import traceback
-                print(f"错误详情: {traceback.format_exc()}")
-
-        print(f"\n=== 解析完成 ===")
-        print(f"成功: {len(teachers_data)} 条, 失败: {len(errors)} 条")
-
-        return teachers_data, errors
-
-    @staticmethod
-    def _extract_value(row, column_name, row_num, value_type, default=None):
-        """
-        安全提取单元格值
+        Args:
+            rows: 逐行产出 {标准化列名: 值, '_row_num': 行号} 的可迭代对象（如流式读取器）
         """
-        if column_name not in row:
-            if default is not None:
-                return default
-            raise ValueError(f"列 '{column_name}' 不存在")
-
-        raw_value = row[column_name]
-
-        # 处理NaN/空值
-        if pd.isna(raw_value):
-            if default is not None:
-                return default
-            raise ValueError(f"第{row_num}行列'{column_name}'不能为空")
-
-        try:
-            str_value = str(raw_value).strip()
-
-            if value_type == str:
-                return str_value
-            elif value_type == int:
-                try:
-                    return int(float(str_value))
-                except:
-                    return int(str_value)
-            elif value_type == float:
-                return float(str_value)
-            else:
-                return value_type(str_value)
-
-        except Exception as e:
-            raise ValueError(f"第{row_num}行列'{column_name}'值'{raw_value}'转换失败: {str(e)}")
+        return ImportEngine(ExcelTeacherImporter.schema).parse(rows)
 
     @staticmethod
-    def clean_teacher_data(teacher_data):
+    def validate_teacher_frame(df):
         """
-        清洗教师数据
+        按列向量化校验教师数据，一次得到所有有效记录和逐行错误
         """
-        cleaned = teacher_data.copy()
-
-        # 1. 职工号：去除空格
-        cleaned['school_id'] = str(cleaned['school_id']).strip()
-        if not cleaned['school_id']:
-            raise ValueError("职工号不能为空")
-
-        # 2. 姓名：去除空格
-        cleaned['name'] = str(cleaned['name']).strip()
-        if not cleaned['name']:
-            raise ValueError("姓名不能为空")
-
-        # 3. department：去除空格
-        cleaned['department'] = str(cleaned.get('department', '')).strip()
-
-        return cleaned
-
-    @staticmethod
-    def parse_department(department_str):
-        """
-        解析department字段为学院
-        教师通常只有学院信息，没有专业
-        """
-        if not department_str:
-            return "未知学院"
-
-        print(f"    解析单位字段: '{department_str}'")
-
-        # 尝试多种分隔符
-        separators = ['-', '/', '\\', '、', '，', ',', ' ', '|']
-
-        for sep in separators:
-            if sep in department_str:
-                parts = [p.strip() for p in department_str.split(sep) if p.strip()]
-                if parts:
-                    # 取第一个作为学院
-                    college = parts[0]
-                    print(f"    使用分隔符'{sep}': college={college}")
-                    return college
-
-        # 如果没有分隔符，直接使用整个字符串
-        print(f"    无分隔符，整体作为学院: college={department_str}")
-        return department_str
+        return ImportEngine(ExcelTeacherImporter.schema).validate(df)
 
 
 @method_decorator(csrf_exempt, name='dispatch')
@@ -2377,11 +1809,15 @@ class BulkTeacherRegistrationView(APIView):
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
 
+    # 预检与学生导入共用
+    dry_run_response = staticmethod(BulkStudentRegistrationViewV2.dry_run_response)
+
     def post(self, request):
         """
         批量导入教师
         POST /api/superadmin/teachers/bulk-import/
-        参数: excel_file (Excel文件)
+        参数: excel_file (Excel文件或CSV/TSV文件), async (可选，true 时后台执行并立即返回任务ID),
+             dry_run (可选，true 时只校验不写入)
         """
         try:
             print("=== 批量教师导入请求开始 ===")
@@ -2405,7 +1841,7 @@ class BulkTeacherRegistrationView(APIView):
             excel_file = None
             for field_name, file_obj in request.FILES.items():
                 print(f"检查字段: '{field_name}' -> '{file_obj.name}'")
-                if file_obj.name.lower().endswith(('.xlsx', '.xls')):
+                if file_obj.name.lower().endswith(SUPPORTED_EXTENSIONS):
                     excel_file = file_obj
                     print(f"✅ 找到Excel文件")
                     break
@@ -2414,7 +1850,7 @@ class BulkTeacherRegistrationView(APIView):
                 print("❌ 没有找到Excel文件")
                 return Response({
                     'success': False,
-                    'message': '请上传Excel文件（.xlsx或.xls格式）',
+                    'message': '请上传Excel文件（.xlsx或.xls格式）或CSV文件（.csv或.tsv格式，UTF-8或GBK编码）',
                     'data': {
                         'available_files': [
                             {'field': k, 'name': v.name, 'size': v.size}
@@ -2426,11 +1862,25 @@ class BulkTeacherRegistrationView(APIView):
 
             print(f"✅ 找到Excel文件: {excel_file.name} ({excel_file.size} bytes)")
 
+            # 🎯 预检：完整校验文件并返回全部错误和预计导入数量，不写入数据库
+            if str(request.data.get('dry_run', False)).lower() in ['true', '1']:
+                return self.dry_run_response(ImportEngine(ExcelTeacherImporter.schema), excel_file)
+
+            # 🎯 后台导入：立即返回任务ID，通过任务接口查询进度
+            if str(request.data.get('async', False)).lower() in ['true', '1']:
+                from user.utils.import_jobs import ImportJobService
+                job = ImportJobService.submit('teacher', excel_file, request.user)
+                return Response({
+                    'success': True,
+                    'message': '导入任务已提交，请通过任务ID查询进度',
+                    'data': job.to_dict()
+                }, status=status.HTTP_202_ACCEPTED)
+
             # 🎯 读取和解析Excel
             try:
                 print("开始解析教师Excel文件...")
-                df = ExcelTeacherImporter.read_and_validate_excel(excel_file)
-                teachers_data, parse_errors = ExcelTeacherImporter.parse_teacher_data(df)
+                reader = ExcelTeacherImporter.read_and_validate_excel(excel_file)
+                teachers_data, parse_errors = ExcelTeacherImporter.parse_teacher_data(reader)
             except Exception as e:
                 error_msg = str(e)
                 print(f"❌ Excel解析失败: {error_msg}")
@@ -2453,7 +1903,7 @@ class BulkTeacherRegistrationView(APIView):
                     'message': 'Excel文件中没有有效的教师数据',
                     'data': {
                         'parse_errors': parse_errors[:5] if parse_errors else [],
-                        'total_rows': len(df) if 'df' in locals() else 0
+                        'total_rows': reader.row_count
                     }
                 }, status=status.HTTP_400_BAD_REQUEST)
 
@@ -2483,86 +1933,16 @@ class BulkTeacherRegistrationView(APIView):
                 'data': None
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def bulk_create_teachers(self, teachers_data):
+    def bulk_create_teachers(self, teachers_data, progress=None):
         """
-        批量创建教师用户
-        """
-        results = {
-            'success_count': 0,
-            'failed_count': 0,
-            'success_teachers': [],
-            'failed_teachers': []
-        }
+        批量创建教师用户（通用导入引擎分批插入）
 
-        print(f"=== 开始批量创建 {len(teachers_data)} 个教师 ===")
-
-        # 按职工号分组，处理重复
-        school_id_map = {}
-        duplicate_school_ids = []
-
-        for teacher_data in teachers_data:
-            school_id = teacher_data['school_id']
-            if school_id in school_id_map:
-                duplicate_school_ids.append(school_id)
-            else:
-                school_id_map[school_id] = teacher_data
-
-        if duplicate_school_ids:
-            print(f"警告: 发现重复职工号: {set(duplicate_school_ids)}")
-
-        # 处理每个唯一职工号
-        for school_id, teacher_data in school_id_map.items():
-            row_num = teacher_data.get('_row_num', '未知')
-
-            try:
-                with transaction.atomic():
-                    # 检查职工号是否已存在
-                    if User.objects.filter(school_id=school_id).exists():
-                        raise ValueError(f"职工号 {school_id} 在系统中已存在")
-
-                    # 准备User数据
-                    user_data = {
-                        'school_id': teacher_data['school_id'],
-                        'name': teacher_data['name'],
-                        'college': teacher_data['college'],
-                        'user_type': 1,  # 教师类型
-                        'password': '123456',
-                        # 教师不需要专业和年级字段
-                        'major': '',
-                        'grade': '',
-                    }
-
-                    print(f"创建教师: {user_data['school_id']} - {user_data['name']}")
-
-                    # 创建User（教师）
-                    teacher = User.objects.create_user(**user_data)
-
-                    results['success_count'] += 1
-                    results['success_teachers'].append({
-                        'row_num': row_num,
-                        'school_id': teacher.school_id,
-                        'name': teacher.name,
-                        'college': teacher.college,
-                        'user_type': '教师',
-                    })
-
-                    print(f"✅ 行{row_num}: 创建成功 - {teacher.school_id} {teacher.name}")
-
-            except Exception as e:
-                error_msg = str(e)
-                results['failed_count'] += 1
-                results['failed_teachers'].append({
-                    'row_num': row_num,
-                    'school_id': school_id,
-                    'name': teacher_data.get('name', '未知'),
-                    'error': error_msg
-                })
-                print(f"❌ 行{row_num}: 创建失败 - {error_msg}")
-
-        print(f"批量创建完成: 成功 {results['success_count']} 个, 失败 {results['failed_count']} 个")
-        return results
+        Args:
+            progress: 可选回调 progress(success_count, failed_count)，每批完成后调用
+        """
+        return ImportEngine(ExcelTeacherImporter.schema).insert(teachers_data, progress=progress)
 
-    def generate_import_report(self, results, parse_errors, total_records):
+    def generate_import_report(self, results, parse_errors, total_records, operator=None):
         """
         生成教师导入报告
         """
@@ -2577,7 +1957,7 @@ class BulkTeacherRegistrationView(APIView):
                 'parse_errors_count': len(parse_errors),
                 'success_rate': f"{(results['success_count'] / total_records * 100):.1f}%" if total_records > 0 else "0%",
                 'import_time': timezone.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'operator': self.request.user.school_id,
+                'operator': operator or self.request.user.school_id,
             },
             'field_mapping_info': {
                 'supported_chinese_columns': [
@@ -2614,92 +1994,71 @@ class BulkTeacherRegistrationView(APIView):
         return groups
 
 
-class DownloadTeacherTemplateView(APIView):
+class DownloadTeacherTemplateView(DownloadStudentTemplateView):
     """
-    下载学生导入Excel模板
+    下载教师导入Excel模板
+    GET /api/admin/download_tea_template/
     """
-    permission_classes = []
-
-    def get(self, request):
-        """
-        下载Excel模板
-        GET /api/superadmin/students/template/
-        """
-        try:
-            # 权限验证
-            # if request.user.user_type != 2:
-            #     return Response({
-            #         'success': False,
-            #         'message': '只有超级管理员可以下载模板'
-            #     }, status=status.HTTP_403_FORBIDDEN)
-
-            # 创建示例数据
-            sample_data = [
-                {
-                    '职工号': 'T001',
-                    '姓名': '张老师',
-                    '单位': '信息学院',
-                },
-                {
-                    '职工号': 'T002',
-                    '姓名': '李老师',
-                    '单位': '信息学院',
-                },
-                {
-                    '职工号': 'T003',
-                    '姓名': '王老师',
-                    '单位': '信息学院',
-                }
-            ]
+    template_key = 'teacher'
 
-            # 创建DataFrame
-            df = pd.DataFrame(sample_data)
 
-            # 创建Excel文件
-            excel_buffer = io.BytesIO()
-            with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='老师数据', index=False)
 
-                # 获取worksheet进行格式设置
-                worksheet = writer.sheets['老师数据']
-
-                # 设置列宽
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = min(max_length + 2, 30)
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
-
-            excel_buffer.seek(0)
+@method_decorator(csrf_exempt, name='dispatch')
+class ImportJobStatusView(APIView):
+    """
+    批量导入任务进度查询接口
+    """
+    permission_classes = [IsAuthenticated]
 
-            # 🎯 方法1：直接设置文件名（推荐）
-            filename = "老师批量导入模板.xlsx"
+    def get(self, request):
+        """
+        查询导入任务
+        GET /api/user/admin/import_jobs/?job_id=<任务ID>  查询单个任务进度和最终报告
+        GET /api/user/admin/import_jobs/                  查询最近的导入任务
+        """
+        from django.core.exceptions import ValidationError
+        from .models import ImportJob
+        from .utils.query_params import parse_limit
 
-            # 创建响应
-            response = HttpResponse(
-                excel_buffer.getvalue(),
-                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
+        if request.user.user_type != 2:
+            return Response({
+                'success': False,
+                'message': '只有超级管理员可以查看导入任务',
+                'data': None
+            }, status=status.HTTP_403_FORBIDDEN)
 
-            # 🎯 关键：设置Content-Disposition头部
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            response['Cache-Control'] = 'no-cache'
+        job_id = request.query_params.get('job_id')
+        if job_id:
+            try:
+                job = ImportJob.objects.select_related('operator').get(id=job_id)
+            except (ImportJob.DoesNotExist, ValidationError):
+                return Response({
+                    'success': False,
+                    'message': f'导入任务 {job_id} 不存在',
+                    'data': None
+                }, status=status.HTTP_404_NOT_FOUND)
 
-            print(f"✅ 模板下载成功: {filename}")
-            return response
+            return Response({
+                'success': True,
+                'message': '获取导入任务成功',
+                'data': job.to_dict()
+            }, status=status.HTTP_200_OK)
 
-        except Exception as e:
-            print(f"❌ 下载模板失败: {e}")
+        try:
+            limit = parse_limit(request.query_params.get('limit'))
+        except ValueError as e:
             return Response({
                 'success': False,
-                'message': f'下载模板失败: {str(e)}'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+                'message': str(e),
+                'data': None
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        jobs = ImportJob.objects.select_related('operator').defer('report')[:limit]
+        return Response({
+            'success': True,
+            'message': '获取导入任务列表成功',
+            'data': [job.to_dict(include_report=False) for job in jobs]
+        }, status=status.HTTP_200_OK)
 
 
 from django.db import transaction
@@ -3211,13 +2570,14 @@ from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 import time
 
-from user.utils.export_utils import UserExporter
+from user.utils.export_utils import UserExporter, EXPORT_FORMATS
 
 
 @method_decorator(csrf_exempt, name='dispatch')
 class ExportUsersView(APIView):
     """
     超管导出用户信息接口
+    参数: accounts (账号数组，["*"] 表示全部), format (可选，xlsx/csv/parquet，默认xlsx)
     返回下载链接格式: {success: bool, message: str, data: {filelink: str}}
     """
 
@@ -3247,9 +2607,17 @@ class ExportUsersView(APIView):
                 'code': 'INVALID_PARAMETER'
             }, status=status.HTTP_400_BAD_REQUEST)
 
+        export_format = str(request.data.get('format', 'xlsx')).lower()
+        if export_format not in EXPORT_FORMATS:
+            return Response({
+                'success': False,
+                'message': f'不支持的导出格式: {export_format}，可选: {", ".join(EXPORT_FORMATS)}',
+                'code': 'INVALID_PARAMETER'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
         # 3. 执行导出
         try:
-            file_info = UserExporter.export_users_to_excel(accounts, request.user)
+            file_info = UserExporter.export_users(accounts, request.user, export_format)
 
             # 计算耗时
             elapsed_time = time.time() - start_time
@@ -3257,7 +2625,8 @@ class ExportUsersView(APIView):
             # 返回相对路径的下载链接
             response_data = {
                 'filelink': file_info['url'],  # 这里已经是相对路径
-                'filename': file_info['filename']
+                'filename': file_info['filename'],
+                'cached': file_info['cached']  # 导出内容未变化时复用已有文件
             }
 
             print(f"✅ 导出完成，返回文件链接: {file_info['url']}")
@@ -3285,7 +2654,7 @@ class ExportUsersView(APIView):
 
 @method_decorator(csrf_exempt, name='dispatch')
 class CleanupExportsView(APIView):
-    """清理旧的导出文件接口"""
+    """清理旧的导出文件接口（按导出文件索引清理，不扫描导出目录）"""
 
     permission_classes = [IsAuthenticated]
 
@@ -3299,12 +2668,19 @@ class CleanupExportsView(APIView):
         try:
             max_hours = request.data.get('max_hours', 24)
             max_files = request.data.get('max_files', 100)
+            # 可选：导出目录空间配额（MB）
+            max_total_mb = request.data.get('max_total_mb')
+            max_total_size = int(float(max_total_mb) * 1024 * 1024) if max_total_mb not in (None, '') else None
 
-            UserExporter.cleanup_old_files(max_hours, max_files)
+            removed, freed_size = UserExporter.cleanup_old_files(max_hours, max_files, max_total_size)
 
             return Response({
                 'success': True,
-                'message': f'已清理超过{max_hours}小时或超过{max_files}个的旧文件'
+                'message': f'已清理超过{max_hours}小时或超过{max_files}个的旧文件',
+                'data': {
+                    'removed': removed,
+                    'freed_size': freed_size
+                }
             })
         except Exception as e:
             return Response({
@@ -3315,7 +2691,10 @@ class CleanupExportsView(APIView):
 
 @method_decorator(csrf_exempt, name='dispatch')
 class ListExportsView(APIView):
-    """列出所有导出文件接口"""
+    """
+    列出导出文件接口（查询导出文件索引）
+    GET /api/admin/exports/?limit=<条数>&export_format=<格式>
+    """
 
     permission_classes = [IsAuthenticated]
 
@@ -3326,27 +2705,25 @@ class ListExportsView(APIView):
                 'message': '权限不足'
             }, status=403)
 
-        import os
-        import glob
-        import json
-
-        files = glob.glob(os.path.join(settings.EXPORT_ROOT, '*.xlsx'))
-        files_info = []
+        from .models import ExportManifest
+        from .utils.query_params import parse_limit
 
-        for filepath in files:
-            filename = os.path.basename(filepath)
-            stats = os.stat(filepath)
+        try:
+            limit = parse_limit(request.GET.get('limit'))
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'message': str(e)
+            }, status=400)
 
-            files_info.append({
-                'filename': filename,
-                'url': UserExporter.get_export_url(filename),
-                'size': stats.st_size,
-                'created_time': int(stats.st_mtime * 1000),
-                'download_count': 0  # 可以扩展记录下载次数
-            })
+        manifests = ExportManifest.objects.select_related('creator')
+        # 注意不能使用 format 参数，它被 DRF 用于选择响应格式
+        export_format = request.GET.get('export_format')
+        if export_format:
+            manifests = manifests.filter(export_format=export_format)
 
-        # 按创建时间倒序
-        files_info.sort(key=lambda x: x['created_time'], reverse=True)
+        # 按创建时间倒序，最多返回 limit 条
+        files_info = [manifest.to_dict() for manifest in manifests.order_by('-created_at')[:limit]]
 
         return Response({
             'success': True,
@@ -3357,6 +2734,50 @@ class ListExportsView(APIView):
         })
 
 
+class DownloadExportView(APIView):
+    """
+    下载导出文件并计数（老师只能下载自己导出的文件）
+    GET /api/admin/exports/download/?filename=<文件名>
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.user_type not in [1, 2]:
+            return Response({
+                'success': False,
+                'message': '权限不足'
+            }, status=403)
+
+        from django.http import FileResponse
+        from .models import ExportManifest
+
+        filename = os.path.basename(request.GET.get('filename', ''))
+        filepath = UserExporter.get_export_path(filename)
+        if request.user.user_type == 1 and not ExportManifest.objects.filter(
+                filename=filename, creator=request.user).exists():
+            return Response({
+                'success': False,
+                'message': '权限不足'
+            }, status=403)
+
+        if not filename or not os.path.exists(filepath):
+            return Response({
+                'success': False,
+                'message': '导出文件不存在或已被清理'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        manifest = UserExporter.record_download(filename)
+        if manifest is None:
+            return Response({
+                'success': False,
+                'message': '导出文件不存在或已被清理'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        print(f"✅ 导出文件下载: {filename}（第 {manifest.download_count} 次）")
+        return FileResponse(open(filepath, 'rb'), as_attachment=True, filename=filename)
+
+
 class CreateFeedbackView(APIView):
     """创建反馈视图"""
     authentication_classes = [TokenAuthentication]